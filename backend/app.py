@@ -1,41 +1,110 @@
-from flask import Flask
-from flask_cors import CORS
+import threading
 from datetime import timedelta
 
+from flask import Flask, jsonify
+from flask_cors import CORS
+
 from config import Config
-from routes.cube_routes import cube_bp
-from routes.learning_routes import learning_bp
-from routes.quiz_routes import quiz_bp
-
-# Create and configure the app
-app = Flask(__name__)
-app.config.from_object(Config)
-app.secret_key = 'supersecretkey'
-
-# Configure CORS
-CORS(app, 
-     resources={r"/api/*": {"origins": ["http://localhost:3000", "http://127.0.0.1:3000", "http://127.0.0.1:5000"]}}, 
-     supports_credentials=True,
-     allow_headers=["Content-Type", "Authorization", "Accept"],
-     methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-     expose_headers=["Set-Cookie"])
-
-# Configure session cookie settings for cross-origin requests
-app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
-app.config['SESSION_COOKIE_HTTPONLY'] = True
-app.config['SESSION_COOKIE_SAMESITE'] = None  # Required for cross-origin requests
-app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=1)  # Sessions last for 1 day
-
-# Register blueprints
-app.register_blueprint(cube_bp, url_prefix='/api/cube')
-app.register_blueprint(learning_bp, url_prefix='/api')
-app.register_blueprint(quiz_bp, url_prefix='/api')
-
-# Root route
-@app.route('/')
-def index():
-    from flask import render_template
-    return render_template('index.html')
+
+def create_app(config=None):
+    """Create and configure the app.
+
+    Blueprints are imported here rather than at module import, and the
+    solver tables, content and session store are loaded on first use or by
+    the background warm-up, so a new worker can answer its first request
+    quickly.
+
+    Args:
+        config: Optional configuration object or dict applied over Config.
+
+    Returns:
+        The Flask app.
+    """
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    # Configure leveled logging for the app's modules
+    from utils.log_utils import configure_logging
+    configure_logging(app.config['LOG_LEVEL'], app.config['LOG_JSON'], app.config['LOG_SAMPLE_RATES'])
+
+    # Configure CORS
+    CORS(app,
+         resources={r"/api/*": {"origins": ["http://localhost:3000", "http://127.0.0.1:3000", "http://127.0.0.1:5000"]}},
+         supports_credentials=True,
+         allow_headers=["Content-Type", "Authorization", "Accept", "X-Cube-State-Format"],
+         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+         expose_headers=["Set-Cookie"])
+
+    # Configure session cookie settings for cross-origin requests
+    app.config['SESSION_COOKIE_SECURE'] = False  # Set to True in production with HTTPS
+    app.config['SESSION_COOKIE_HTTPONLY'] = True
+    app.config['SESSION_COOKIE_SAMESITE'] = None  # Required for cross-origin requests
+    app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=1)  # Sessions last for 1 day
+
+    # Register blueprints
+    from routes.cube_routes import cube_bp
+    from routes.learning_routes import learning_bp
+    from routes.quiz_routes import quiz_bp
+    app.register_blueprint(cube_bp, url_prefix='/api/cube')
+    app.register_blueprint(learning_bp, url_prefix='/api')
+    app.register_blueprint(quiz_bp, url_prefix='/api')
+
+    # Per-route latency histograms and counters, scraped from /metrics
+    if app.config['METRICS_ENABLED']:
+        from utils.metrics import install_metrics, registry
+        from utils.session_manager import get_store
+        install_metrics(app, token=app.config['METRICS_TOKEN'])
+        registry.gauge('rubiks_active_users', 'Users with data in the session store.',
+                       lambda: get_store().user_count())
+
+    # Root route
+    @app.route('/')
+    def index():
+        from flask import render_template
+        return render_template('index.html')
+
+    # Readiness probe: 200 once the background warm-up has finished
+    @app.route('/ready')
+    def ready():
+        warmup = app.extensions['warmup']
+        if not warmup.is_set():
+            return jsonify({'status': 'warming'}), 503
+        return jsonify({'status': 'ready'})
+
+    app.extensions['warmup'] = threading.Event()
+    if app.config['WARM_ON_START']:
+        threading.Thread(target=warm, args=(app,), name='app-warmup', daemon=True).start()
+
+    return app
+
+def warm(app):
+    """Load everything requests would otherwise load on first use.
+
+    Maps the prebuilt solver tables (python build_tables.py; a missing or
+    stale file is rebuilt in the background on first solve, never here),
+    indexes data.json, opens the session store and, if the tables are
+    there, starts filling the scramble pool.
+    """
+    from models.solver_tables import preload as preload_solver_tables
+    from utils.data_utils import repository
+    from utils.log_utils import get_logger
+    from utils.scramble_pool import get_scramble_pool
+    from utils.session_manager import get_store
+
+    try:
+        tables_loaded = preload_solver_tables()
+        repository.get()
+        get_store()
+        if tables_loaded:
+            get_scramble_pool()
+    except Exception:
+        get_logger('app').exception("Warm-up failed; resources will load on first use")
+    finally:
+        app.extensions['warmup'].set()
 
 if __name__ == '__main__':
-    app.run(debug=True) 
\ No newline at end of file
+    create_app().run(debug=True)
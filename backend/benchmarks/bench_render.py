@@ -0,0 +1,78 @@
+"""Microbenchmark: rendering a cube's 54 stickers.
+
+Compares the original renderer, which scanned all 26 cubies once per face
+and worked out grid coordinates from the face normal, with the precomputed
+facelet map (one pass over the cubies) and with the sticker tuple that the
+cube now keeps as its state.
+
+Run from the backend directory:
+    python benchmarks/bench_render.py
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.cube import RubiksCube
+from models.move_engine import state_to_2d
+
+REPEAT = 5
+NUMBER = 2000
+
+
+def legacy_get_face_colors(cube, cubies, face):
+    """The original per-face scan over every cubie."""
+    colors = [[cube.COLORS[face] for _ in range(3)] for _ in range(3)]
+    normal = cube.FACE_NORMALS[face]
+    fixed_axis = next(i for i, v in enumerate(normal) if v != 0)
+    fixed_value = normal[fixed_axis]
+    other_axes = [i for i in range(3) if i != fixed_axis]
+
+    for pos, cubie in cubies.items():
+        if pos[fixed_axis] == fixed_value:
+            if fixed_axis == 0:
+                row = 1 - pos[other_axes[1]]
+                col = 1 + pos[other_axes[0]]
+            elif fixed_axis == 1:
+                if face == 'up':
+                    row = 1 - pos[other_axes[1]]
+                else:
+                    row = 1 + pos[other_axes[1]]
+                col = 1 + pos[other_axes[0]]
+            else:
+                row = 1 - pos[other_axes[1]]
+                col = 1 + pos[other_axes[0]]
+            color = cubie.get_color(face)
+            if color is not None:
+                colors[row][col] = color
+    return colors
+
+
+def legacy_get_state(cube, cubies):
+    faces = ['left', 'right', 'up', 'down', 'front', 'back']
+    return [legacy_get_face_colors(cube, cubies, face) for face in faces]
+
+
+def bench(label, func):
+    best = min(timeit.repeat(func, repeat=REPEAT, number=NUMBER)) / NUMBER
+    print(f"{label:<40} {best * 1e6:8.2f} us")
+    return best
+
+
+def main():
+    cube = RubiksCube()
+    cube.make_move("R U F' L2 D B")
+    cubies = cube.cubies
+
+    legacy = bench("per-face cubie scan (original)", lambda: legacy_get_state(cube, cubies))
+    facelet = bench("facelet map, one pass over cubies",
+                    lambda: state_to_2d(RubiksCube.state_from_cubies(cubies)))
+    tuple_state = bench("sticker tuple state", lambda: state_to_2d(cube.state))
+
+    print(f"\nfacelet map speedup:  {legacy / facelet:6.1f}x")
+    print(f"sticker tuple speedup: {legacy / tuple_state:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
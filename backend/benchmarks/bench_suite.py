@@ -0,0 +1,256 @@
+"""Benchmark suite with a stored baseline.
+
+Measures throughput of the hot paths and of every blueprint endpoint:
+
+- moves/s of RubiksCube.make_move and of the legacy cube_utils.handle_cube_move
+- calls/s of RubiksCube.get_state and of the state adapter conversions
+  (2D, facelet and packed wire formats, both directions)
+- requests/s of each endpoint, through the Flask test client
+
+Everything runs in-process with the memory session store, so the suite
+needs no network and no running server. The solver endpoints use the
+prebuilt tables if present and build them (once, offline) otherwise.
+
+Results are written as JSON. With a baseline, any metric that drops by more
+than the threshold is reported and the suite exits with status 1.
+
+Run from the backend directory:
+    python benchmarks/bench_suite.py --save-baseline
+    python benchmarks/bench_suite.py                  # compare to the baseline
+    python benchmarks/bench_suite.py --output results.json --threshold 0.1
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models.algorithm import parse_algorithm
+from models.cube import RubiksCube
+from models.move_engine import state_from_2d, state_to_2d
+from models.solver_tables import get_tables
+from utils.cube_state_adapter import (
+    convert_3d_to_2d_state, state_from_facelets, state_from_packed,
+    state_to_facelets, state_to_packed
+)
+from utils.cube_utils import handle_cube_move
+from utils.data_utils import repository
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# A metric regresses when it falls below (1 - threshold) of its baseline
+DEFAULT_THRESHOLD = 0.25
+
+REPEAT = 5
+
+# Each repeat runs for at least this many seconds
+MIN_TIME = 0.1
+
+SCRAMBLE = "R U F' L2 D B R' U2 F D' L B2"
+
+
+def measure(func, ops=1):
+    """Return the best throughput of func, in operations per second.
+
+    Args:
+        func: A callable doing ops operations per call.
+        ops: Operations per call (e.g. moves in a sequence).
+    """
+    # Find a number of calls that takes about MIN_TIME
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        number *= 2
+
+    best = elapsed
+    for _ in range(REPEAT - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return number * ops / best
+
+
+def bench_model():
+    """Throughput of the cube model and state conversions."""
+    moves = parse_algorithm(SCRAMBLE)
+    cube = RubiksCube()
+    cube.make_move(SCRAMBLE)
+    state = cube.state
+    state_2d = state_to_2d(state)
+    facelets = state_to_facelets(state)
+    packed = state_to_packed(state)
+    # The legacy handler has no half turns (it ignores them), so it turns
+    # each one as two quarter turns; both metrics count the same SCRAMBLE moves
+    legacy_moves = [turn for move in moves
+                    for turn in ([move[0]] * 2 if move.endswith('2') else [move])]
+
+    def make_moves():
+        for move in moves:
+            cube.make_move(move)
+
+    def handle_moves():
+        current = state_2d
+        for move in legacy_moves:
+            current = handle_cube_move(move, current)
+
+    return {
+        'make_move': (measure(make_moves, len(moves)), 'moves/s'),
+        'handle_cube_move': (measure(handle_moves, len(moves)), 'moves/s'),
+        'get_state': (measure(cube.get_state), 'calls/s'),
+        'state_to_2d': (measure(lambda: state_to_2d(state)), 'calls/s'),
+        'state_from_2d': (measure(lambda: state_from_2d(state_2d)), 'calls/s'),
+        'convert_3d_to_2d_state': (measure(lambda: convert_3d_to_2d_state(cube.get_state())), 'calls/s'),
+        'state_to_facelets': (measure(lambda: state_to_facelets(state)), 'calls/s'),
+        'state_from_facelets': (measure(lambda: state_from_facelets(facelets)), 'calls/s'),
+        'state_to_packed': (measure(lambda: state_to_packed(state)), 'calls/s'),
+        'state_from_packed': (measure(lambda: state_from_packed(packed)), 'calls/s'),
+    }
+
+
+def bench_endpoints():
+    """Requests per second of each endpoint, through the test client."""
+    get_tables(wait=True)
+    app = create_app({'WARM_ON_START': False, 'LOG_LEVEL': 'WARNING'})
+    client = app.test_client()
+    client.post('/api/start')
+
+    content = repository.get()
+    module_id = next(iter(content.modules))
+    question_id = content.question_order[0]
+    answer = content.answer_key[question_id]
+    cube = RubiksCube()
+    cube.make_move(SCRAMBLE)
+    scrambled = state_to_2d(cube.state)
+
+    def call(method, url, **kwargs):
+        def request():
+            response = client.open(url, method=method, **kwargs)
+            if response.status_code >= 400:
+                raise RuntimeError(f"{method} {url} returned {response.status_code}")
+        return request
+
+    endpoints = {
+        'cube.move': call('POST', '/api/cube/move', json={'move': 'R'}),
+        'cube.moves': call('POST', '/api/cube/moves', json={'moves': "R U R' U'"}),
+        'cube.state': call('GET', '/api/cube/state'),
+        'cube.reset': call('POST', '/api/cube/reset'),
+        'cube.solve': call('POST', '/api/cube/solve',
+                           json={'currentState': scrambled, 'timeBudget': 0.01}),
+        'cube.solve_stages': call('POST', '/api/cube/solve/stages',
+                                  json={'currentState': scrambled}),
+        'learning.start': call('POST', '/api/start'),
+        'learning.module': call('GET', f'/api/module/{module_id}'),
+        'learning.complete_module': call('POST', f'/api/module/{module_id}/complete',
+                                         json={'answers': {}}),
+        'quiz.question': call('GET', f'/api/quiz/{question_id}'),
+        'quiz.answer': call('POST', f'/api/quiz/{question_id}/answer', json={'answer': answer}),
+        'quiz.results': call('GET', '/api/results'),
+        'quiz.reset': call('POST', '/api/reset-quiz'),
+    }
+    results = {}
+    for name, request in endpoints.items():
+        # Keep the move log short so every endpoint sees the same cube
+        client.post('/api/cube/reset')
+        results[name] = (measure(request), 'requests/s')
+
+    # Catch up on the last few moves; the history starts at the last reset
+    client.post('/api/cube/reset')
+    version = client.post('/api/cube/moves', json={'moves': SCRAMBLE}).get_json()['version']
+    since = version - len(parse_algorithm(SCRAMBLE))
+    results['cube.history'] = (measure(call('GET', f'/api/cube/history?since={since}')), 'requests/s')
+    return results
+
+
+def run():
+    """Run every benchmark and return the results document."""
+    metrics = {}
+    for group, bench in (('model', bench_model), ('endpoint', bench_endpoints)):
+        for name, (value, unit) in bench().items():
+            metrics[f'{group}.{name}'] = {'value': round(value, 1), 'unit': unit}
+    return {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'metrics': metrics,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Return the metrics that regressed against the baseline.
+
+    Returns:
+        A list of (name, baseline value, current value) tuples. Metrics
+        missing from either document are not compared.
+    """
+    regressions = []
+    for name, metric in results['metrics'].items():
+        base = baseline['metrics'].get(name)
+        if base and metric['value'] < base['value'] * (1 - threshold):
+            regressions.append((name, base['value'], metric['value']))
+    return regressions
+
+
+def report(results, baseline=None):
+    """Print the results, with the change against the baseline if given."""
+    for name, metric in results['metrics'].items():
+        line = f"{name:<36} {metric['value']:>14,.1f} {metric['unit']}"
+        base = baseline['metrics'].get(name) if baseline else None
+        if base:
+            line += f"  ({metric['value'] / base['value'] - 1:+.1%})"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help='baseline JSON to compare with (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store the results as the new baseline instead of comparing')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed fractional drop before a metric counts as a regression')
+    args = parser.parse_args(argv)
+
+    results = run()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        report(results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        report(results)
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    report(results, baseline)
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"\n{len(regressions)} metric(s) regressed by more than {args.threshold:.0%}:")
+        for name, base, value in regressions:
+            print(f"  {name}: {base:,.1f} -> {value:,.1f}")
+        return 1
+    print(f"\nNo metric regressed by more than {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
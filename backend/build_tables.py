@@ -0,0 +1,47 @@
+"""Build the solver lookup tables offline.
+
+Usage:
+    python build_tables.py            # build if missing or stale
+    python build_tables.py --force    # always rebuild
+    python build_tables.py --check    # exit 1 if the file is missing or stale
+
+Run this while deploying, so app workers only ever map the finished file.
+"""
+import argparse
+import sys
+import time
+
+from models.solver_tables import (TABLE_PATH, StaleTablesError, generate_tables, load_tables,
+                                  table_versions, write_tables)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate the solver move and pruning tables.")
+    parser.add_argument('--output', default=TABLE_PATH, help="table file to write")
+    parser.add_argument('--force', action='store_true', help="rebuild even if the file is current")
+    parser.add_argument('--check', action='store_true', help="only check that the file is current")
+    args = parser.parse_args(argv)
+
+    try:
+        load_tables(args.output)
+        current = True
+    except StaleTablesError as e:
+        print(e)
+        current = False
+
+    if args.check:
+        print(f"{args.output} is {'current' if current else 'stale'}")
+        return 0 if current else 1
+    if current and not args.force:
+        print(f"{args.output} is already current")
+        return 0
+
+    start = time.perf_counter()
+    write_tables(generate_tables(), args.output)
+    print(f"Wrote {args.output} (versions {table_versions()}) "
+          f"in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,5 +1,42 @@
+import os
+
 class Config:
     """Flask application configuration"""
-    SECRET_KEY = "rubiks_cube_app_secret_key"
+    SECRET_KEY = os.environ.get('SECRET_KEY', "rubiks_cube_app_secret_key")
     DEBUG = True
-    # Add any other configuration parameters here 
\ No newline at end of file
+    # The session cookie only carries the user id, so it is only re-signed and
+    # sent when it changes, not on every response
+    SESSION_REFRESH_EACH_REQUEST = False
+    # Session store: 'memory' (per process) or 'sqlite' (shared by all workers on the host)
+    SESSION_STORE = os.environ.get('SESSION_STORE', 'memory')
+    SESSION_DB_PATH = os.environ.get(
+        'SESSION_DB_PATH',
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sessions.db'))
+    # Seconds between checks of data.json for edits (content reloads without a restart)
+    CONTENT_RELOAD_INTERVAL = float(os.environ.get('CONTENT_RELOAD_INTERVAL', '1.0'))
+    # Cache-Control of content responses. Modules are revalidated on every view
+    # (a cheap 304) so the module start time is still recorded per user.
+    MODULE_CACHE_CONTROL = 'private, no-cache'
+    QUIZ_CACHE_CONTROL = 'private, max-age=300'
+    # Moves streamed within this many seconds are applied as one batch
+    STREAM_FRAME_INTERVAL = 1 / 60
+    # Scrambles generated ahead of time per process for /api/cube/scramble
+    SCRAMBLE_POOL_SIZE = int(os.environ.get('SCRAMBLE_POOL_SIZE', '32'))
+    # Warm solver tables, content and the session store in a background thread at startup
+    WARM_ON_START = True
+    # Record per-route latency histograms and counters, served in Prometheus
+    # format at /metrics to this host only, or to scrapers sending METRICS_TOKEN
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '') == '1'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+    # Logging: level of the app's loggers, JSON lines instead of text, and the
+    # fraction of DEBUG/INFO records kept per endpoint (e.g. {'cube.make_cube_move': 0.01})
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    LOG_JSON = os.environ.get('LOG_JSON', '') == '1'
+    LOG_SAMPLE_RATES = {}
+    # Add any other configuration parameters here 
+
+
+class TestConfig(Config):
+    """Configuration for the test suite: no background warm-up threads"""
+    TESTING = True
+    WARM_ON_START = False
@@ -0,0 +1,161 @@
+"""Notation parser and compiler for cube algorithms.
+
+Algorithms are written in standard notation: face turns (R, U', F2), wide
+moves (r or Rw), slice moves (M, E, S), whole-cube rotations (x, y, z) and
+parenthesised groups with an optional repeat count, e.g. "(R U R' U')2".
+
+A parsed algorithm is normalized to a tuple of moves understood by the move
+engine. Compiling composes those moves into a single 54-entry permutation,
+cached in an LRU keyed by the normalized sequence, so applying a popular
+algorithm costs one gather however long it is.
+"""
+from functools import lru_cache
+from operator import itemgetter
+import re
+
+from models.move_engine import IDENTITY, MOVE_FACES, MOVE_PERMUTATIONS, compose
+
+# Number of compiled algorithms kept in the LRU caches
+ALGORITHM_CACHE_SIZE = 1024
+
+# Longest sequence a single algorithm may expand to
+MAX_ALGORITHM_LENGTH = 1000
+
+# Typographic primes people paste from documents
+_PRIMES = str.maketrans({'’': "'", '′': "'", '`': "'"})
+
+_TOKEN_RE = re.compile(
+    r"\s*(?:(?P<open>\()"
+    r"|(?P<close>\))(?P<repeat>\d*)"
+    r"|(?P<move>[UDLRFBudlrfbMESxyz])(?P<wide>w?)(?P<count>\d*)(?P<prime>'?))"
+)
+
+
+def _normalize_move(letter, wide, count, prime):
+    """Normalize one move token, returning None if it is a no-op."""
+    if wide:
+        if letter not in MOVE_FACES:
+            raise ValueError(f"Invalid move: {letter}{wide}")
+        letter = letter.lower()
+
+    turns = int(count) if count else 1
+    if prime:
+        turns = -turns
+    turns %= 4
+
+    if turns == 0:
+        return None
+    return letter + ('', '', '2', "'")[turns]
+
+
+@lru_cache(maxsize=ALGORITHM_CACHE_SIZE)
+def _parse(text):
+    """Parse algorithm text into a tuple of normalized moves."""
+    text = text.translate(_PRIMES)
+    groups = [[]]
+    position = 0
+    end = len(text.rstrip())
+
+    while position < end:
+        match = _TOKEN_RE.match(text, position)
+        if not match or match.end() == position:
+            raise ValueError(f"Invalid move: {text[position:].split()[0]}")
+        position = match.end()
+
+        if match.group('open'):
+            groups.append([])
+        elif match.group('close'):
+            if len(groups) == 1:
+                raise ValueError("Unbalanced ')' in algorithm")
+            group = groups.pop()
+            repeat = int(match.group('repeat') or 1)
+            # Check the repeat on its own first: an empty group times a huge
+            # repeat passes the length check but cannot be built
+            if repeat > MAX_ALGORITHM_LENGTH or len(group) * repeat > MAX_ALGORITHM_LENGTH:
+                raise ValueError(f"Algorithm longer than {MAX_ALGORITHM_LENGTH} moves")
+            groups[-1].extend(group * repeat)
+        else:
+            move = _normalize_move(match.group('move'), match.group('wide'),
+                                   match.group('count'), match.group('prime'))
+            if move:
+                groups[-1].append(move)
+
+        if len(groups[-1]) > MAX_ALGORITHM_LENGTH:
+            raise ValueError(f"Algorithm longer than {MAX_ALGORITHM_LENGTH} moves")
+
+    if len(groups) != 1:
+        raise ValueError("Unbalanced '(' in algorithm")
+    return tuple(groups[0])
+
+
+def _as_text(algorithm):
+    """Accept either algorithm text or a list of moves."""
+    if isinstance(algorithm, str):
+        return algorithm
+    return ' '.join(str(move) for move in algorithm)
+
+
+def parse_algorithm(algorithm):
+    """Parse an algorithm into normalized moves.
+
+    Args:
+        algorithm: Algorithm text such as "R U R' U'" or a list of moves.
+
+    Returns:
+        A list of moves in normalized notation (e.g. "Rw2'" becomes "r2").
+
+    Raises:
+        ValueError: If the algorithm contains anything that is not a move.
+    """
+    return list(_parse(_as_text(algorithm)))
+
+
+@lru_cache(maxsize=ALGORITHM_CACHE_SIZE)
+def _compile(moves):
+    """Compose a normalized move tuple into a permutation and its gather."""
+    perm = IDENTITY
+    for move in moves:
+        perm = compose(perm, MOVE_PERMUTATIONS[move])
+    return perm, itemgetter(*perm)
+
+
+def compile_algorithm(algorithm):
+    """Compile an algorithm into a single 54-entry permutation.
+
+    Args:
+        algorithm: Algorithm text or a list of moves.
+
+    Returns:
+        A permutation that can be applied with move_engine.apply_permutation.
+    """
+    return _compile(_parse(_as_text(algorithm)))[0]
+
+
+def apply_algorithm(state, algorithm):
+    """Apply a whole algorithm to a state as one gather.
+
+    Args:
+        state: A tuple of 54 stickers.
+        algorithm: Algorithm text or a list of moves.
+
+    Returns:
+        The new state tuple.
+
+    Raises:
+        ValueError: If the algorithm cannot be parsed.
+    """
+    return _compile(_parse(_as_text(algorithm)))[1](state)
+
+
+def invert_algorithm(algorithm):
+    """Return the normalized moves that undo an algorithm."""
+    inverse = []
+    for move in reversed(_parse(_as_text(algorithm))):
+        if move.endswith("'"):
+            inverse.append(move[:-1])
+        elif move.endswith('2'):
+            inverse.append(move)
+        else:
+            inverse.append(move + "'")
+    return inverse
+
@@ -1,5 +1,34 @@
-from models.cubie import Cubie, CenterCubie, EdgeCubie, CornerCubie
-import copy
+from models.cubie import CenterCubie, CornerCubie, CubieCube, EdgeCubie
+from models.move_engine import (FACE_INDICES, FACE_NORMALS, FACE_ORDER, EDGE_STICKERS,
+                                FACELET_INDEX, MOVE_FACES, state_to_3d)
+from models.algorithm import apply_algorithm
+
+def _cubie_faces():
+    """Faces of each cubie position: up/down first, then front/back, then left/right."""
+    faces = {}
+    for position, face in FACELET_INDEX:
+        faces.setdefault(position, []).append(face)
+    face_order = ('up', 'down', 'front', 'back', 'left', 'right')
+    return {position: tuple(sorted(names, key=face_order.index))
+            for position, names in faces.items()}
+
+_CUBIE_FACES = _cubie_faces()
+
+# Whole-cube rotations: each face brought to the top, then turned about it
+_ORIENTATIONS = tuple(f"{tilt} {turn}" for tilt in ('', 'x', 'x2', "x'", 'z', "z'")
+                      for turn in ('', 'y', 'y2', "y'"))
+
+def _pack(state, digits):
+    """Pack a sticker state into an integer, 3 bits (one octal digit) per sticker."""
+    try:
+        return int(''.join(map(digits.__getitem__, state)), 8)
+    except KeyError as e:
+        raise ValueError(f"Unknown sticker color: {e.args[0]}") from None
+
+def _solved_keys(solved_state, digits):
+    """Keys of the solved cube in each of its 24 orientations."""
+    return frozenset(_pack(apply_algorithm(solved_state, rotation), digits)
+                     for rotation in _ORIENTATIONS)
 
 class RubiksCube:
     """Represents a Rubik's cube as a 3D array of cubies."""
@@ -25,14 +54,7 @@ class RubiksCube:
     }
     
     # Face normals (direction vectors)
-    FACE_NORMALS = {
-        'up': (0, 1, 0),
-        'down': (0, -1, 0),
-        'left': (-1, 0, 0),
-        'right': (1, 0, 0),
-        'front': (0, 0, 1),
-        'back': (0, 0, -1)
-    }
+    FACE_NORMALS = FACE_NORMALS
     
     # Adjacent faces for each face in clockwise order
     ADJACENT_FACES = {
@@ -44,158 +66,117 @@ class RubiksCube:
         'back': ['up', 'left', 'down', 'right']
     }
     
-    # Face indices for 2D representation (matching frontend)
-    FACE_INDICES = {
-        'left': 0,
-        'right': 1,
-        'up': 2,
-        'down': 3,
-        'front': 4,
-        'back': 5
-    }
+    # Face indices and edge sticker definitions live with the move engine
+    FACE_INDICES = FACE_INDICES
+    EDGE_STICKERS = EDGE_STICKERS
     
-    # Definition of edge stickers affected when rotating each face
-    # Format: [face, [indices of affected stickers on that face]]
-    EDGE_STICKERS = {
-        'front': [
-            ['up', [6, 7, 8]],     # Bottom row of up face
-            ['right', [0, 3, 6]],  # Left column of right face
-            ['down', [2, 1, 0]],   # Top row of down face (reversed)
-            ['left', [8, 5, 2]]    # Right column of left face
-        ],
-        'back': [
-            ['up', [2, 1, 0]],     # Top row of up face (reversed)
-            ['left', [0, 3, 6]],   # Left column of left face
-            ['down', [6, 7, 8]],   # Bottom row of down face (reversed)
-            ['right', [8, 5, 2]]   # Right column of right face
-        ],
-        'up': [
-            ['back', [0, 1, 2]],   # Top row of back face
-            ['right', [0, 1, 2]],  # Top row of right face
-            ['front', [0, 1, 2]],  # Top row of front face
-            ['left', [0, 1, 2]]    # Top row of left face
-        ],
-        'down': [
-            ['front', [6, 7, 8]],  # Bottom row of front face
-            ['right', [6, 7, 8]],  # Bottom row of right face
-            ['back', [6, 7, 8]],   # Bottom row of back face
-            ['left', [6, 7, 8]]    # Bottom row of left face
-        ],
-        'left': [
-            ['up', [0, 3, 6]],     # Left column of up face
-            ['front', [0, 3, 6]],  # Left column of front face
-            ['down', [0, 3, 6]],   # Left column of down face
-            ['back', [8, 5, 2]]    # Right column of back face (reversed)
-        ],
-        'right': [
-            ['up', [8, 5, 2]],     # Right column of up face
-            ['back', [0, 3, 6]],   # Left column of back face (reversed)
-            ['down', [8, 5, 2]],   # Right column of down face
-            ['front', [8, 5, 2]]   # Right column of front face
-        ]
-    }
+    # Solved state as a compact sticker tuple (see models.move_engine)
+    SOLVED_STATE = tuple(color for color in map(COLORS.get, FACE_ORDER) for _ in range(9))
+    
+    # Octal digit of each color in a packed state key (the color's face in FACE_ORDER)
+    COLOR_DIGITS = {color: str(code) for code, color in enumerate(map(COLORS.get, FACE_ORDER))}
+    
+    # Packed keys of the default solved state and of the solved cube held any way
+    SOLVED_KEY = _pack(SOLVED_STATE, COLOR_DIGITS)
+    SOLVED_KEYS = _solved_keys(SOLVED_STATE, COLOR_DIGITS)
     
     def __init__(self):
         """Initialize a solved Rubik's cube."""
-        # Create a 3x3x3 array to hold cubies
-        self.cubies = {}
-        self._initialize_cube()
+        # Compact sticker state used by the move engine
+        self.state = self.SOLVED_STATE
+        # Cubies are built from the state on demand and cached per state
+        self._cubies = None
+        self._cubies_state = None
+        # Packed key of the current state, cached per state
+        self._key = self.SOLVED_KEY
+        self._key_state = self.SOLVED_STATE
     
-    def _initialize_cube(self):
-        """Initialize the cube with all cubies in the solved state."""
-        # Create center cubies (6)
-        for face, pos in self.FACE_POSITIONS.items():
-            self.cubies[pos] = CenterCubie(pos, face, self.COLORS[face])
-        
-        # Create edge cubies (12)
-        # Up-Front edge
-        pos = (0, 1, 1)
-        self.cubies[pos] = EdgeCubie(pos, 'up', self.COLORS['up'], 'front', self.COLORS['front'])
-        
-        # Up-Back edge
-        pos = (0, 1, -1)
-        self.cubies[pos] = EdgeCubie(pos, 'up', self.COLORS['up'], 'back', self.COLORS['back'])
-        
-        # Up-Left edge
-        pos = (-1, 1, 0)
-        self.cubies[pos] = EdgeCubie(pos, 'up', self.COLORS['up'], 'left', self.COLORS['left'])
-        
-        # Up-Right edge
-        pos = (1, 1, 0)
-        self.cubies[pos] = EdgeCubie(pos, 'up', self.COLORS['up'], 'right', self.COLORS['right'])
-        
-        # Down-Front edge
-        pos = (0, -1, 1)
-        self.cubies[pos] = EdgeCubie(pos, 'down', self.COLORS['down'], 'front', self.COLORS['front'])
-        
-        # Down-Back edge
-        pos = (0, -1, -1)
-        self.cubies[pos] = EdgeCubie(pos, 'down', self.COLORS['down'], 'back', self.COLORS['back'])
+    @classmethod
+    def pack_state(cls, state):
+        """Pack a 54-sticker state into a canonical integer.
         
-        # Down-Left edge
-        pos = (-1, -1, 0)
-        self.cubies[pos] = EdgeCubie(pos, 'down', self.COLORS['down'], 'left', self.COLORS['left'])
+        Each sticker takes 3 bits, so equal states have equal keys and the key
+        can be compared, hashed or stored in constant time.
         
-        # Down-Right edge
-        pos = (1, -1, 0)
-        self.cubies[pos] = EdgeCubie(pos, 'down', self.COLORS['down'], 'right', self.COLORS['right'])
-        
-        # Front-Left edge
-        pos = (-1, 0, 1)
-        self.cubies[pos] = EdgeCubie(pos, 'front', self.COLORS['front'], 'left', self.COLORS['left'])
-        
-        # Front-Right edge
-        pos = (1, 0, 1)
-        self.cubies[pos] = EdgeCubie(pos, 'front', self.COLORS['front'], 'right', self.COLORS['right'])
-        
-        # Back-Left edge
-        pos = (-1, 0, -1)
-        self.cubies[pos] = EdgeCubie(pos, 'back', self.COLORS['back'], 'left', self.COLORS['left'])
-        
-        # Back-Right edge
-        pos = (1, 0, -1)
-        self.cubies[pos] = EdgeCubie(pos, 'back', self.COLORS['back'], 'right', self.COLORS['right'])
-        
-        # Create corner cubies (8)
-        # Up-Front-Left corner
-        pos = (-1, 1, 1)
-        self.cubies[pos] = CornerCubie(pos, 'up', self.COLORS['up'], 'front', 
-                                       self.COLORS['front'], 'left', self.COLORS['left'])
-        
-        # Up-Front-Right corner
-        pos = (1, 1, 1)
-        self.cubies[pos] = CornerCubie(pos, 'up', self.COLORS['up'], 'front', 
-                                       self.COLORS['front'], 'right', self.COLORS['right'])
-        
-        # Up-Back-Left corner
-        pos = (-1, 1, -1)
-        self.cubies[pos] = CornerCubie(pos, 'up', self.COLORS['up'], 'back', 
-                                       self.COLORS['back'], 'left', self.COLORS['left'])
-        
-        # Up-Back-Right corner
-        pos = (1, 1, -1)
-        self.cubies[pos] = CornerCubie(pos, 'up', self.COLORS['up'], 'back', 
-                                      self.COLORS['back'], 'right', self.COLORS['right'])
-        
-        # Down-Front-Left corner
-        pos = (-1, -1, 1)
-        self.cubies[pos] = CornerCubie(pos, 'down', self.COLORS['down'], 'front', 
-                                       self.COLORS['front'], 'left', self.COLORS['left'])
+        Args:
+            state: A tuple of 54 stickers.
+            
+        Returns:
+            An integer below 8**54.
+            
+        Raises:
+            ValueError: If a sticker is not one of the cube's colors.
+        """
+        return _pack(state, cls.COLOR_DIGITS)
+    
+    @classmethod
+    def unpack_state(cls, key):
+        """Inverse of pack_state."""
+        colors = {digit: color for color, digit in cls.COLOR_DIGITS.items()}
+        return tuple(map(colors.__getitem__, format(key, '054o')))
+    
+    @property
+    def state_key(self):
+        """Packed integer key of the current state (see pack_state)."""
+        if self._key_state is not self.state:
+            self._key = self.pack_state(self.state)
+            self._key_state = self.state
+        return self._key
+    
+    def is_solved(self):
+        """Check whether every face is a single color, however the cube is held."""
+        return self.state_key in self.SOLVED_KEYS
+    
+    @property
+    def cubies(self):
+        """The cube's cubies keyed by position, built from the current state.
         
-        # Down-Front-Right corner
-        pos = (1, -1, 1)
-        self.cubies[pos] = CornerCubie(pos, 'down', self.COLORS['down'], 'front', 
-                                       self.COLORS['front'], 'right', self.COLORS['right'])
+        The sticker state is the source of truth; this dict of cubie objects
+        is only materialized when something asks for it.
+        """
+        if self._cubies_state is not self.state:
+            self._cubies = self._build_cubies(self.state)
+            self._cubies_state = self.state
+        return self._cubies
+    
+    @classmethod
+    def _build_cubies(cls, state):
+        """Build CenterCubie, EdgeCubie and CornerCubie objects from a sticker state."""
+        cubies = {}
+        for pos, faces in _CUBIE_FACES.items():
+            colors = [state[FACELET_INDEX[(pos, face)]] for face in faces]
+            if len(faces) == 1:
+                cubies[pos] = CenterCubie(pos, faces[0], colors[0])
+            elif len(faces) == 2:
+                cubies[pos] = EdgeCubie(pos, faces[0], colors[0], faces[1], colors[1])
+            else:
+                cubies[pos] = CornerCubie(pos, faces[0], colors[0], faces[1], colors[1],
+                                          faces[2], colors[2])
+        return cubies
+    
+    @classmethod
+    def state_from_cubies(cls, cubies):
+        """Render cubie objects to a 54-sticker state in a single pass.
         
-        # Down-Back-Left corner
-        pos = (-1, -1, -1)
-        self.cubies[pos] = CornerCubie(pos, 'down', self.COLORS['down'], 'back', 
-                                       self.COLORS['back'], 'left', self.COLORS['left'])
+        Args:
+            cubies: A dict of cubies keyed by position, like RubiksCube.cubies.
+            
+        Returns:
+            The sticker tuple (see models.move_engine).
+        """
+        stickers = list(cls.SOLVED_STATE)
+        for pos, cubie in cubies.items():
+            for face, color in cubie.colors.items():
+                stickers[FACELET_INDEX[(pos, face)]] = color
+        return tuple(stickers)
+    
+    def get_cubie_cube(self):
+        """Return the piece-level CubieCube for the current state.
         
-        # Down-Back-Right corner
-        pos = (1, -1, -1)
-        self.cubies[pos] = CornerCubie(pos, 'down', self.COLORS['down'], 'back', 
-                                       self.COLORS['back'], 'right', self.COLORS['right'])
+        Raises:
+            ValueError: If the state does not describe a solvable cube.
+        """
+        return CubieCube.from_facelets(self.state)
     
     def get_face_colors(self, face):
         """Get the colors of all cubies on a particular face.
@@ -206,42 +187,10 @@ class RubiksCube:
         Returns:
             A 3x3 grid of colors representing the face.
         """
-        # Initialize with default color (shouldn't be needed if cube is valid)
-        default_color = self.COLORS[face]
-        colors = [[default_color for _ in range(3)] for _ in range(3)]
-        normal = self.FACE_NORMALS[face]
-        
-        # Determine which coordinate is fixed for this face
-        fixed_axis = next(i for i, v in enumerate(normal) if v != 0)
-        fixed_value = normal[fixed_axis]
-        
-        # Determine the other two axes
-        other_axes = [i for i in range(3) if i != fixed_axis]
-        
-        # Map from cube coordinates to grid coordinates
-        for pos, cubie in self.cubies.items():
-            # Check if this cubie is on the face
-            if pos[fixed_axis] == fixed_value:
-                # Calculate grid coordinates
-                if fixed_axis == 0:  # Left/Right faces
-                    row = 1 - pos[other_axes[1]]  # Z-axis
-                    col = 1 + pos[other_axes[0]]  # Y-axis
-                elif fixed_axis == 1:  # Up/Down faces
-                    if face == 'up':
-                        row = 1 - pos[other_axes[1]]  # Z-axis
-                        col = 1 + pos[other_axes[0]]  # X-axis
-                    else:  # down face
-                        row = 1 + pos[other_axes[1]]  # Z-axis
-                        col = 1 + pos[other_axes[0]]  # X-axis
-                else:  # Front/Back faces
-                    row = 1 - pos[other_axes[1]]  # Y-axis
-                    col = 1 + pos[other_axes[0]]  # X-axis
-                
-                color = cubie.get_color(face)
-                if color is not None:
-                    colors[row][col] = color
-        
-        return colors
+        base = self.FACE_INDICES[face] * 9
+        state = self.state
+        return [list(state[base:base + 3]), list(state[base + 3:base + 6]),
+                list(state[base + 6:base + 9])]
     
     def get_state(self):
         """Get the current state of the cube as a list of 2D arrays.
@@ -250,181 +199,33 @@ class RubiksCube:
             A list of six 3x3 arrays representing the colors of each face in the order:
             [left, right, up, down, front, back] (matching FACE_INDICES)
         """
-        faces = ['left', 'right', 'up', 'down', 'front', 'back']
-        return [self.get_face_colors(face) for face in faces]
+        return state_to_3d(self.state)
     
     def make_move(self, move):
         """Apply a move to the cube using standard notation.
         
         Args:
-            move: The move to make ('F', 'B', 'L', 'R', 'U', 'D', "F'", "B'", "L'", "R'", "U'", "D'").
+            move: The move to make ('F', "F'", 'F2', 'Rw', 'M', 'x', ...). A whole
+                  algorithm such as "R U R' U'" is applied as a single permutation.
             
         Returns:
-            The new state of the cube.
-        """
-        face_map = {
-            'F': 'front',
-            'B': 'back',
-            'L': 'left',
-            'R': 'right',
-            'U': 'up',
-            'D': 'down'
-        }
-        
-        face = face_map.get(move[0])
-        clockwise = not (len(move) > 1 and move[1] == "'")
-        
-        if not face:
-            # Return the current state if the move is invalid
-            return self.get_state()
-        
-        # Get the current state (which may be a cached/patched state)
-        current_state = self.get_state()
-        
-        # Apply the rotation to the current state
-        if clockwise:
-            # Use our 2D state based approach
-            new_state = self._perform_clockwise_rotation(face)
-        else:
-            new_state = self._perform_counterclockwise_rotation(face)
-        
-        # Save the new state
-        self.current_state_3d = new_state
-        
-        return new_state
-    
-    def _perform_clockwise_rotation(self, face):
-        """Perform a clockwise rotation of the specified face.
-        
-        This handles the rotation of the face itself and the adjacent edge stickers.
-        
-        Args:
-            face: The face to rotate ('up', 'down', 'left', 'right', 'front', 'back').
+            The new state of the cube as a compact sticker tuple.
             
-        Returns:
-            The new state of the cube after the rotation.
+        Raises:
+            ValueError: If the move is not valid notation.
         """
-        # Get the current 3D state and convert to 2D for easier manipulation
-        current_state_3d = self.get_state()
-        current_state_2d = []
-        
-        # Convert 3D state to 2D (flattened) state for easier manipulation
-        for face_grid in current_state_3d:
-            flat_face = []
-            for row in face_grid:
-                flat_face.extend(row)
-            current_state_2d.append(flat_face)
-        
-        # Make a copy of the state to modify
-        new_state_2d = copy.deepcopy(current_state_2d)
-        
-        # Get face index
-        face_idx = self.FACE_INDICES[face]
-        
-        # 1. Rotate the face clockwise (as a 3x3 matrix)
-        face_colors = current_state_2d[face_idx]
-        new_face_colors = [
-            face_colors[6], face_colors[3], face_colors[0],
-            face_colors[7], face_colors[4], face_colors[1],
-            face_colors[8], face_colors[5], face_colors[2]
-        ]
-        new_state_2d[face_idx] = new_face_colors
-        
-        # 2. Move the edge stickers
-        if face in self.EDGE_STICKERS:
-            edge_def = self.EDGE_STICKERS[face]
-            
-            # Store the current values of the edges
-            edges = []
-            for adj_face_name, indices in edge_def:
-                adj_face_idx = self.FACE_INDICES[adj_face_name]
-                edge_stickers = [current_state_2d[adj_face_idx][i] for i in indices]
-                edges.append(edge_stickers)
-            
-            # Rotate the edges clockwise (last edge goes to first position)
-            last_edge = edges.pop()
-            edges.insert(0, last_edge)
-            
-            # Update the edges in the new state
-            for i, (adj_face_name, indices) in enumerate(edge_def):
-                adj_face_idx = self.FACE_INDICES[adj_face_name]
-                for idx, sticker_idx in enumerate(indices):
-                    new_state_2d[adj_face_idx][sticker_idx] = edges[i][idx]
-        
-        # Convert 2D state back to 3D format
-        new_state_3d = []
-        for face_colors in new_state_2d:
-            face_grid = []
-            for i in range(0, 9, 3):
-                face_grid.append(face_colors[i:i+3])
-            new_state_3d.append(face_grid)
-        
-        return new_state_3d
+        self.state = apply_algorithm(self.state, move)
+        return self.state
     
-    def _perform_counterclockwise_rotation(self, face):
-        """Perform a counterclockwise rotation of the specified face.
-        
-        This handles the rotation of the face itself and the adjacent edge stickers.
+    def rotate_face(self, face, clockwise=True):
+        """Rotate a face a quarter turn.
         
         Args:
             face: The face to rotate ('up', 'down', 'left', 'right', 'front', 'back').
+            clockwise: Whether to turn the face clockwise.
             
         Returns:
-            The new state of the cube after the rotation.
+            The new state of the cube as a compact sticker tuple.
         """
-        # Get the current 3D state and convert to 2D for easier manipulation
-        current_state_3d = self.get_state()
-        current_state_2d = []
-        
-        # Convert 3D state to 2D (flattened) state for easier manipulation
-        for face_grid in current_state_3d:
-            flat_face = []
-            for row in face_grid:
-                flat_face.extend(row)
-            current_state_2d.append(flat_face)
-        
-        # Make a copy of the state to modify
-        new_state_2d = copy.deepcopy(current_state_2d)
-        
-        # Get face index
-        face_idx = self.FACE_INDICES[face]
-        
-        # 1. Rotate the face counterclockwise (as a 3x3 matrix)
-        face_colors = current_state_2d[face_idx]
-        new_face_colors = [
-            face_colors[2], face_colors[5], face_colors[8],
-            face_colors[1], face_colors[4], face_colors[7],
-            face_colors[0], face_colors[3], face_colors[6]
-        ]
-        new_state_2d[face_idx] = new_face_colors
-        
-        # 2. Move the edge stickers
-        if face in self.EDGE_STICKERS:
-            edge_def = self.EDGE_STICKERS[face]
-            
-            # Store the current values of the edges
-            edges = []
-            for adj_face_name, indices in edge_def:
-                adj_face_idx = self.FACE_INDICES[adj_face_name]
-                edge_stickers = [current_state_2d[adj_face_idx][i] for i in indices]
-                edges.append(edge_stickers)
-            
-            # Rotate the edges counterclockwise (first edge goes to last position)
-            first_edge = edges.pop(0)
-            edges.append(first_edge)
-            
-            # Update the edges in the new state
-            for i, (adj_face_name, indices) in enumerate(edge_def):
-                adj_face_idx = self.FACE_INDICES[adj_face_name]
-                for idx, sticker_idx in enumerate(indices):
-                    new_state_2d[adj_face_idx][sticker_idx] = edges[i][idx]
-        
-        # Convert 2D state back to 3D format
-        new_state_3d = []
-        for face_colors in new_state_2d:
-            face_grid = []
-            for i in range(0, 9, 3):
-                face_grid.append(face_colors[i:i+3])
-            new_state_3d.append(face_grid)
-        
-        return new_state_3d 
\ No newline at end of file
+        letter = next(key for key, value in MOVE_FACES.items() if value == face)
+        return self.make_move(letter if clockwise else letter + "'")
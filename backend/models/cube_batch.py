@@ -0,0 +1,183 @@
+"""Vectorized simulator for large batches of cube states.
+
+A batch holds N cube states as an (N, 54) uint8 array of color codes, laid
+out exactly like the move engine's sticker tuples (FACE_INDICES order,
+row-major faces). Moves are applied to every row at once with the same
+permutation tables the move engine builds from RubiksCube.EDGE_STICKERS.
+
+This is meant for offline analytics (replaying move logs, generating
+scramble pools, checking tutorial answers) over millions of states.
+"""
+import numpy as np
+
+from models.algorithm import compile_algorithm, parse_algorithm
+from models.cube import RubiksCube
+from models.move_engine import FACE_ORDER, IDENTITY, MOVE_PERMUTATIONS
+
+# Color code for each color: the index of the face it belongs to when solved
+COLOR_NAMES = tuple(RubiksCube.COLORS[face] for face in FACE_ORDER)
+COLOR_CODES = {color: code for code, color in enumerate(COLOR_NAMES)}
+
+# Move index 0 is the identity so ragged move logs can be padded with ''
+MOVE_NAMES = ('',) + tuple(MOVE_PERMUTATIONS)
+MOVE_INDEX = {move: index for index, move in enumerate(MOVE_NAMES)}
+PERMUTATION_TABLE = np.array([IDENTITY] + list(MOVE_PERMUTATIONS.values()), dtype=np.intp)
+
+# Face turns used for random scrambles
+FACE_TURNS = tuple(face + suffix for face in 'UDLRFB' for suffix in ('', "'", '2'))
+
+SOLVED_STICKERS = np.repeat(np.arange(6, dtype=np.uint8), 9)
+
+# Rows processed at once by per-row moves, to bound the size of index arrays
+CHUNK_ROWS = 1 << 16
+
+
+def move_indices(moves):
+    """Convert move names to indices into MOVE_NAMES.
+
+    Args:
+        moves: A sequence of moves in normalized notation ('' for no move).
+
+    Returns:
+        An int array of move indices.
+
+    Raises:
+        ValueError: If a move is not recognized.
+    """
+    try:
+        return np.array([MOVE_INDEX[move] for move in moves], dtype=np.intp)
+    except KeyError as e:
+        raise ValueError(f"Invalid move: {e.args[0]}") from None
+
+
+class CubeBatch:
+    """A batch of cube states stored as an (N, 54) uint8 array."""
+
+    def __init__(self, stickers):
+        """Wrap an existing (N, 54) array of color codes.
+
+        Args:
+            stickers: Array-like of shape (N, 54) with values 0-5.
+        """
+        stickers = np.ascontiguousarray(stickers, dtype=np.uint8)
+        if stickers.ndim != 2 or stickers.shape[1] != 54:
+            raise ValueError(f"Expected an (N, 54) array, got shape {stickers.shape}")
+        self.stickers = stickers
+
+    @classmethod
+    def solved(cls, count):
+        """Create a batch of solved cubes."""
+        return cls(np.tile(SOLVED_STICKERS, (count, 1)))
+
+    @classmethod
+    def from_states(cls, states):
+        """Create a batch from 2D frontend states or 54-sticker tuples.
+
+        Args:
+            states: A sequence of states, each either six lists of 9 color names
+                    or a flat sequence of 54 color names.
+        """
+        names = np.array([np.ravel(state) for state in states], dtype=str).reshape(-1, 54)
+        stickers = np.full(names.shape, 255, dtype=np.uint8)
+        for code, color in enumerate(COLOR_NAMES):
+            stickers[names == color] = code
+        if (stickers == 255).any():
+            raise ValueError("States contain unknown colors")
+        return cls(stickers)
+
+    def __len__(self):
+        return len(self.stickers)
+
+    def copy(self):
+        """Return an independent copy of the batch."""
+        return CubeBatch(self.stickers.copy())
+
+    def to_states(self):
+        """Convert the batch back to 2D frontend states."""
+        names = np.array(COLOR_NAMES)[self.stickers]
+        return [row.reshape(6, 9).tolist() for row in names]
+
+    def apply(self, algorithm):
+        """Apply the same move or algorithm to every cube in the batch.
+
+        Args:
+            algorithm: A move or algorithm in standard notation, compiled to a
+                       single permutation.
+
+        Returns:
+            The batch itself, to allow chaining.
+        """
+        perm = np.array(compile_algorithm(algorithm), dtype=np.intp)
+        self.stickers = self.stickers[:, perm]
+        return self
+
+    def apply_per_row(self, moves):
+        """Apply a different move to each cube in the batch.
+
+        Args:
+            moves: One move per row, either as move names ('' for no move) or as
+                   indices into MOVE_NAMES.
+
+        Returns:
+            The batch itself, to allow chaining.
+        """
+        moves = np.asarray(moves)
+        if moves.dtype.kind in 'UO':
+            moves = move_indices(moves)
+        if moves.shape != (len(self),):
+            raise ValueError(f"Expected {len(self)} moves, got shape {moves.shape}")
+
+        stickers = self.stickers
+        result = np.empty_like(stickers)
+        for start in range(0, len(stickers), CHUNK_ROWS):
+            rows = slice(start, start + CHUNK_ROWS)
+            result[rows] = np.take_along_axis(stickers[rows], PERMUTATION_TABLE[moves[rows]],
+                                              axis=1)
+        self.stickers = result
+        return self
+
+    def replay(self, move_log):
+        """Replay a move log per row.
+
+        Args:
+            move_log: An (N, T) array of move indices, or a list of N algorithms
+                      (strings or move lists) that may have different lengths.
+
+        Returns:
+            The batch itself, to allow chaining.
+        """
+        if not isinstance(move_log, np.ndarray):
+            logs = [parse_algorithm(algorithm) for algorithm in move_log]
+            length = max((len(log) for log in logs), default=0)
+            move_log = np.zeros((len(logs), length), dtype=np.intp)
+            for row, log in enumerate(logs):
+                move_log[row, :len(log)] = move_indices(log)
+
+        for column in move_log.T:
+            self.apply_per_row(column)
+        return self
+
+    def scramble(self, length, rng=None):
+        """Apply an independent random face-turn sequence to every row.
+
+        Args:
+            length: Number of random moves per row.
+            rng: Optional numpy Generator for reproducible scrambles.
+
+        Returns:
+            An (N, length) array of the move indices applied.
+        """
+        rng = rng or np.random.default_rng()
+        choices = move_indices(FACE_TURNS)
+        applied = rng.choice(choices, size=(len(self), length))
+        self.replay(applied)
+        return applied
+
+    def solved_face_count(self):
+        """Count the faces of each cube whose nine stickers match its center."""
+        faces = self.stickers.reshape(-1, 6, 9)
+        return (faces == faces[:, :, 4:5]).all(axis=2).sum(axis=1)
+
+    def is_solved(self):
+        """Return a boolean array telling which cubes are solved."""
+        return self.solved_face_count() == 6
@@ -1,3 +1,6 @@
+from models.move_engine import FACE_NORMALS, FACE_ORDER, FACELET_INDEX
+
+
 class Cubie:
     """Base class for all cubies in the Rubik's cube.
     
@@ -5,6 +8,8 @@ class Cubie:
     and may have one or more colors on its faces.
     """
     
+    __slots__ = ('position', 'colors')
+    
     def __init__(self, position):
         """Initialize a cubie with its position.
         
@@ -51,6 +56,8 @@ class Cubie:
 class CenterCubie(Cubie):
     """Center cubie with only one visible face."""
     
+    __slots__ = ('face',)
+    
     def __init__(self, position, face, color):
         """Initialize a center cubie.
         
@@ -71,6 +78,8 @@ class CenterCubie(Cubie):
 class EdgeCubie(Cubie):
     """Edge cubie with two visible faces."""
     
+    __slots__ = ('faces',)
+    
     def __init__(self, position, face1, color1, face2, color2):
         """Initialize an edge cubie.
         
@@ -94,6 +103,8 @@ class EdgeCubie(Cubie):
 class CornerCubie(Cubie):
     """Corner cubie with three visible faces."""
     
+    __slots__ = ('faces',)
+    
     def __init__(self, position, face1, color1, face2, color2, face3, color3):
         """Initialize a corner cubie.
         
@@ -114,4 +125,326 @@ class CornerCubie(Cubie):
     
     def __str__(self):
         """String representation of the corner cubie."""
-        return f"Corner at {self.position} with colors {self.colors}" 
\ No newline at end of file
+        return f"Corner at {self.position} with colors {self.colors}" 
+
+# Piece-level (cubie) model used by the solver, following Kociemba's conventions.
+# Corners and edges are named by the faces they touch; each corner lists its
+# U/D face first and then the other two faces clockwise.
+CORNER_NAMES = ('URF', 'UFL', 'ULB', 'UBR', 'DFR', 'DLF', 'DBL', 'DRB')
+EDGE_NAMES = ('UR', 'UF', 'UL', 'UB', 'DR', 'DF', 'DL', 'DB', 'FR', 'FL', 'BL', 'BR')
+
+FACE_LETTERS = {
+    'U': 'up',
+    'R': 'right',
+    'F': 'front',
+    'D': 'down',
+    'L': 'left',
+    'B': 'back'
+}
+
+# Number of distinct values of each coordinate
+N_TWIST = 2187        # 3^7 corner orientations
+N_FLIP = 2048         # 2^11 edge orientations
+N_SLICE = 495         # C(12, 4) positions of the four UD-slice edges
+N_CORNER_PERM = 40320  # 8! corner permutations
+N_EDGE8_PERM = 40320   # 8! permutations of the U and D layer edges
+N_SLICE_PERM = 24      # 4! permutations of the UD-slice edges
+N_EDGE_PERM = 479001600  # 12! edge permutations
+
+_FACTORIALS = (1, 1, 2, 6, 24, 120, 720, 5040, 40320, 362880, 3628800, 39916800, 479001600)
+
+
+def _binomial(n, k):
+    """Binomial coefficient, 0 when n < k."""
+    if n < k:
+        return 0
+    result = 1
+    for i in range(k):
+        result = result * (n - i) // (i + 1)
+    return result
+
+
+def _piece_facelets(names):
+    """Sticker indices of each piece, in the order its name lists the faces."""
+    facelets = []
+    for name in names:
+        faces = [FACE_LETTERS[letter] for letter in name]
+        position = tuple(sum(FACE_NORMALS[face][axis] for face in faces) for axis in range(3))
+        facelets.append(tuple(FACELET_INDEX[(position, face)] for face in faces))
+    return tuple(facelets)
+
+
+def _rank_permutation(perm):
+    """Lexicographic rank (Lehmer code) of a permutation of 0..n-1."""
+    n = len(perm)
+    rank = 0
+    for i in range(n - 1):
+        smaller = 0
+        for j in range(i + 1, n):
+            if perm[j] < perm[i]:
+                smaller += 1
+        rank += smaller * _FACTORIALS[n - 1 - i]
+    return rank
+
+
+def _unrank_permutation(rank, n):
+    """Inverse of _rank_permutation."""
+    remaining = list(range(n))
+    perm = []
+    for i in range(n - 1, -1, -1):
+        index, rank = divmod(rank, _FACTORIALS[i])
+        perm.append(remaining.pop(index))
+    return perm
+
+
+class CubieCube:
+    """Array-backed cube described by its pieces rather than its stickers.
+    
+    cp[i] is the corner in corner position i and co[i] its twist (0-2);
+    ep[i] is the edge in edge position i and eo[i] its flip (0-1). Each array
+    is a bytearray, so a whole cube takes a few hundred bytes.
+    """
+    
+    __slots__ = ('cp', 'co', 'ep', 'eo')
+    
+    def __init__(self, cp=None, co=None, ep=None, eo=None):
+        """Initialize a cube, solved unless the piece arrays are given."""
+        self.cp = bytearray(cp if cp is not None else range(8))
+        self.co = bytearray(co if co is not None else 8)
+        self.ep = bytearray(ep if ep is not None else range(12))
+        self.eo = bytearray(eo if eo is not None else 12)
+    
+    def __eq__(self, other):
+        return (isinstance(other, CubieCube) and self.cp == other.cp and self.co == other.co
+                and self.ep == other.ep and self.eo == other.eo)
+    
+    def __repr__(self):
+        return (f"CubieCube(cp={list(self.cp)}, co={list(self.co)}, "
+                f"ep={list(self.ep)}, eo={list(self.eo)})")
+    
+    def copy(self):
+        """Return an independent copy of the cube."""
+        return CubieCube(self.cp, self.co, self.ep, self.eo)
+    
+    def multiply(self, other):
+        """Return the cube obtained by applying other after this cube."""
+        cp = [self.cp[i] for i in other.cp]
+        co = [(self.co[i] + twist) % 3 for i, twist in zip(other.cp, other.co)]
+        ep = [self.ep[i] for i in other.ep]
+        eo = [(self.eo[i] + flip) % 2 for i, flip in zip(other.ep, other.eo)]
+        return CubieCube(cp, co, ep, eo)
+    
+    @classmethod
+    def from_facelets(cls, stickers):
+        """Build a cubie cube from a 54-sticker state.
+        
+        Stickers may use any labels (color names, face names); each label is
+        mapped to the face whose center carries it.
+        
+        Raises:
+            ValueError: If the stickers do not describe a solvable cube.
+        """
+        if len(stickers) != 54:
+            raise ValueError("A cube state needs 54 stickers")
+        face_of = {stickers[index * 9 + 4]: face for index, face in enumerate(FACE_ORDER)}
+        if len(face_of) != 6:
+            raise ValueError("Center stickers must all be different")
+        try:
+            faces = [face_of[sticker] for sticker in stickers]
+        except KeyError as e:
+            raise ValueError(f"Unknown sticker color: {e.args[0]}") from None
+        if any(faces.count(face) != 9 for face in FACE_ORDER):
+            raise ValueError("Each color must appear exactly 9 times")
+        
+        cube = cls()
+        for i, facelets in enumerate(CORNER_FACELETS):
+            names = [faces[f] for f in facelets]
+            ori = next((n for n in range(3) if names[n] in ('up', 'down')), None)
+            corner = _CORNER_LOOKUP.get((names[(ori + 1) % 3], names[(ori + 2) % 3])) \
+                if ori is not None else None
+            if corner is None:
+                raise ValueError("Invalid corner piece")
+            cube.cp[i] = corner
+            cube.co[i] = ori
+        
+        for i, facelets in enumerate(EDGE_FACELETS):
+            names = (faces[facelets[0]], faces[facelets[1]])
+            if names in _EDGE_LOOKUP:
+                cube.ep[i] = _EDGE_LOOKUP[names]
+                cube.eo[i] = 0
+            elif names[::-1] in _EDGE_LOOKUP:
+                cube.ep[i] = _EDGE_LOOKUP[names[::-1]]
+                cube.eo[i] = 1
+            else:
+                raise ValueError("Invalid edge piece")
+        
+        cube.verify()
+        return cube
+    
+    def to_facelets(self, colors):
+        """Render the cube as a 54-sticker tuple.
+        
+        Args:
+            colors: Mapping from face name to the sticker label for that face.
+        """
+        stickers = [None] * 54
+        for index, face in enumerate(FACE_ORDER):
+            stickers[index * 9 + 4] = colors[face]
+        for i, facelets in enumerate(CORNER_FACELETS):
+            corner_faces = CORNER_FACES[self.cp[i]]
+            for n in range(3):
+                stickers[facelets[(n + self.co[i]) % 3]] = colors[corner_faces[n]]
+        for i, facelets in enumerate(EDGE_FACELETS):
+            edge_faces = EDGE_FACES[self.ep[i]]
+            for n in range(2):
+                stickers[facelets[(n + self.eo[i]) % 2]] = colors[edge_faces[n]]
+        return tuple(stickers)
+    
+    def verify(self):
+        """Check that the cube can be reached by face turns.
+        
+        Raises:
+            ValueError: If pieces are missing or duplicated, or the cube is
+                        twisted, flipped or has mismatched permutation parity.
+        """
+        if sorted(self.cp) != list(range(8)) or sorted(self.ep) != list(range(12)):
+            raise ValueError("Each piece must appear exactly once")
+        if sum(self.co) % 3:
+            raise ValueError("A corner is twisted")
+        if sum(self.eo) % 2:
+            raise ValueError("An edge is flipped")
+        if self.corner_parity() != self.edge_parity():
+            raise ValueError("Two pieces are swapped")
+    
+    def corner_parity(self):
+        """Parity of the corner permutation."""
+        return _parity(self.cp)
+    
+    def edge_parity(self):
+        """Parity of the edge permutation."""
+        return _parity(self.ep)
+    
+    # Coordinates -------------------------------------------------------
+    
+    def get_twist(self):
+        """Corner orientation coordinate (0 <= twist < 3^7)."""
+        twist = 0
+        for i in range(7):
+            twist = twist * 3 + self.co[i]
+        return twist
+    
+    def set_twist(self, twist):
+        parity = 0
+        for i in range(6, -1, -1):
+            twist, self.co[i] = divmod(twist, 3)
+            parity += self.co[i]
+        self.co[7] = -parity % 3
+    
+    def get_flip(self):
+        """Edge orientation coordinate (0 <= flip < 2^11)."""
+        flip = 0
+        for i in range(11):
+            flip = flip * 2 + self.eo[i]
+        return flip
+    
+    def set_flip(self, flip):
+        parity = 0
+        for i in range(10, -1, -1):
+            flip, self.eo[i] = divmod(flip, 2)
+            parity += self.eo[i]
+        self.eo[11] = parity % 2
+    
+    def get_slice(self):
+        """Positions of the four UD-slice edges (FR, FL, BL, BR), 0 when solved."""
+        slice_coord = 0
+        found = 0
+        for j in range(11, -1, -1):
+            if self.ep[j] >= 8:
+                slice_coord += _binomial(11 - j, found + 1)
+                found += 1
+        return slice_coord
+    
+    def set_slice(self, slice_coord):
+        slice_edges = [8, 9, 10, 11]
+        other_edges = [0, 1, 2, 3, 4, 5, 6, 7]
+        remaining = 3
+        for j in range(12):
+            if remaining >= 0 and slice_coord - _binomial(11 - j, remaining + 1) >= 0:
+                self.ep[j] = slice_edges[3 - remaining]
+                slice_coord -= _binomial(11 - j, remaining + 1)
+                remaining -= 1
+            else:
+                self.ep[j] = other_edges.pop(0)
+    
+    def get_corner_perm(self):
+        """Rank of the corner permutation (0 <= corner_perm < 8!)."""
+        return _rank_permutation(self.cp)
+    
+    def set_corner_perm(self, rank):
+        self.cp = bytearray(_unrank_permutation(rank, 8))
+    
+    def get_edge8_perm(self):
+        """Rank of the U and D layer edges, valid once the slice edges are in the slice."""
+        return _rank_permutation(self.ep[:8])
+    
+    def set_edge8_perm(self, rank):
+        self.ep[:8] = bytes(_unrank_permutation(rank, 8))
+    
+    def get_slice_perm(self):
+        """Rank of the UD-slice edges, valid once they are in the slice."""
+        return _rank_permutation([edge - 8 for edge in self.ep[8:]])
+    
+    def set_slice_perm(self, rank):
+        self.ep[8:] = bytes(edge + 8 for edge in _unrank_permutation(rank, 4))
+    
+    def get_edge_perm(self):
+        """Rank of the full edge permutation (0 <= edge_perm < 12!)."""
+        return _rank_permutation(self.ep)
+    
+    def set_edge_perm(self, rank):
+        self.ep = bytearray(_unrank_permutation(rank, 12))
+    
+    # Integer encoding --------------------------------------------------
+    
+    def encode(self):
+        """Pack the whole cube into one integer, e.g. for hashing or storage.
+        
+        Returns:
+            ((corner_perm * 3^7 + twist) * 12! + edge_perm) * 2^11 + flip
+        """
+        corners = self.get_corner_perm() * N_TWIST + self.get_twist()
+        return (corners * N_EDGE_PERM + self.get_edge_perm()) * N_FLIP + self.get_flip()
+    
+    @classmethod
+    def decode(cls, key):
+        """Rebuild a cube from an integer produced by encode()."""
+        cube = cls()
+        key, flip = divmod(key, N_FLIP)
+        key, edge_perm = divmod(key, N_EDGE_PERM)
+        corner_perm, twist = divmod(key, N_TWIST)
+        cube.set_corner_perm(corner_perm)
+        cube.set_twist(twist)
+        cube.set_edge_perm(edge_perm)
+        cube.set_flip(flip)
+        return cube
+
+
+def _parity(perm):
+    """Parity (0 even, 1 odd) of a permutation."""
+    parity = 0
+    for i in range(len(perm)):
+        for j in range(i + 1, len(perm)):
+            if perm[j] < perm[i]:
+                parity ^= 1
+    return parity
+
+
+CORNER_FACES = tuple(tuple(FACE_LETTERS[letter] for letter in name) for name in CORNER_NAMES)
+EDGE_FACES = tuple(tuple(FACE_LETTERS[letter] for letter in name) for name in EDGE_NAMES)
+
+# Sticker indices of each corner and edge position
+CORNER_FACELETS = _piece_facelets(CORNER_NAMES)
+EDGE_FACELETS = _piece_facelets(EDGE_NAMES)
+
+_CORNER_LOOKUP = {(faces[1], faces[2]): corner for corner, faces in enumerate(CORNER_FACES)}
+_EDGE_LOOKUP = {faces: edge for edge, faces in enumerate(EDGE_FACES)}
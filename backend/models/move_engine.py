@@ -0,0 +1,303 @@
+"""Permutation-table move engine for the Rubik's cube.
+
+A cube state is an immutable tuple of 54 stickers. Faces are stored in
+FACE_INDICES order (left, right, up, down, front, back) and each face is
+row-major, so the tuple is exactly the 2D frontend state flattened.
+
+Every move is precomputed once as a 54-entry index permutation, and
+applying a move is a single indexed gather over the state tuple. Face
+turns come straight from EDGE_STICKERS; slice, wide and whole-cube moves
+are derived from the sticker geometry those face turns imply.
+"""
+from operator import itemgetter
+
+# Face indices for 2D representation (matching frontend)
+FACE_INDICES = {
+    'left': 0,
+    'right': 1,
+    'up': 2,
+    'down': 3,
+    'front': 4,
+    'back': 5
+}
+
+# Faces in the order they are stored in a state
+FACE_ORDER = ('left', 'right', 'up', 'down', 'front', 'back')
+
+# Face normals (direction vectors)
+FACE_NORMALS = {
+    'up': (0, 1, 0),
+    'down': (0, -1, 0),
+    'left': (-1, 0, 0),
+    'right': (1, 0, 0),
+    'front': (0, 0, 1),
+    'back': (0, 0, -1)
+}
+
+# Definition of edge stickers affected when rotating each face
+# Format: [face, [indices of affected stickers on that face]]
+EDGE_STICKERS = {
+    'front': [
+        ['up', [6, 7, 8]],     # Bottom row of up face
+        ['right', [0, 3, 6]],  # Left column of right face
+        ['down', [2, 1, 0]],   # Top row of down face (reversed)
+        ['left', [8, 5, 2]]    # Right column of left face
+    ],
+    'back': [
+        ['up', [2, 1, 0]],     # Top row of up face (reversed)
+        ['left', [0, 3, 6]],   # Left column of left face
+        ['down', [6, 7, 8]],   # Bottom row of down face (reversed)
+        ['right', [8, 5, 2]]   # Right column of right face
+    ],
+    'up': [
+        ['back', [0, 1, 2]],   # Top row of back face
+        ['right', [0, 1, 2]],  # Top row of right face
+        ['front', [0, 1, 2]],  # Top row of front face
+        ['left', [0, 1, 2]]    # Top row of left face
+    ],
+    'down': [
+        ['front', [6, 7, 8]],  # Bottom row of front face
+        ['right', [6, 7, 8]],  # Bottom row of right face
+        ['back', [6, 7, 8]],   # Bottom row of back face
+        ['left', [6, 7, 8]]    # Bottom row of left face
+    ],
+    'left': [
+        ['up', [0, 3, 6]],     # Left column of up face
+        ['front', [0, 3, 6]],  # Left column of front face
+        ['down', [0, 3, 6]],   # Left column of down face
+        ['back', [8, 5, 2]]    # Right column of back face (reversed)
+    ],
+    'right': [
+        ['up', [8, 5, 2]],     # Right column of up face
+        ['back', [0, 3, 6]],   # Left column of back face (reversed)
+        ['down', [8, 5, 2]],   # Right column of down face
+        ['front', [8, 5, 2]]   # Right column of front face
+    ]
+}
+
+# Standard notation letter for each face
+MOVE_FACES = {
+    'F': 'front',
+    'B': 'back',
+    'L': 'left',
+    'R': 'right',
+    'U': 'up',
+    'D': 'down'
+}
+
+# Moves that turn more than one layer: (face whose turn they follow, layers)
+# Layers are measured along the face normal: 1 is the face itself, 0 the
+# middle slice and -1 the opposite face.
+SLICE_MOVES = {
+    'M': ('left', (0,)),
+    'E': ('down', (0,)),
+    'S': ('front', (0,))
+}
+WIDE_MOVES = {letter.lower(): (face, (1, 0)) for letter, face in MOVE_FACES.items()}
+ROTATION_MOVES = {
+    'x': ('right', (1, 0, -1)),
+    'y': ('up', (1, 0, -1)),
+    'z': ('front', (1, 0, -1))
+}
+
+# Where each sticker of a face comes from when the face turns clockwise
+_FACE_ROTATION = (6, 3, 0, 7, 4, 1, 8, 5, 2)
+
+IDENTITY = tuple(range(54))
+
+
+def compose(first, second):
+    """Compose two permutations.
+
+    Args:
+        first: The permutation applied first.
+        second: The permutation applied second.
+
+    Returns:
+        A permutation equivalent to applying first and then second.
+    """
+    return tuple(first[i] for i in second)
+
+
+def invert(perm):
+    """Return the inverse of a permutation."""
+    inverse = [0] * len(perm)
+    for target, source in enumerate(perm):
+        inverse[source] = target
+    return tuple(inverse)
+
+
+def _clockwise_permutation(face):
+    """Build the sticker permutation for a clockwise turn of a face.
+
+    The permutation is a gather: sticker i of the new state is sticker
+    perm[i] of the old state.
+    """
+    perm = list(IDENTITY)
+
+    # 1. Rotate the face itself
+    base = FACE_INDICES[face] * 9
+    for i, source in enumerate(_FACE_ROTATION):
+        perm[base + i] = base + source
+
+    # 2. Move the edge stickers (each edge takes the previous edge's stickers)
+    edge_def = EDGE_STICKERS[face]
+    for i, (adj_face_name, indices) in enumerate(edge_def):
+        prev_face_name, prev_indices = edge_def[i - 1]
+        adj_base = FACE_INDICES[adj_face_name] * 9
+        prev_base = FACE_INDICES[prev_face_name] * 9
+        for sticker_idx, prev_idx in zip(indices, prev_indices):
+            perm[adj_base + sticker_idx] = prev_base + prev_idx
+
+    return tuple(perm)
+
+
+def _add_turns(perms, letter, clockwise):
+    """Register the quarter, half and prime turns of a move."""
+    perms[letter] = clockwise
+    perms[letter + '2'] = compose(clockwise, clockwise)
+    perms[letter + "'"] = invert(clockwise)
+
+
+def _dot(a, b):
+    return a[0] * b[0] + a[1] * b[1] + a[2] * b[2]
+
+
+def _quarter_turn(axis, sign):
+    """Return a function rotating integer vectors 90 degrees about an axis."""
+    ax, ay, az = axis
+
+    def rotate(v):
+        x, y, z = v
+        along = ax * x + ay * y + az * z
+        cross = (ay * z - az * y, az * x - ax * z, ax * y - ay * x)
+        return tuple(along * a + sign * c for a, c in zip(axis, cross))
+
+    return rotate
+
+
+def _sticker_geometry(face_perms):
+    """Derive the 3D position of every sticker from the face turns.
+
+    A sticker belongs to a piece touching its own face plus every face
+    whose turn moves it, so its position is the sum of those face normals.
+    """
+    positions = []
+    for index in IDENTITY:
+        faces = {FACE_ORDER[index // 9]}
+        faces.update(face for face, perm in face_perms.items() if perm[index] != index)
+        positions.append(tuple(sum(FACE_NORMALS[face][axis] for face in faces)
+                               for axis in range(3)))
+    normals = [FACE_NORMALS[FACE_ORDER[index // 9]] for index in IDENTITY]
+    return tuple(positions), tuple(normals)
+
+
+def _face_turn_sign(face, perm):
+    """Find the direction of the quarter turn about a face normal matching its permutation."""
+    normal = FACE_NORMALS[face]
+    for sign in (1, -1):
+        rotate = _quarter_turn(normal, sign)
+        if all(rotate(STICKER_POSITIONS[source]) == STICKER_POSITIONS[target]
+               for target, source in enumerate(perm)
+               if _dot(STICKER_POSITIONS[target], normal) == 1):
+            return sign
+    raise ValueError(f"EDGE_STICKERS for {face} do not describe a quarter turn")
+
+
+def _layer_permutation(face, layers):
+    """Build the permutation turning the given layers the way a face turns."""
+    normal = FACE_NORMALS[face]
+    # Each sticker comes from where the inverse rotation takes it
+    unrotate = _quarter_turn(normal, -_face_turn_sign(face, _FACE_PERMUTATIONS[face]))
+    perm = list(IDENTITY)
+    for target in IDENTITY:
+        position = STICKER_POSITIONS[target]
+        if _dot(position, normal) in layers:
+            key = (unrotate(position), unrotate(STICKER_NORMALS[target]))
+            perm[target] = _STICKER_LOOKUP[key]
+    return tuple(perm)
+
+
+_FACE_PERMUTATIONS = {face: _clockwise_permutation(face) for face in FACE_ORDER}
+
+# 3D position and outward normal of each sticker
+STICKER_POSITIONS, STICKER_NORMALS = _sticker_geometry(_FACE_PERMUTATIONS)
+_STICKER_LOOKUP = {(STICKER_POSITIONS[i], STICKER_NORMALS[i]): i for i in IDENTITY}
+
+# Sticker index of each (cubie position, face) pair, e.g. ((1, 1, 1), 'up') -> 26
+FACELET_INDEX = {(STICKER_POSITIONS[i], FACE_ORDER[i // 9]): i for i in IDENTITY}
+
+
+def _build_move_permutations():
+    """Precompute the permutations for face, slice, wide and rotation moves."""
+    perms = {}
+    for letter, face in MOVE_FACES.items():
+        _add_turns(perms, letter, _FACE_PERMUTATIONS[face])
+    for moves in (SLICE_MOVES, WIDE_MOVES, ROTATION_MOVES):
+        for letter, (face, layers) in moves.items():
+            _add_turns(perms, letter, _layer_permutation(face, layers))
+    return perms
+
+
+# Permutation for each move in standard notation ('U', "U'", 'U2', 'M', 'r', 'x', ...)
+MOVE_PERMUTATIONS = _build_move_permutations()
+
+_GATHERS = {move: itemgetter(*perm) for move, perm in MOVE_PERMUTATIONS.items()}
+
+
+def apply_move(state, move):
+    """Apply a single move to a state.
+
+    Args:
+        state: A tuple of 54 stickers.
+        move: A move in standard notation ('F', "F'", 'F2', ...).
+
+    Returns:
+        The new state tuple.
+
+    Raises:
+        ValueError: If the move is not recognized.
+    """
+    gather = _GATHERS.get(move)
+    if gather is None:
+        raise ValueError(f"Invalid move: {move}")
+    return gather(state)
+
+
+def apply_permutation(state, perm):
+    """Apply an arbitrary 54-entry permutation to a state."""
+    return itemgetter(*perm)(state)
+
+
+def state_from_2d(cube_2d_state):
+    """Convert the 2D frontend format (six lists of 9 colors) to a state tuple."""
+    return tuple(sticker for face in cube_2d_state for sticker in face)
+
+
+def state_to_2d(state):
+    """Convert a state tuple to the 2D frontend format."""
+    return [list(state[i:i + 9]) for i in range(0, 54, 9)]
+
+
+def state_to_3d(state):
+    """Convert a state tuple to six 3x3 grids in FACE_INDICES order."""
+    return [[list(state[i:i + 3]), list(state[i + 3:i + 6]), list(state[i + 6:i + 9])]
+            for i in range(0, 54, 9)]
+
+
+def apply_moves(state, moves):
+    """Apply a sequence of moves to a state.
+
+    Args:
+        state: A tuple of 54 stickers.
+        moves: A list of moves in standard notation.
+
+    Returns:
+        The final state tuple.
+
+    Raises:
+        ValueError: If any move is not recognized.
+    """
+    for move in moves:
+        state = apply_move(state, move)
+    return state
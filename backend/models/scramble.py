@@ -0,0 +1,55 @@
+"""Uniformly random scrambles.
+
+A random state is drawn directly in coordinates: a corner permutation,
+corner twist, edge permutation and edge flip, each uniform over its range.
+The last twist and flip follow from the others, and when the two
+permutations have different parities two edges are swapped. Swapping is a
+bijection between the odd and even edge permutations, so every reachable
+state is equally likely.
+
+The two-phase solver then finds a short solution for the state, and the
+inverse of that solution is the scramble.
+"""
+import random
+
+from models.algorithm import invert_algorithm
+from models.cube import RubiksCube
+from models.cubie import N_CORNER_PERM, N_EDGE_PERM, N_FLIP, N_TWIST, CubieCube
+
+_random = random.SystemRandom()
+
+
+def random_cubie_cube(rng=_random):
+    """Return a cube drawn uniformly from all reachable states.
+
+    Args:
+        rng: A random.Random instance (the system source by default).
+    """
+    cube = CubieCube()
+    cube.set_corner_perm(rng.randrange(N_CORNER_PERM))
+    cube.set_twist(rng.randrange(N_TWIST))
+    cube.set_edge_perm(rng.randrange(N_EDGE_PERM))
+    cube.set_flip(rng.randrange(N_FLIP))
+    if cube.corner_parity() != cube.edge_parity():
+        cube.ep[0], cube.ep[1] = cube.ep[1], cube.ep[0]
+    return cube
+
+
+def generate_scramble(solver, rng=_random, **solve_options):
+    """Return a scramble reaching a uniformly random state.
+
+    Args:
+        solver: A TwoPhaseSolver.
+        rng: A random.Random instance.
+        **solve_options: Passed on to TwoPhaseSolver.solve().
+
+    Returns:
+        A (moves, state) tuple: the scramble and the 54-sticker state it
+        leads to from the solved cube, or None if no solution was found in
+        time.
+    """
+    state = random_cubie_cube(rng).to_facelets(RubiksCube.COLORS)
+    solution = solver.solve(state, **solve_options)
+    if solution is None:
+        return None
+    return invert_algorithm(solution), state
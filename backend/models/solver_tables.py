@@ -0,0 +1,242 @@
+"""Versioned, checksummed binary file holding every solver's lookup tables.
+
+The two-phase solver and the stage solver both rely on tables that take
+seconds to generate. They are built offline (``python build_tables.py``)
+into one file next to data.json, and each process maps that file read-only
+with mmap, so workers share its pages and start in milliseconds.
+
+File layout::
+
+    b'RCTB' | uint32 header length | JSON header | padding | table data
+
+The header records the file format version, the table version of every
+solver module, a CRC-32 of the data region and the offset, dtype and shape
+of each table (8-byte aligned). A file written by another version, or whose
+checksum does not match, is stale and is rebuilt lazily in a background
+thread; tables are never generated on the request path or at import time.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from models import stage_solver, two_phase
+
+# Location of the table file, next to data.json
+TABLE_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'solver_tables.bin')
+
+# Version of the file layout itself
+FORMAT_VERSION = 1
+
+# Modules providing tables: each has TABLES_VERSION and generate_tables()
+TABLE_SETS = {
+    'two_phase': two_phase,
+    'stages': stage_solver,
+}
+
+_MAGIC = b'RCTB'
+_ALIGNMENT = 8
+
+
+class StaleTablesError(ValueError):
+    """Raised when the table file is missing, corrupt or from another version."""
+
+
+def table_versions():
+    """Versions the table file must have been written with."""
+    return {name: module.TABLES_VERSION for name, module in TABLE_SETS.items()}
+
+
+def generate_tables():
+    """Generate the tables of every solver.
+
+    Returns:
+        A dict mapping each table set name to a dict of numpy arrays.
+    """
+    return {name: module.generate_tables() for name, module in TABLE_SETS.items()}
+
+
+def _aligned(size):
+    return -(-size // _ALIGNMENT) * _ALIGNMENT
+
+
+def write_tables(tables, path=TABLE_PATH):
+    """Write tables to a versioned, checksummed file.
+
+    The file is written under a temporary name and renamed into place, so
+    processes mapping the previous file are never exposed to a partial one.
+
+    Args:
+        tables: A dict of table sets as returned by generate_tables().
+        path: Where to write the file.
+    """
+    index = {}
+    chunks = []
+    offset = 0
+    for set_name, arrays in tables.items():
+        for name, array in arrays.items():
+            data = np.ascontiguousarray(array).tobytes()
+            index[f"{set_name}/{name}"] = {'offset': offset, 'dtype': array.dtype.str,
+                                           'shape': list(array.shape)}
+            chunks.append(data + bytes(_aligned(len(data)) - len(data)))
+            offset += _aligned(len(data))
+
+    checksum = 0
+    for chunk in chunks:
+        checksum = zlib.crc32(chunk, checksum)
+
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'versions': table_versions(),
+        'crc32': checksum,
+        'tables': index,
+    }).encode()
+    prefix = _MAGIC + struct.pack('<I', len(header)) + header
+    prefix += bytes(_aligned(len(prefix)) - len(prefix))
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(prefix)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def load_tables(path=TABLE_PATH, verify=True):
+    """Map a table file into memory.
+
+    Args:
+        path: The table file.
+        verify: Whether to check the data against the stored CRC-32.
+
+    Returns:
+        A dict mapping each table set name to a dict of flat memoryviews over
+        the shared mapping.
+
+    Raises:
+        StaleTablesError: If the file is missing, corrupt or was written for
+                          other table versions.
+    """
+    try:
+        with open(path, 'rb') as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError) as e:
+        raise StaleTablesError(f"Cannot map {path}: {e}") from None
+
+    try:
+        if mapping[:len(_MAGIC)] != _MAGIC:
+            raise StaleTablesError(f"{path} is not a solver table file")
+        header_length, = struct.unpack_from('<I', mapping, len(_MAGIC))
+        header_end = len(_MAGIC) + 4 + header_length
+        header = json.loads(mapping[len(_MAGIC) + 4:header_end])
+    except (struct.error, ValueError) as e:
+        raise StaleTablesError(f"{path} has a corrupt header: {e}") from None
+
+    if header.get('format') != FORMAT_VERSION or header.get('versions') != table_versions():
+        raise StaleTablesError(f"{path} was written for other table versions")
+
+    view = memoryview(mapping)[_aligned(header_end):]
+    if verify and zlib.crc32(view) != header.get('crc32'):
+        raise StaleTablesError(f"{path} failed its checksum")
+
+    tables = {name: {} for name in TABLE_SETS}
+    for key, info in header['tables'].items():
+        set_name, name = key.split('/', 1)
+        dtype = np.dtype(info['dtype'])
+        start = info['offset']
+        nbytes = dtype.itemsize * int(np.prod(info['shape']))
+        if start + nbytes > len(view):
+            raise StaleTablesError(f"{path} is truncated")
+        tables[set_name][name] = view[start:start + nbytes].cast(dtype.char)
+    return tables
+
+
+# Shared tables and solvers ----------------------------------------------------
+
+_tables = None
+_solvers = {}
+_lock = threading.Lock()
+_build_thread = None
+
+
+def preload(path=TABLE_PATH):
+    """Map the table file at startup if it is present and current.
+
+    This never generates tables, so it is safe to call while the app starts.
+
+    Returns:
+        True if the tables are loaded.
+    """
+    global _tables
+    with _lock:
+        if _tables is None:
+            try:
+                _tables = load_tables(path)
+            except StaleTablesError:
+                return False
+    return True
+
+
+def tables_loaded():
+    """Return True once the tables are mapped, without loading or building them."""
+    return _tables is not None
+
+
+def rebuild(path=TABLE_PATH):
+    """Generate the tables, write them to disk and use them."""
+    global _tables
+    tables = generate_tables()
+    write_tables(tables, path)
+    loaded = load_tables(path)
+    with _lock:
+        _tables = loaded
+        _solvers.clear()
+
+
+def get_tables(wait=True):
+    """Return the shared tables, loading or rebuilding them if needed.
+
+    Args:
+        wait: If False and the file is missing or stale, start rebuilding it
+              in a background thread and return None instead of blocking.
+    """
+    global _build_thread
+    if _tables is not None or preload():
+        return _tables
+
+    if wait:
+        if _build_thread is not None and _build_thread.is_alive():
+            _build_thread.join()
+        else:
+            rebuild()
+        return _tables
+
+    with _lock:
+        if _build_thread is None or not _build_thread.is_alive():
+            _build_thread = threading.Thread(target=rebuild, name='solver-tables', daemon=True)
+            _build_thread.start()
+    return None
+
+
+def _get_solver(set_name, solver_class, wait):
+    solver = _solvers.get(set_name)
+    if solver is None:
+        tables = get_tables(wait)
+        if tables is None:
+            return None
+        solver = _solvers.setdefault(set_name, solver_class(tables[set_name]))
+    return solver
+
+
+def get_two_phase_solver(wait=True):
+    """Return the shared two-phase solver, or None while its tables are being built."""
+    return _get_solver('two_phase', two_phase.TwoPhaseSolver, wait)
+
+
+def get_stage_solver(wait=True):
+    """Return the shared stage solver, or None while its tables are being built."""
+    return _get_solver('stages', stage_solver.StageSolver, wait)
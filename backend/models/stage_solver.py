@@ -0,0 +1,319 @@
+"""Layer-by-layer solver following the stages taught in the learning modules.
+
+The cube is solved with white on top, one stage at a time: white cross,
+white corners, middle layer, then the yellow cross, yellow face, yellow
+corners and yellow edges on the bottom.
+
+Each stage tracks only its own four pieces. A piece's state is the location
+of one of its stickers (24 possibilities per piece, which covers both its
+position and its orientation), so the joint state of a stage is an index
+below 24**4. For every stage a breadth-first search from the goal over the
+stage's macro moves gives the distance of every joint state, and solving a
+stage is a walk down that table: at each step take the first macro that
+gets one step closer. Every macro of a stage leaves the earlier stages
+intact, so stages never undo each other's work.
+
+The distance tables are stored in the shared solver table file (see
+models.solver_tables) rather than rebuilt by every process.
+"""
+from itertools import product
+
+import numpy as np
+
+from models.algorithm import compile_algorithm, invert_algorithm, parse_algorithm
+from models.cube import RubiksCube
+from models.cubie import CORNER_FACELETS, CubieCube, EDGE_FACELETS
+from models.move_engine import apply_moves, invert
+
+# Pieces, by index into CORNER_NAMES / EDGE_NAMES
+WHITE_EDGES = (0, 1, 2, 3)        # UR UF UL UB
+YELLOW_EDGES = (4, 5, 6, 7)       # DR DF DL DB
+MIDDLE_EDGES = (8, 9, 10, 11)     # FR FL BL BR
+WHITE_CORNERS = (0, 1, 2, 3)      # URF UFL ULB UBR
+YELLOW_CORNERS = (4, 5, 6, 7)     # DFR DLF DBL DRB
+
+_D_TURNS = ('D', "D'", 'D2')
+_ROTATION_TURNS = ('x', "x'", 'x2', 'y', "y'", 'y2')
+_FACE_TURNS = tuple(face + suffix for face in 'UDLRFB' for suffix in ('', "'", '2'))
+
+# Relabelling the side faces as if the cube were turned a quarter about U/D
+_QUARTER_TURN = str.maketrans('FLBR', 'LBRF')
+
+# Unreached entries of a distance table
+_UNREACHED = 255
+
+
+def _around(algorithm):
+    """The four versions of an algorithm, one for each side of the cube."""
+    versions = [algorithm]
+    for _ in range(3):
+        versions.append(versions[-1].translate(_QUARTER_TURN))
+    return tuple(versions)
+
+
+# (name, piece kind, pieces, goal, macros, pieces every macro must keep in place)
+# A 'placed' goal needs each piece home; an 'oriented' goal only needs its
+# tracked sticker on the right face.
+STAGES = (
+    ('white_cross', 'edge', WHITE_EDGES, 'placed', _FACE_TURNS, ()),
+    ('white_corners', 'corner', WHITE_CORNERS, 'placed',
+     _D_TURNS + _around("R' D' R D"),
+     (('edge', WHITE_EDGES),)),
+    ('middle_layer', 'edge', MIDDLE_EDGES, 'placed',
+     _D_TURNS + _around("D L D' L' D' F' D F") + _around("D' R' D R D F D' F'"),
+     (('edge', WHITE_EDGES), ('corner', WHITE_CORNERS))),
+    ('yellow_cross', 'edge', YELLOW_EDGES, 'oriented',
+     _D_TURNS + ("F L D L' D' F'",),
+     (('edge', WHITE_EDGES + MIDDLE_EDGES), ('corner', WHITE_CORNERS))),
+    ('yellow_face', 'corner', YELLOW_CORNERS, 'oriented',
+     _D_TURNS + ("L D L' D L D2 L'",),
+     (('edge', WHITE_EDGES + MIDDLE_EDGES), ('corner', WHITE_CORNERS))),
+    ('yellow_corners', 'corner', YELLOW_CORNERS, 'placed',
+     _D_TURNS + ("L' F L' B2 L F' L' B2 L2",),
+     (('edge', WHITE_EDGES + MIDDLE_EDGES), ('corner', WHITE_CORNERS))),
+    ('yellow_edges', 'edge', YELLOW_EDGES, 'placed',
+     _around("L D' L D L D L D' L' D' L2") + _around("L2 D L D L' D' L' D' L' D L'"),
+     (('edge', WHITE_EDGES + MIDDLE_EDGES), ('corner', WHITE_CORNERS + YELLOW_CORNERS))),
+)
+
+STAGE_NAMES = tuple(stage[0] for stage in STAGES)
+
+# Bump whenever STAGES or the table layout changes, so stored tables are rebuilt
+TABLES_VERSION = 1
+
+_FACELETS = {'edge': EDGE_FACELETS, 'corner': CORNER_FACELETS}
+
+# Sticker indices a piece of each kind can occupy, numbered 0-23
+_LOCATIONS = {kind: tuple(sorted(i for facelets in pieces for i in facelets))
+              for kind, pieces in _FACELETS.items()}
+_LOCATION_INDEX = {kind: {sticker: n for n, sticker in enumerate(locations)}
+                   for kind, locations in _LOCATIONS.items()}
+# The other stickers on the same piece as each location
+_PARTNERS = {kind: {i: tuple(j for j in facelets if j != i)
+                    for facelets in pieces for i in facelets}
+             for kind, pieces in _FACELETS.items()}
+
+
+def _tracked_sticker(kind, piece):
+    """Home location of the sticker that tracks a piece (its U/D or F/B sticker)."""
+    return _FACELETS[kind][piece][0]
+
+
+def _destinations(perm, kind):
+    """Where each location of a piece kind is moved to by a permutation."""
+    inverse = invert(perm)
+    index = _LOCATION_INDEX[kind]
+    return np.array([index[inverse[sticker]] for sticker in _LOCATIONS[kind]], dtype=np.intp)
+
+
+def _goal_keys(kind, pieces, goal):
+    """Joint state indices of every goal state of a stage."""
+    index = _LOCATION_INDEX[kind]
+    homes = [_tracked_sticker(kind, piece) for piece in pieces]
+    if goal == 'placed':
+        choices = [[index[home]] for home in homes]
+    else:
+        choices = [[index[i] for i in _LOCATIONS[kind] if i // 9 == home // 9] for home in homes]
+
+    position = {}
+    for n, facelets in enumerate(_FACELETS[kind]):
+        for sticker in facelets:
+            position[index[sticker]] = n
+
+    keys = []
+    for locations in product(*choices):
+        if len({position[location] for location in locations}) == len(locations):
+            keys.append(_joint_key(locations))
+    return np.array(keys, dtype=np.int64)
+
+
+def _joint_key(locations):
+    key = 0
+    for location in locations:
+        key = key * 24 + location
+    return key
+
+
+def _move_keys(keys, destinations, count):
+    """Apply a location mapping to every piece of a batch of joint keys."""
+    result = np.zeros_like(keys)
+    for i in range(count):
+        digit = keys // 24 ** (count - 1 - i) % 24
+        result = result * 24 + destinations[digit]
+    return result
+
+
+class _Stage:
+    """Macros of one stage and the search that fills its distance table."""
+
+    def __init__(self, name, kind, pieces, goal, macros, keep):
+        self.name = name
+        self.kind = kind
+        self.pieces = pieces
+        self.goal = goal
+        self.macros = [parse_algorithm(macro) for macro in macros]
+        self.perms = [compile_algorithm(moves) for moves in self.macros]
+
+        for keep_kind, keep_pieces in keep:
+            for moves, perm in zip(self.macros, self.perms):
+                for piece in keep_pieces:
+                    if any(perm[i] != i for i in _FACELETS[keep_kind][piece]):
+                        raise ValueError(f"Macro {' '.join(moves)} of stage {name} "
+                                         f"disturbs an earlier stage")
+
+        self.destinations = [tuple(_destinations(perm, kind).tolist()) for perm in self.perms]
+
+    def search(self):
+        """Breadth-first distances from the goal states, going backwards over the macros."""
+        count = len(self.pieces)
+        distances = np.full(24 ** count, _UNREACHED, dtype=np.uint8)
+        goals = _goal_keys(self.kind, self.pieces, self.goal)
+        distances[goals] = 0
+        backwards = [_destinations(invert(perm), self.kind) for perm in self.perms]
+
+        frontier = goals
+        depth = 0
+        while len(frontier):
+            depth += 1
+            reached = []
+            for destinations in backwards:
+                keys = _move_keys(frontier, destinations, count)
+                keys = keys[distances[keys] == _UNREACHED]
+                distances[keys] = depth
+                reached.append(keys)
+            frontier = np.unique(np.concatenate(reached))
+        return distances
+
+    def key(self, stickers):
+        """Joint state index of this stage's pieces in a sticker state."""
+        index = _LOCATION_INDEX[self.kind]
+        partners = _PARTNERS[self.kind]
+        solved = RubiksCube.SOLVED_STATE
+        locations = []
+        for piece in self.pieces:
+            home = _tracked_sticker(self.kind, piece)
+            color = solved[home]
+            others = sorted(solved[j] for j in partners[home])
+            location = next(i for i in _LOCATIONS[self.kind]
+                            if stickers[i] == color
+                            and sorted(stickers[j] for j in partners[i]) == others)
+            locations.append(index[location])
+        return _joint_key(locations)
+
+    def walk(self, stickers, distances):
+        """Solve this stage by walking down its distance table.
+
+        Returns:
+            The moves of the stage and the state after them.
+        """
+        key = self.key(stickers)
+        distance = distances[key]
+        if distance == _UNREACHED:
+            raise ValueError(f"Cannot solve stage {self.name} from this state")
+
+        count = len(self.pieces)
+        moves = []
+        while distance:
+            for macro, destinations in zip(self.macros, self.destinations):
+                next_key = 0
+                for i in range(count):
+                    next_key = next_key * 24 + destinations[key // 24 ** (count - 1 - i) % 24]
+                if distances[next_key] == distance - 1:
+                    break
+            moves.extend(macro)
+            stickers = apply_moves(stickers, macro)
+            key, distance = next_key, distance - 1
+        return _merge_turns(moves), stickers
+
+
+def _merge_turns(moves):
+    """Merge consecutive turns of the same face (D D becomes D2, D D' cancels)."""
+    result = []
+    for move in moves:
+        turns = {'': 1, '2': 2, "'": 3}[move[1:]]
+        if result and result[-1][0] == move[0]:
+            turns = (turns + {'': 1, '2': 2, "'": 3}[result.pop()[1:]]) % 4
+            if turns:
+                result.append(move[0] + ('', '', '2', "'")[turns])
+        else:
+            result.append(move)
+    return result
+
+
+def generate_tables():
+    """Fill the distance table of every stage.
+
+    Returns:
+        A dict mapping stage names to uint8 arrays of 24**4 distances.
+    """
+    stages = [_Stage(*stage) for stage in STAGES]
+    return {stage.name: stage.search() for stage in stages}
+
+
+def _orientation_rotations():
+    """Whole-cube rotations bringing each possible center layout back to standard."""
+    centers = tuple(range(4, 54, 9))
+    solved_centers = tuple(RubiksCube.SOLVED_STATE[i] for i in centers)
+    rotations = {solved_centers: []}
+    frontier = [[]]
+    while frontier:
+        reached = []
+        for rotation in frontier:
+            for move in _ROTATION_TURNS:
+                if rotation and rotation[-1][0] == move[0]:
+                    continue
+                candidate = rotation + [move]
+                # The candidate turns this layout of centers back to standard
+                state = apply_moves(RubiksCube.SOLVED_STATE, invert_algorithm(candidate))
+                layout = tuple(state[i] for i in centers)
+                if layout not in rotations:
+                    rotations[layout] = candidate
+                    reached.append(candidate)
+        frontier = reached
+    return rotations
+
+
+_ROTATIONS = _orientation_rotations()
+
+
+class StageSolver:
+    """Beginner-method solver walking precomputed stage tables."""
+
+    def __init__(self, tables):
+        """Create a solver.
+
+        Args:
+            tables: A dict mapping stage names to their distance tables, as
+                    returned by generate_tables() or read from the table file.
+        """
+        self.stages = [(_Stage(*stage), tables[stage[0]]) for stage in STAGES]
+
+    def solve(self, stickers):
+        """Solve a cube stage by stage.
+
+        Args:
+            stickers: A 54-sticker state (see models.move_engine).
+
+        Returns:
+            A list of (stage name, moves) pairs in solving order. If the cube
+            is not held with white on top, the first stage starts with the
+            whole-cube rotations that fix that.
+
+        Raises:
+            ValueError: If the stickers do not describe a solvable cube.
+        """
+        stickers = tuple(stickers)
+        CubieCube.from_facelets(stickers)
+
+        rotation = _ROTATIONS.get(tuple(stickers[i] for i in range(4, 54, 9)))
+        if rotation is None:
+            raise ValueError("Center stickers do not match the cube's colors")
+        stickers = apply_moves(stickers, rotation)
+
+        result = []
+        for stage, distances in self.stages:
+            moves, stickers = stage.walk(stickers, distances)
+            if not result:
+                moves = rotation + moves
+            result.append((stage.name, moves))
+        return result
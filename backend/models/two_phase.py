@@ -0,0 +1,421 @@
+"""Kociemba-style two-phase solver.
+
+Phase 1 brings the cube into the subgroup G1 = <U, D, R2, L2, F2, B2>, where
+every piece is oriented and the four UD-slice edges sit in the slice. Phase 2
+solves the cube using only G1 moves. Both phases are IDA* searches over
+integer coordinates (see models.cubie.CubieCube) using precomputed move
+tables and pruning tables.
+
+The tables take a few seconds to generate, so they are written once to the
+shared solver table file and loaded with mmap (see models.solver_tables).
+Every worker process maps the same file read-only and shares its pages
+instead of rebuilding the tables.
+"""
+from bisect import bisect_left
+from itertools import permutations
+import time
+
+import numpy as np
+
+from models.cubie import CubieCube, N_EDGE8_PERM, N_FLIP, N_SLICE, N_SLICE_PERM, N_TWIST
+from models.move_engine import FACE_ORDER, MOVE_PERMUTATIONS
+
+# Search limits
+DEFAULT_TIME_BUDGET = 0.1    # seconds spent improving the solution
+DEFAULT_TARGET_LENGTH = 24   # stop as soon as a solution this short is found
+MAX_SEARCH_TIME = 2.0        # default seconds spent looking for a first solution
+MAX_PHASE1_DEPTH = 12
+MAX_PHASE2_DEPTH = 12
+MAX_SOLUTION_LENGTH = 30
+
+# Phase 2 states this close to solved are looked up instead of searched
+ENDGAME_DEPTH = 8
+
+# Bump whenever table generation changes, so stored tables are rebuilt
+TABLES_VERSION = 1
+
+# The 18 face turns in coordinate order: U U2 U' R R2 R' F ... B'
+SOLVER_FACES = 'URFDLB'
+SOLVER_MOVES = tuple(face + suffix for face in SOLVER_FACES for suffix in ('', '2', "'"))
+
+# Indices into SOLVER_MOVES of the moves that keep the cube in G1
+PHASE2_MOVES = (0, 1, 2, 4, 7, 9, 10, 11, 13, 16)
+
+_TIMEOUT_CHECK_INTERVAL = 256
+
+
+def _move_cubes():
+    """CubieCube for each solver move, derived from the move engine."""
+    return [CubieCube.from_facelets(tuple(FACE_ORDER[i // 9] for i in MOVE_PERMUTATIONS[move]))
+            for move in SOLVER_MOVES]
+
+
+MOVE_CUBES = _move_cubes()
+
+
+# Table generation ---------------------------------------------------------
+
+def _digits(values, base, count):
+    """Split each value into `count` digits, most significant first."""
+    digits = np.empty((len(values), count), dtype=np.int64)
+    for i in range(count - 1, -1, -1):
+        values, digits[:, i] = np.divmod(values, base)
+    return digits
+
+
+def _undigits(digits, base):
+    values = np.zeros(len(digits), dtype=np.int64)
+    for i in range(digits.shape[1]):
+        values = values * base + digits[:, i]
+    return values
+
+
+def _rank_permutations(perms):
+    """Vectorized lexicographic rank of each row of a permutation array."""
+    n = perms.shape[1]
+    ranks = np.zeros(len(perms), dtype=np.int64)
+    factorial = 1
+    for i in range(n - 2, -1, -1):
+        factorial *= n - 1 - i
+        smaller = (perms[:, i + 1:] < perms[:, i:i + 1]).sum(axis=1)
+        ranks += smaller * factorial
+    return ranks
+
+
+def _twist_move_table():
+    co = _digits(np.arange(N_TWIST), 3, 7)
+    co = np.hstack([co, (-co.sum(axis=1) % 3)[:, None]])
+    table = np.empty((N_TWIST, len(MOVE_CUBES)), dtype=np.uint16)
+    for m, move in enumerate(MOVE_CUBES):
+        new_co = (co[:, move.cp] + move.co) % 3
+        table[:, m] = _undigits(new_co[:, :7], 3)
+    return table
+
+
+def _flip_move_table():
+    eo = _digits(np.arange(N_FLIP), 2, 11)
+    eo = np.hstack([eo, (eo.sum(axis=1) % 2)[:, None]])
+    table = np.empty((N_FLIP, len(MOVE_CUBES)), dtype=np.uint16)
+    for m, move in enumerate(MOVE_CUBES):
+        new_eo = (eo[:, move.ep] + move.eo) % 2
+        table[:, m] = _undigits(new_eo[:, :11], 2)
+    return table
+
+
+def _slice_move_table():
+    table = np.empty((N_SLICE, len(MOVE_CUBES)), dtype=np.uint16)
+    cube = CubieCube()
+    for coord in range(N_SLICE):
+        cube.set_slice(coord)
+        for m, move in enumerate(MOVE_CUBES):
+            table[coord, m] = cube.multiply(move).get_slice()
+    return table
+
+
+def _perm_move_table(n, sources):
+    """Move table for a permutation coordinate under the G1 moves.
+
+    Args:
+        n: Number of pieces the coordinate permutes.
+        sources: For each G1 move, the position each piece comes from.
+    """
+    perms = np.array(list(permutations(range(n))), dtype=np.int8)
+    table = np.empty((len(perms), len(sources)), dtype=np.uint16)
+    for p, source in enumerate(sources):
+        table[:, p] = _rank_permutations(perms[:, source])
+    return table
+
+
+def _pruning_table(move_a, move_b):
+    """Breadth-first distances to the goal over a pair of coordinates.
+
+    The combined index is a * len(move_b) + b, and the goal is (0, 0).
+    """
+    size_b = len(move_b)
+    table = np.full(len(move_a) * size_b, 255, dtype=np.uint8)
+    table[0] = 0
+    depth = 0
+    frontier = np.array([0], dtype=np.int64)
+    while len(frontier):
+        a, b = np.divmod(frontier, size_b)
+        reached = []
+        for m in range(move_a.shape[1]):
+            index = move_a[a, m].astype(np.int64) * size_b + move_b[b, m]
+            index = index[table[index] == 255]
+            table[index] = depth + 1
+            reached.append(index)
+        frontier = np.unique(np.concatenate(reached))
+        depth += 1
+    return table
+
+
+def _phase2_keys(corner, edge8, slice_perm):
+    return (corner * N_EDGE8_PERM + edge8) * N_SLICE_PERM + slice_perm
+
+
+def _endgame_table(corner_move, edge8_move, slice_perm_move):
+    """Sorted exact distances of every G1 state within ENDGAME_DEPTH of solved.
+
+    Each entry packs a phase 2 state key and its distance as key << 4 | distance.
+    """
+    visited = np.array([0], dtype=np.int64)
+    frontier = visited
+    entries = [visited << 4]
+    for depth in range(1, ENDGAME_DEPTH + 1):
+        corner, rest = np.divmod(frontier, N_EDGE8_PERM * N_SLICE_PERM)
+        edge8, slice_perm = np.divmod(rest, N_SLICE_PERM)
+        reached = np.unique(np.concatenate([
+            _phase2_keys(corner_move[corner, p].astype(np.int64), edge8_move[edge8, p],
+                         slice_perm_move[slice_perm, p])
+            for p in range(len(PHASE2_MOVES))]))
+        frontier = reached[~np.isin(reached, visited, assume_unique=True)]
+        visited = np.union1d(visited, frontier)
+        entries.append(frontier << 4 | depth)
+    return np.sort(np.concatenate(entries))
+
+
+def generate_tables():
+    """Generate every move and pruning table.
+
+    Returns:
+        A dict mapping table names to numpy arrays.
+    """
+    twist_move = _twist_move_table()
+    flip_move = _flip_move_table()
+    slice_move = _slice_move_table()
+    g1_moves = [MOVE_CUBES[m] for m in PHASE2_MOVES]
+    corner_move = _perm_move_table(8, [move.cp for move in g1_moves])
+    edge8_move = _perm_move_table(8, [move.ep[:8] for move in g1_moves])
+    slice_perm_move = _perm_move_table(4, [[edge - 8 for edge in move.ep[8:]]
+                                           for move in g1_moves])
+
+    return {
+        'twist_move': twist_move,
+        'flip_move': flip_move,
+        'slice_move': slice_move,
+        'corner_move': corner_move,
+        'edge8_move': edge8_move,
+        'slice_perm_move': slice_perm_move,
+        'twist_slice_prune': _pruning_table(twist_move, slice_move),
+        'flip_slice_prune': _pruning_table(flip_move, slice_move),
+        'corner_slice_prune': _pruning_table(corner_move, slice_perm_move),
+        'edge8_slice_prune': _pruning_table(edge8_move, slice_perm_move),
+        'phase2_endgame': _endgame_table(corner_move, edge8_move, slice_perm_move),
+    }
+
+
+# Search ---------------------------------------------------------------------
+
+class SolverTimeout(Exception):
+    """Raised internally when the time budget runs out."""
+
+
+class _Finished(Exception):
+    """Raised internally once a short enough solution is found."""
+
+
+class TwoPhaseSolver:
+    """IDA* two-phase search over memory-mapped tables.
+
+    The solver only holds the read-only tables; each solve() keeps its
+    search state in a _Search of its own, so one solver can serve several
+    threads at once.
+    """
+
+    def __init__(self, tables):
+        self.twist_move = tables['twist_move']
+        self.flip_move = tables['flip_move']
+        self.slice_move = tables['slice_move']
+        self.corner_move = tables['corner_move']
+        self.edge8_move = tables['edge8_move']
+        self.slice_perm_move = tables['slice_perm_move']
+        self.twist_slice_prune = tables['twist_slice_prune']
+        self.flip_slice_prune = tables['flip_slice_prune']
+        self.corner_slice_prune = tables['corner_slice_prune']
+        self.edge8_slice_prune = tables['edge8_slice_prune']
+        self.endgame = tables['phase2_endgame']
+
+    def solve(self, stickers, time_budget=DEFAULT_TIME_BUDGET,
+              target_length=DEFAULT_TARGET_LENGTH, max_time=MAX_SEARCH_TIME):
+        """Find a short sequence of face turns that solves a cube.
+
+        The search returns as soon as it finds a solution of at most
+        target_length moves; otherwise it keeps improving its best solution
+        until the time budget runs out. The budget is a soft limit: if no
+        solution has been found by then, the search keeps looking for a
+        first one for up to max_time seconds, which is the hard limit.
+
+        Args:
+            stickers: A 54-sticker state (see models.move_engine).
+            time_budget: Seconds the search may spend improving a solution.
+            target_length: Solution length that is good enough to stop early.
+            max_time: Seconds after which the search gives up even without
+                      a solution (never less than time_budget).
+
+        Returns:
+            A list of moves in standard notation, or None if no solution was
+            found in time.
+
+        Raises:
+            ValueError: If the stickers do not describe a solvable cube.
+        """
+        cube = CubieCube.from_facelets(stickers)
+        best = _Search(self, cube, time_budget, target_length, max_time).run()
+        if best is None:
+            return None
+        return [SOLVER_MOVES[m] for m in _simplify(best)]
+
+
+class _Search:
+    """The state of one two-phase search over a solver's tables."""
+
+    def __init__(self, solver, cube, time_budget, target_length, max_time):
+        # The read-only tables, as attributes for the hot loops below
+        self.__dict__.update(vars(solver))
+        self._cube = cube
+        now = time.monotonic()
+        self._deadline = now + time_budget
+        self._hard_deadline = now + max(time_budget, max_time)
+        self._target_length = target_length
+        self._nodes = 0
+        self._best = None
+        self._path = []
+
+    def run(self):
+        """Search until done or out of time and return the best move indices, or None."""
+        cube = self._cube
+        twist, flip, slice_coord = cube.get_twist(), cube.get_flip(), cube.get_slice()
+        start = max(self.twist_slice_prune[twist * N_SLICE + slice_coord],
+                    self.flip_slice_prune[flip * N_SLICE + slice_coord])
+        try:
+            for depth in range(start, MAX_PHASE1_DEPTH + 1):
+                if self._best and depth >= len(self._best):
+                    break
+                self._phase1(twist, flip, slice_coord, depth, -1)
+        except (SolverTimeout, _Finished):
+            pass
+        return self._best
+
+    def _check_time(self):
+        self._nodes += 1
+        if self._nodes % _TIMEOUT_CHECK_INTERVAL == 0:
+            now = time.monotonic()
+            if now > self._hard_deadline or (self._best and now > self._deadline):
+                raise SolverTimeout()
+
+    def _phase1(self, twist, flip, slice_coord, togo, last_face):
+        if togo == 0:
+            # A solution ending in a G1 move was already in G1 one move earlier
+            if not self._path or self._path[-1] not in PHASE2_MOVES:
+                self._start_phase2()
+            return
+
+        self._check_time()
+        path = self._path
+        twist_move, flip_move, slice_move = self.twist_move, self.flip_move, self.slice_move
+        twist_prune, flip_prune = self.twist_slice_prune, self.flip_slice_prune
+        for m in range(18):
+            face = m // 3
+            if face == last_face or face == last_face - 3:
+                continue
+            new_twist = twist_move[twist * 18 + m]
+            new_flip = flip_move[flip * 18 + m]
+            new_slice = slice_move[slice_coord * 18 + m]
+            if twist_prune[new_twist * N_SLICE + new_slice] >= togo or \
+                    flip_prune[new_flip * N_SLICE + new_slice] >= togo:
+                continue
+            path.append(m)
+            self._phase1(new_twist, new_flip, new_slice, togo - 1, face)
+            path.pop()
+
+    def _start_phase2(self):
+        cube = self._cube
+        for m in self._path:
+            cube = cube.multiply(MOVE_CUBES[m])
+        corner, edge8, slice_perm = (cube.get_corner_perm(), cube.get_edge8_perm(),
+                                     cube.get_slice_perm())
+
+        phase1_length = len(self._path)
+        limit = (len(self._best) - 1 if self._best else MAX_SOLUTION_LENGTH) - phase1_length
+        start = max(self.corner_slice_prune[corner * N_SLICE_PERM + slice_perm],
+                    self.edge8_slice_prune[edge8 * N_SLICE_PERM + slice_perm])
+        last_face = self._path[-1] // 3 if self._path else -1
+
+        for depth in range(start, min(limit, MAX_PHASE2_DEPTH) + 1):
+            phase2_path = []
+            if self._phase2(corner, edge8, slice_perm, depth, last_face, phase2_path):
+                self._best = self._path + phase2_path
+                if len(self._best) <= self._target_length:
+                    raise _Finished()
+                return
+
+    def _endgame_distance(self, corner, edge8, slice_perm):
+        """Exact distance to solved, or None if beyond ENDGAME_DEPTH."""
+        key = _phase2_keys(corner, edge8, slice_perm)
+        endgame = self.endgame
+        i = bisect_left(endgame, key << 4)
+        if i < len(endgame) and endgame[i] >> 4 == key:
+            return endgame[i] & 15
+        return None
+
+    def _endgame_path(self, corner, edge8, slice_perm, distance):
+        """Walk down the endgame table to solved."""
+        path = []
+        while distance:
+            for p, m in enumerate(PHASE2_MOVES):
+                new_corner = self.corner_move[corner * 10 + p]
+                new_edge8 = self.edge8_move[edge8 * 10 + p]
+                new_slice_perm = self.slice_perm_move[slice_perm * 10 + p]
+                if self._endgame_distance(new_corner, new_edge8, new_slice_perm) == distance - 1:
+                    break
+            path.append(m)
+            corner, edge8, slice_perm, distance = (new_corner, new_edge8, new_slice_perm,
+                                                   distance - 1)
+        return path
+
+    def _phase2(self, corner, edge8, slice_perm, togo, last_face, path):
+        if togo <= ENDGAME_DEPTH:
+            distance = self._endgame_distance(corner, edge8, slice_perm)
+            if distance is None or distance > togo:
+                return False
+            path.extend(self._endgame_path(corner, edge8, slice_perm, distance))
+            return True
+
+        self._check_time()
+        corner_move, edge8_move, slice_perm_move = (self.corner_move, self.edge8_move,
+                                                    self.slice_perm_move)
+        corner_prune, edge8_prune = self.corner_slice_prune, self.edge8_slice_prune
+        for p, m in enumerate(PHASE2_MOVES):
+            face = m // 3
+            if face == last_face or face == last_face - 3:
+                continue
+            new_corner = corner_move[corner * 10 + p]
+            new_edge8 = edge8_move[edge8 * 10 + p]
+            new_slice_perm = slice_perm_move[slice_perm * 10 + p]
+            if corner_prune[new_corner * N_SLICE_PERM + new_slice_perm] >= togo or \
+                    edge8_prune[new_edge8 * N_SLICE_PERM + new_slice_perm] >= togo:
+                continue
+            path.append(m)
+            if self._phase2(new_corner, new_edge8, new_slice_perm, togo - 1, face, path):
+                return True
+            path.pop()
+        return False
+
+
+def _simplify(moves):
+    """Merge consecutive turns of the same face, including across an opposite face."""
+    result = []
+    for m in moves:
+        face, turns = divmod(m, 3)
+        # Opposite faces commute, so look past one of them
+        target = len(result) - 1
+        if target >= 1 and result[target] // 3 % 3 == face % 3 and result[target] // 3 != face:
+            target -= 1
+        if target >= 0 and result[target] // 3 == face:
+            turns = (result[target] % 3 + turns + 2) % 4
+            del result[target]
+            if turns:
+                result.insert(target, face * 3 + turns - 1)
+        else:
+            result.append(m)
+    return result
@@ -1,15 +1,42 @@
-from flask import Blueprint, jsonify, request
-from utils.session_manager import init_user_data, get_cube_state, set_cube_state
+from flask import Blueprint, Response, current_app, jsonify, request
+from utils.session_manager import (init_user_data, apply_cube_moves, get_cube_record, get_cube_state,
+                                   redo_cube_move, set_cube_state, undo_cube_move)
 from models.cube import RubiksCube
-from utils.cube_state_adapter import convert_3d_to_2d_state, create_cube_from_2d_state
-import json
+from models.cubie import CubieCube
+from models.move_engine import state_from_2d, state_to_2d
+from models.algorithm import parse_algorithm
+from utils.cube_log import VersionConflict, moves_since, record_state
+from utils.cube_stream import close_channel, get_channel, open_channel
+from utils.cube_state_adapter import (create_cube_from_2d_state, decode_state, encode_state,
+                                      requested_state_format)
+from utils.log_utils import get_logger
+from utils.metrics import timed
+from utils.scramble_pool import get_scramble_pool
+import math
 
 # Create a blueprint for cube-related routes
 cube_bp = Blueprint('cube', __name__)
 
+logger = get_logger('cube_routes')
+
 # Store cube instances in memory
 cube_instances = {}
 
+# Longest algorithm accepted by the /moves endpoint
+MAX_SEQUENCE_LENGTH = 500
+
+# Longest time budget a /solve request may ask for, in seconds
+MAX_SOLVE_TIME_BUDGET = 1.0
+
+# The solvers pull in NumPy and their tables, so they are imported on first use
+def get_two_phase_solver(wait=True):
+    from models import solver_tables
+    return solver_tables.get_two_phase_solver(wait)
+
+def get_stage_solver(wait=True):
+    from models import solver_tables
+    return solver_tables.get_stage_solver(wait)
+
 def get_cube_instance(user_id):
     """Get a RubiksCube instance from the current session state."""
     # Always rebuild the cube instance from the current session state
@@ -17,48 +44,227 @@ def get_cube_instance(user_id):
     cube = create_cube_from_2d_state(current_state)
     return cube
 
+def parse_base_version(data):
+    """Read the optional baseVersion of a request.
+    
+    Raises:
+        ValueError: If it is not a non-negative integer.
+    """
+    base_version = data.get('baseVersion')
+    if base_version is not None and (isinstance(base_version, bool)
+                                     or not isinstance(base_version, int) or base_version < 0):
+        raise ValueError('baseVersion must be a non-negative integer')
+    return base_version
+
+def version_conflict(record, base_version, state_format):
+    """Build the 409 response telling a client its base version is out of date.
+    
+    The response carries the current state and version, plus the moves made
+    since the client's version when they are still logged, so the client can
+    either replay them or just adopt the state.
+    """
+    return jsonify({
+        'error': 'The cube has changed since baseVersion',
+        'version': record['version'],
+        'cubeState': encode_state(state_to_2d(record_state(record)), state_format),
+        'moves': moves_since(record, base_version)
+    }), 409
+
 @cube_bp.route('/move', methods=['POST'])
 def make_cube_move():
+    """Apply one move; send {move, baseVersion} to have conflicts detected."""
     user_id = init_user_data()
     move = request.json.get('move')
     current_state = request.json.get('currentState')
+    state_format = requested_state_format()
     
     if not move:
         return jsonify({'error': 'No move specified'}), 400
+    if not isinstance(move, str):
+        return jsonify({'error': 'move must be a string'}), 400
+    try:
+        moves = parse_algorithm(move)
+        base_version = parse_base_version(request.json)
+        # Convert a state sent in a compact wire format back to the 2D format
+        if current_state and base_version is None:
+            with timed('deserialize'):
+                current_state = decode_state(current_state)
+            logger.debug("Using state from frontend request for move %s", move)
+        else:
+            current_state = None
+        record, (new_state,) = apply_cube_moves(user_id, moves, current_state, base_version)
+    except VersionConflict as e:
+        return version_conflict(e.record, base_version, state_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    with timed('serialize'):
+        new_2d_state = state_to_2d(new_state)
+        
+        # Log the new state for debugging; only formatted when DEBUG is on
+        logger.debug("After %s - version %s, 2D state: %s", move, record['version'], new_2d_state)
+        
+        return jsonify({
+            'status': 'success',
+            'cubeState': encode_state(new_2d_state, state_format),
+            'version': record['version']
+        })
+
+@cube_bp.route('/moves', methods=['POST'])
+def make_cube_moves():
+    """Apply a whole algorithm (e.g. "R U R' U'") in a single request."""
+    user_id = init_user_data()
+    moves = request.json.get('moves')
+    current_state = request.json.get('currentState')
+    include_steps = bool(request.json.get('includeSteps', False))
+    state_format = requested_state_format()
+    
+    if not moves or not isinstance(moves, (str, list)):
+        return jsonify({'error': 'No moves specified'}), 400
+    
+    try:
+        moves = parse_algorithm(moves)
+        base_version = parse_base_version(request.json)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(moves) > MAX_SEQUENCE_LENGTH:
+        return jsonify({'error': f'Too many moves (max {MAX_SEQUENCE_LENGTH})'}), 400
+    
+    # Apply the moves, keeping the state after each one if steps are needed
+    try:
+        # Convert a state sent in a compact wire format back to the 2D format
+        if current_state and base_version is None:
+            with timed('deserialize'):
+                current_state = decode_state(current_state)
+        else:
+            current_state = None
+        record, states = apply_cube_moves(user_id, moves, current_state, base_version,
+                                          include_steps)
+    except VersionConflict as e:
+        return version_conflict(e.record, base_version, state_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    with timed('serialize'):
+        response = {
+            'status': 'success',
+            'moves': moves,
+            'cubeState': encode_state(state_to_2d(states[-1] if states else record_state(record)),
+                                      state_format),
+            'version': record['version']
+        }
+        if include_steps:
+            response['steps'] = [encode_state(state_to_2d(step), state_format) for step in states]
+        
+        return jsonify(response)
+
+@cube_bp.route('/solve', methods=['POST'])
+def solve_cube():
+    """Find a short solution for the current cube with the two-phase solver."""
+    from models.two_phase import DEFAULT_TIME_BUDGET
+    user_id = init_user_data()
+    data = request.get_json(silent=True) or {}
+    current_state = data.get('currentState')
+    
+    try:
+        time_budget = min(float(data.get('timeBudget', DEFAULT_TIME_BUDGET)), MAX_SOLVE_TIME_BUDGET)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'timeBudget must be a number of seconds'}), 400
+    if not math.isfinite(time_budget) or time_budget <= 0:
+        return jsonify({'error': 'timeBudget must be positive'}), 400
+    
+    # Convert a state sent in a compact wire format back to the 2D format
+    if current_state:
+        try:
+            current_state = decode_state(current_state)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
     # Use the state sent from the frontend if available, otherwise use the session state
-    if current_state and isinstance(current_state, list) and len(current_state) == 6:
-        print(f"Using state from frontend request for move {move}")
-        # Update the session state with the frontend state
-        set_cube_state(user_id, current_state)
-    else:
+    if not current_state:
         current_state = get_cube_state(user_id)
-        print(f"Using state from session for move {move}")
     
-    # Create a cube instance using the provided state
-    cube = create_cube_from_2d_state(current_state)
+    # Reject unsolvable states before checking whether the solver is ready
+    stickers = state_from_2d(current_state)
+    try:
+        CubieCube.from_facelets(stickers)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # Never build the tables on the request path; they are generated in the background
+    solver = get_two_phase_solver(wait=False)
+    if solver is None:
+        return jsonify({'error': 'Solver tables are still being generated'}), 503
+    
+    try:
+        solution = solver.solve(stickers, time_budget=time_budget,
+                                max_time=MAX_SOLVE_TIME_BUDGET)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if solution is None:
+        return jsonify({'error': 'No solution found within the time budget'}), 503
+    
+    return jsonify({
+        'status': 'success',
+        'solution': solution,
+        'length': len(solution)
+    })
+
+@cube_bp.route('/solve/stages', methods=['POST'])
+def solve_cube_stages():
+    """Solve the current cube stage by stage, following the learning modules."""
+    user_id = init_user_data()
+    data = request.get_json(silent=True) or {}
+    current_state = data.get('currentState')
     
-    # Print current state for debugging
-    print(f"Before {move} - 3D state:", json.dumps(cube.get_state()))
-    initial_2d_state = convert_3d_to_2d_state(cube.get_state())
-    print(f"Before {move} - 2D state:", json.dumps(initial_2d_state))
+    # Convert a state sent in a compact wire format back to the 2D format
+    if current_state:
+        try:
+            current_state = decode_state(current_state)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     
-    # Apply the move to the 3D cube model
-    new_3d_state = cube.make_move(move)
+    # Use the state sent from the frontend if available, otherwise use the session state
+    if not current_state:
+        current_state = get_cube_state(user_id)
+    
+    # Reject unsolvable states before checking whether the solver is ready
+    stickers = state_from_2d(current_state)
+    try:
+        CubieCube.from_facelets(stickers)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Convert to 2D representation
-    new_2d_state = convert_3d_to_2d_state(new_3d_state)
+    # Never build the tables on the request path; they are generated in the background
+    solver = get_stage_solver(wait=False)
+    if solver is None:
+        return jsonify({'error': 'Solver tables are still being generated'}), 503
     
-    # Print after state for debugging
-    print(f"After {move} - 3D state:", json.dumps(new_3d_state))
-    print(f"After {move} - 2D state:", json.dumps(new_2d_state))
+    try:
+        stages = solver.solve(stickers)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
     
-    # Update session state
-    set_cube_state(user_id, new_2d_state)
+    return jsonify({
+        'status': 'success',
+        'stages': [{'stage': name, 'moves': moves} for name, moves in stages],
+        'nextStage': next((name for name, moves in stages if moves), None)
+    })
+
+@cube_bp.route('/scramble', methods=['GET'])
+def get_scramble():
+    """Return a scramble reaching a uniformly random state, from the pregenerated pool."""
+    scramble = get_scramble_pool().take()
+    if scramble is None:
+        return jsonify({'error': 'Scrambles are still being generated'}), 503
     
+    moves, state = scramble
     return jsonify({
         'status': 'success',
-        'cubeState': new_2d_state
+        'scramble': ' '.join(moves),
+        'moves': moves,
+        'length': len(moves),
+        'cubeState': encode_state(state_to_2d(state), requested_state_format())
     })
 
 @cube_bp.route('/reset', methods=['POST'])
@@ -68,31 +274,128 @@ def reset_cube():
     # Create a new solved cube
     new_cube = RubiksCube()
     
-    # Get the 3D state and convert to 2D
-    new_3d_state = new_cube.get_state()
-    new_2d_state = convert_3d_to_2d_state(new_3d_state)
+    # Render the sticker state straight to the 2D format
+    new_2d_state = state_to_2d(new_cube.state)
     
-    # Update session state
-    set_cube_state(user_id, new_2d_state)
+    # Replace the stored cube with a new snapshot
+    record = set_cube_state(user_id, new_2d_state)
     
     return jsonify({
         'status': 'success',
-        'cubeState': new_2d_state
+        'cubeState': encode_state(new_2d_state, requested_state_format()),
+        'version': record['version']
     })
 
 @cube_bp.route('/state', methods=['GET'])
 def get_current_cube_state():
     user_id = init_user_data()
     
-    # Get the cube instance and its current state
-    cube = get_cube_instance(user_id)
-    current_3d_state = cube.get_state()
-    current_2d_state = convert_3d_to_2d_state(current_3d_state)
+    # Rebuild the current state from the snapshot and move log
+    record = get_cube_record(user_id)
+    with timed('replay_log'):
+        current_2d_state = state_to_2d(record_state(record))
+    
+    with timed('serialize'):
+        return jsonify({
+            'status': 'success',
+            'cubeState': encode_state(current_2d_state, requested_state_format()),
+            'version': record['version']
+        })
+
+@cube_bp.route('/history', methods=['GET'])
+def get_cube_history():
+    """Return the moves made since ?since=<version>, for replaying on the client."""
+    user_id = init_user_data()
+    since = request.args.get('since', type=int)
+    if since is None:
+        return jsonify({'error': 'since must be a version number'}), 400
+    
+    record = get_cube_record(user_id)
+    moves = moves_since(record, since)
+    if moves is None:
+        return jsonify({'error': 'That version is no longer in the move log',
+                        'version': record['version']}), 410
     
-    # Update session state to ensure consistency
-    set_cube_state(user_id, current_2d_state)
+    return jsonify({
+        'status': 'success',
+        'version': record['version'],
+        'moves': moves
+    })
+
+def step_history(step, nothing_left):
+    """Undo or redo one move; send {baseVersion} to have conflicts detected."""
+    user_id = init_user_data()
+    data = request.get_json(silent=True) or {}
+    state_format = requested_state_format()
+    
+    try:
+        base_version = parse_base_version(data)
+        result = step(user_id, base_version)
+    except VersionConflict as e:
+        return version_conflict(e.record, base_version, state_format)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if result is None:
+        return jsonify({'error': nothing_left}), 400
     
+    record, state = result
+    with timed('serialize'):
+        return jsonify({
+            'status': 'success',
+            'move': record['log'].split()[-1],
+            'cubeState': encode_state(state_to_2d(state), state_format),
+            'version': record['version'],
+            'canUndo': bool(record['undo']),
+            'canRedo': bool(record['redo'])
+        })
+
+@cube_bp.route('/undo', methods=['POST'])
+def undo_cube():
+    """Undo the last move by applying its inverse."""
+    return step_history(undo_cube_move, 'Nothing to undo')
+
+@cube_bp.route('/redo', methods=['POST'])
+def redo_cube():
+    """Apply the last undone move again."""
+    return step_history(redo_cube_move, 'Nothing to redo')
+
+@cube_bp.route('/stream', methods=['POST'])
+def open_cube_stream():
+    """Open a streaming channel; the session cookie is checked only here."""
+    user_id = init_user_data()
+    channel = open_channel(user_id, current_app.config['STREAM_FRAME_INTERVAL'])
     return jsonify({
         'status': 'success',
-        'cubeState': current_2d_state
-    }) 
\ No newline at end of file
+        'token': channel.token
+    })
+
+@cube_bp.route('/stream/<token>', methods=['GET'])
+def cube_stream(token):
+    """Server-Sent Events stream of the channel's state and applied moves."""
+    channel = get_channel(token)
+    if channel is None:
+        return jsonify({'error': 'Unknown stream'}), 404
+    return Response(channel.events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@cube_bp.route('/stream/<token>/moves', methods=['POST'])
+def push_stream_moves(token):
+    """Queue moves (plain text such as "R U R'") for the channel's next frame."""
+    channel = get_channel(token)
+    if channel is None:
+        return jsonify({'error': 'Unknown stream'}), 404
+    try:
+        moves = parse_algorithm(request.get_data(as_text=True))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if len(moves) > MAX_SEQUENCE_LENGTH:
+        return jsonify({'error': f'Too many moves (max {MAX_SEQUENCE_LENGTH})'}), 400
+    channel.push(moves)
+    return '', 204
+
+@cube_bp.route('/stream/<token>', methods=['DELETE'])
+def close_cube_stream(token):
+    """Close a streaming channel."""
+    if close_channel(token) is None:
+        return jsonify({'error': 'Unknown stream'}), 404
+    return '', 204
@@ -1,7 +1,9 @@
-from flask import Blueprint, jsonify, request, session
+from flask import Blueprint, current_app, jsonify, request, session
 from datetime import datetime
-from utils.session_manager import init_user_data, update_user_module
-from utils.data_utils import load_data, get_learning_module
+from utils.session_manager import (init_user_data, update_user_module, get_user_field, set_user_field,
+                                   update_user_field, user_lock)
+from utils.data_utils import load_data, repository
+from utils.http_cache import content_response
 
 # Create a blueprint for learning-related routes
 learning_bp = Blueprint('learning', __name__)
@@ -17,20 +19,23 @@ def get_module(module_id):
     user_id = init_user_data()
     
     # Record the time when user starts viewing a module
-    from utils.session_manager import global_state
     if request.method == 'GET':
-        global_state[user_id]['module_times'][str(module_id)] = {
-            'start_time': datetime.now().isoformat()
-        }
-        session['user_data']['module_times'][str(module_id)] = global_state[user_id]['module_times'][str(module_id)]
-        session.modified = True
+        def record_start(module_times):
+            module_times[str(module_id)] = {
+                'start_time': datetime.now().isoformat()
+            }
+            return module_times
+        update_user_field(user_id, 'module_times', record_start, {})
     
     # Find the requested module
-    module = get_learning_module(module_id)
+    content = repository.get()
+    module = content.modules.get(module_id)
     if not module:
         return jsonify({'error': 'Module not found'}), 404
     
-    return jsonify(module)
+    # Answer with a 304 if the browser already has this version of the module
+    return content_response(content, ('module', module_id), module,
+                            current_app.config['MODULE_CACHE_CONTROL'])
 
 @learning_bp.route('/module/<int:module_id>/complete', methods=['POST'])
 def complete_module(module_id):
@@ -39,24 +44,26 @@ def complete_module(module_id):
     # Record completion time and answers
     end_time = datetime.now().isoformat()
     
-    # Get global state reference for direct updates
-    from utils.session_manager import global_state
-    start_time = global_state[user_id]['module_times'].get(str(module_id), {}).get('start_time')
-    
-    if start_time:
-        # Calculate time spent on module
-        time_spent = (datetime.fromisoformat(end_time) - 
-                     datetime.fromisoformat(start_time)).total_seconds()
+    # Update the stored module times and answers under the user's lock
+    with user_lock(user_id):
+        module_times = get_user_field(user_id, 'module_times', {})
+        start_time = module_times.get(str(module_id), {}).get('start_time')
         
-        global_state[user_id]['module_times'][str(module_id)]['end_time'] = end_time
-        global_state[user_id]['module_times'][str(module_id)]['time_spent'] = time_spent
+        if start_time:
+            # Calculate time spent on module
+            time_spent = (datetime.fromisoformat(end_time) - 
+                         datetime.fromisoformat(start_time)).total_seconds()
+            
+            module_times[str(module_id)]['end_time'] = end_time
+            module_times[str(module_id)]['time_spent'] = time_spent
+            
+            set_user_field(user_id, 'module_times', module_times)
         
-        session['user_data']['module_times'][str(module_id)] = global_state[user_id]['module_times'][str(module_id)]
-    
-    # Save user answers
-    answers = request.json.get('answers', {})
-    global_state[user_id]['module_answers'][str(module_id)] = answers
-    session['user_data']['module_answers'][str(module_id)] = answers
+        # Save user answers
+        answers = request.json.get('answers', {})
+        module_answers = get_user_field(user_id, 'module_answers', {})
+        module_answers[str(module_id)] = answers
+        set_user_field(user_id, 'module_answers', module_answers)
     
     # Update current module
     next_module = module_id + 1
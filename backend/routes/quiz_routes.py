@@ -1,6 +1,8 @@
-from flask import Blueprint, jsonify, request, session
-from utils.session_manager import init_user_data, update_quiz_data
-from utils.data_utils import get_quiz_question, get_all_quiz_questions
+from flask import Blueprint, current_app, jsonify, request
+from utils.session_manager import init_user_data, set_user_field, update_user_field
+from utils.data_utils import get_quiz_question, repository
+from utils.http_cache import content_response
+from utils.quiz_engine import get_score, reset_answers, submit_answer
 
 # Create a blueprint for quiz-related routes
 quiz_bp = Blueprint('quiz', __name__)
@@ -10,11 +12,14 @@ def get_question(question_id):
     init_user_data()
     
     # Find the requested question
-    question = get_quiz_question(question_id)
+    content = repository.get()
+    question = content.questions.get(question_id)
     if not question:
         return jsonify({'error': 'Question not found'}), 404
     
-    return jsonify(question)
+    # Answer with a 304 if the browser already has this version of the question
+    return content_response(content, ('question', question_id), question,
+                            current_app.config['QUIZ_CACHE_CONTROL'])
 
 @quiz_bp.route('/quiz/<int:question_id>/answer', methods=['POST'])
 def submit_quiz_answer(question_id):
@@ -25,69 +30,38 @@ def submit_quiz_answer(question_id):
     if not question:
         return jsonify({'error': 'Question not found'}), 404
     
-    # Save user answer
+    # Save the answer, update the score and look up the neighbouring questions
     user_answer = request.json.get('answer')
-    update_quiz_data(user_id, question_id, user_answer)
-    
-    # Check if answer is correct
-    is_correct = user_answer == question['correct_answer']
-    
-    # Get next question id
-    next_question = None
-    all_questions = get_all_quiz_questions()
-    next_ids = [q['id'] for q in all_questions if q['id'] > question_id]
-    if next_ids:
-        next_question = min(next_ids)
+    result = submit_answer(user_id, question_id, user_answer)
     
     return jsonify({
-        'is_correct': is_correct,
+        'is_correct': result['is_correct'],
         'explanation': question['explanation'],
-        'next_question': next_question
+        'next_question': result['next_question'],
+        'previous_question': result['previous_question']
     })
 
 @quiz_bp.route('/results', methods=['GET'])
 def get_results():
     user_id = init_user_data()
     
-    # Get global state reference for direct updates
-    from utils.session_manager import global_state
-    
-    # Calculate score
-    all_questions = get_all_quiz_questions()
-    total_questions = len(all_questions)
-    correct_answers = 0
-    
-    for question in all_questions:
-        q_id = str(question['id'])
-        if q_id in global_state[user_id]['quiz_answers']:
-            if global_state[user_id]['quiz_answers'][q_id] == question['correct_answer']:
-                correct_answers += 1
-    
-    score = (correct_answers / total_questions) * 100 if total_questions > 0 else 0
-    global_state[user_id]['quiz_score'] = score
-    global_state[user_id]['attempts'] += 1
-    
-    session['user_data']['quiz_score'] = score
-    session['user_data']['attempts'] = global_state[user_id]['attempts']
-    session.modified = True
+    # Read the score kept up to date by every answer submission
+    correct_answers, total_questions, score = get_score(user_id)
+    attempts = update_user_field(user_id, 'attempts', lambda attempts: attempts + 1, 0)
+    set_user_field(user_id, 'quiz_score', score)
     
     return jsonify({
         'score': score,
         'correct_answers': correct_answers,
         'total_questions': total_questions,
-        'attempts': global_state[user_id]['attempts']
+        'attempts': attempts
     })
 
 @quiz_bp.route('/reset-quiz', methods=['POST'])
 def reset_quiz():
     user_id = init_user_data()
     
-    # Get global state reference for direct updates
-    from utils.session_manager import global_state
-    
     # Clear quiz answers but keep module progress
-    global_state[user_id]['quiz_answers'] = {}
-    session['user_data']['quiz_answers'] = {}
-    session.modified = True
+    reset_answers(user_id)
     
     return jsonify({'status': 'success'}) 
\ No newline at end of file
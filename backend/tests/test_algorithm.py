@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.algorithm import (apply_algorithm, compile_algorithm, invert_algorithm,
+                              parse_algorithm)
+from models.cube import RubiksCube
+from models.move_engine import IDENTITY, apply_moves
+
+class TestAlgorithm(unittest.TestCase):
+    """Test the notation parser and algorithm compiler."""
+    
+    def test_parse_normalizes(self):
+        """Test that notation variants normalize to engine moves."""
+        self.assertEqual(parse_algorithm("R U2 R' Rw M2 x'"), ['R', 'U2', "R'", 'r', 'M2', "x'"])
+        self.assertEqual(parse_algorithm("R2' U3 F4 Rw’"), ['R2', "U'", "r'"])
+        self.assertEqual(parse_algorithm("RUR'U'"), ['R', 'U', "R'", "U'"])
+        self.assertEqual(parse_algorithm(['R', "U'"]), ['R', "U'"])
+    
+    def test_parse_groups(self):
+        """Test parenthesised groups with repeat counts."""
+        self.assertEqual(parse_algorithm("(R' D' R D)2"), ["R'", "D'", 'R', 'D'] * 2)
+        self.assertEqual(parse_algorithm("F (R U)"), ['F', 'R', 'U'])
+    
+    def test_parse_rejects_invalid(self):
+        """Test that unknown notation raises instead of being ignored."""
+        for algorithm in ('Q', 'R Q', 'xw', '(R U', 'R U)', '(R)5000',
+                          '()99999999999999999999'):
+            with self.assertRaises(ValueError):
+                parse_algorithm(algorithm)
+    
+    def test_compile_matches_moves(self):
+        """Test that a compiled algorithm equals applying its moves one by one."""
+        algorithm = "R U R' U' r M' E S x y z F2 B' L D2"
+        expected = apply_moves(RubiksCube.SOLVED_STATE, parse_algorithm(algorithm))
+        self.assertEqual(apply_algorithm(RubiksCube.SOLVED_STATE, algorithm), expected)
+    
+    def test_known_algorithm_orders(self):
+        """Test the orders of well-known learning-module algorithms."""
+        self.assertEqual(compile_algorithm("(R U R' U')6"), IDENTITY)
+        self.assertEqual(compile_algorithm("(R U R' U R U2 R')6"), IDENTITY)
+        t_perm = "R U R' U' R' F R2 U' R' U' R U R' F'"
+        self.assertEqual(compile_algorithm(t_perm * 2), IDENTITY)
+    
+    def test_invert(self):
+        """Test that an algorithm followed by its inverse is the identity."""
+        algorithm = "R U2 F' M x"
+        inverse = invert_algorithm(algorithm)
+        self.assertEqual(compile_algorithm(parse_algorithm(algorithm) + inverse), IDENTITY)
+    
+    def test_make_move_rejects_invalid(self):
+        """Test that RubiksCube.make_move no longer silently ignores bad moves."""
+        cube = RubiksCube()
+        cube.make_move('U2')
+        self.assertNotEqual(cube.state, RubiksCube.SOLVED_STATE)
+        with self.assertRaises(ValueError):
+            cube.make_move('Q')
+
+if __name__ == '__main__':
+    unittest.main()
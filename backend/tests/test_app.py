@@ -0,0 +1,64 @@
+import unittest
+import sys
+import os
+import subprocess
+from unittest import mock
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, warm
+
+class TestAppFactory(unittest.TestCase):
+    """Test the app factory and its readiness hook."""
+    
+    def test_config_override(self):
+        """Test that configuration passed to the factory wins over Config."""
+        app = create_app({'SECRET_KEY': 'test-key', 'WARM_ON_START': False})
+        self.assertEqual(app.secret_key, 'test-key')
+    
+    def test_readiness(self):
+        """Test that the app reports ready only after warming up."""
+        app = create_app({'WARM_ON_START': False})
+        client = app.test_client()
+        self.assertEqual(client.get('/ready').status_code, 503)
+        with mock.patch('models.solver_tables.preload', return_value=True), \
+                mock.patch('utils.scramble_pool.get_scramble_pool') as get_pool:
+            warm(app)
+        get_pool.assert_called_once()
+        self.assertEqual(client.get('/ready').status_code, 200)
+    
+    def test_warm_never_builds_tables(self):
+        """Test that warming up without current tables neither builds them nor starts the scramble pool."""
+        app = create_app({'WARM_ON_START': False})
+        with mock.patch('models.solver_tables.preload', return_value=False), \
+                mock.patch('models.solver_tables.rebuild') as rebuild, \
+                mock.patch('utils.scramble_pool.get_scramble_pool') as get_pool:
+            warm(app)
+        rebuild.assert_not_called()
+        get_pool.assert_not_called()
+        self.assertTrue(app.extensions['warmup'].is_set())
+    
+    def test_cors_preflight_allows_state_format(self):
+        """Test that browsers may send the state format negotiation header."""
+        client = create_app({'WARM_ON_START': False}).test_client()
+        response = client.options('/api/cube/move', headers={
+            'Origin': 'http://localhost:3000',
+            'Access-Control-Request-Method': 'POST',
+            'Access-Control-Request-Headers': 'content-type, x-cube-state-format'
+        })
+        allowed = response.headers.get('Access-Control-Allow-Headers', '').lower()
+        self.assertIn('x-cube-state-format', allowed)
+        self.assertIn('content-type', allowed)
+    
+    def test_cold_start_skips_solvers(self):
+        """Test that creating the app does not import the NumPy-based solvers."""
+        code = ("import sys, app; app.create_app({'WARM_ON_START': False}); "
+                "print('numpy' in sys.modules)")
+        backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run([sys.executable, '-c', code], cwd=backend,
+                                capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), 'False')
+
+if __name__ == '__main__':
+    unittest.main()
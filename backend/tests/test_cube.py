@@ -3,7 +3,7 @@ import os
 import unittest
 from flask import Flask, session
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from app import handle_cube_move, rotate_face_clockwise, rotate_face_counterclockwise
+from utils.cube_utils import handle_cube_move, rotate_face_clockwise, rotate_face_counterclockwise
 
 class TestCubeRotations(unittest.TestCase):
     def setUp(self):
@@ -98,10 +98,10 @@ class TestCubeRotations(unittest.TestCase):
         self.assertEqual(result[2][7], 'green')
         self.assertEqual(result[2][8], 'green')
         
-        # Right edge of front comes from up face
+        # Right edge of front (left column of the right face) comes from up face
+        self.assertEqual(result[0][0], 'white')
+        self.assertEqual(result[0][3], 'white')
         self.assertEqual(result[0][6], 'white')
-        self.assertEqual(result[0][7], 'white')
-        self.assertEqual(result[0][8], 'white')
         
         # Bottom edge of front comes from right face
         self.assertEqual(result[3][0], 'blue')
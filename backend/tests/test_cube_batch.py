@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+
+import numpy as np
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from models.cube_batch import CubeBatch, MOVE_NAMES
+from models.move_engine import apply_move, state_to_2d
+from utils.cube_state_adapter import are_solved_states
+
+class TestCubeBatch(unittest.TestCase):
+    """Test the vectorized batch simulator against the move engine."""
+    
+    def test_round_trip(self):
+        """Test conversion from and back to 2D states."""
+        states = [state_to_2d(RubiksCube.SOLVED_STATE),
+                  state_to_2d(apply_algorithm(RubiksCube.SOLVED_STATE, "R U F'"))]
+        self.assertEqual(CubeBatch.from_states(states).to_states(), states)
+    
+    def test_apply_same_move(self):
+        """Test that one algorithm is applied to every row."""
+        batch = CubeBatch.solved(3).apply("R U R' U'")
+        expected = state_to_2d(apply_algorithm(RubiksCube.SOLVED_STATE, "R U R' U'"))
+        self.assertEqual(batch.to_states(), [expected] * 3)
+    
+    def test_apply_per_row(self):
+        """Test that each row gets its own move."""
+        moves = list(MOVE_NAMES)
+        batch = CubeBatch.solved(len(moves)).apply_per_row(moves)
+        for move, state in zip(moves, batch.to_states()):
+            expected = apply_move(RubiksCube.SOLVED_STATE, move) if move else RubiksCube.SOLVED_STATE
+            self.assertEqual(state, state_to_2d(expected), move)
+    
+    def test_replay_ragged_logs(self):
+        """Test replaying move logs of different lengths."""
+        logs = ["R U", "F2 D' L", ""]
+        batch = CubeBatch.solved(3).replay(logs)
+        expected = [state_to_2d(apply_algorithm(RubiksCube.SOLVED_STATE, log)) for log in logs]
+        self.assertEqual(batch.to_states(), expected)
+    
+    def test_solved_checks(self):
+        """Test vectorized solved checks and solved-face counts."""
+        batch = CubeBatch.solved(3)
+        batch.apply_per_row(['', 'U', 'R'])
+        self.assertEqual(batch.is_solved().tolist(), [True, False, False])
+        self.assertEqual(batch.solved_face_count().tolist(), [6, 2, 2])
+        self.assertEqual(are_solved_states(batch.to_states()), [True, False, False])
+    
+    def test_scramble_then_undo(self):
+        """Test that random scrambles are reversible row by row."""
+        batch = CubeBatch.solved(50)
+        applied = batch.scramble(20, rng=np.random.default_rng(1))
+        self.assertFalse(batch.is_solved().all())
+        for column in applied.T[::-1]:
+            inverse = [MOVE_NAMES[index] for index in column]
+            inverse = [move[:-1] if move.endswith("'") else move if move.endswith('2') else move + "'"
+                       for move in inverse]
+            batch.apply_per_row(inverse)
+        self.assertTrue(batch.is_solved().all())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import sys
+import os
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import algorithm
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from utils.cube_log import (MAX_LOG_MOVES, MAX_UNDO_MOVES, SNAPSHOT_INTERVAL, VersionConflict,
+                            append_moves, check_version, moves_since, new_record, record_state,
+                            redo_move, replace_state, undo_move)
+
+def play(record, moves):
+    """Append moves one at a time, as a client sending single moves would."""
+    state = record_state(record)
+    for move in moves:
+        state = apply_algorithm(state, [move])
+        record = append_moves(record, [move], state)
+    return record
+
+class TestCubeLog(unittest.TestCase):
+    """Test the snapshot plus move log cube record."""
+    
+    def test_replay(self):
+        """Test that the state is the snapshot with the logged moves replayed."""
+        record = play(new_record(), ['R', 'U', "F'"])
+        self.assertEqual(record['version'], 3)
+        self.assertEqual(record_state(record),
+                         apply_algorithm(RubiksCube.SOLVED_STATE, "R U F'"))
+    
+    def test_replay_skips_algorithm_cache(self):
+        """Test that rebuilding a state does not fill the algorithm caches."""
+        record = play(new_record(), ['R', 'U', "F'", 'D2'])
+        parsed, compiled = algorithm._parse.cache_info(), algorithm._compile.cache_info()
+        record_state(record)
+        self.assertEqual(algorithm._parse.cache_info(), parsed)
+        self.assertEqual(algorithm._compile.cache_info(), compiled)
+    
+    def test_snapshots(self):
+        """Test that a snapshot is taken every SNAPSHOT_INTERVAL moves."""
+        moves = ['R', 'U'] * SNAPSHOT_INTERVAL
+        record = play(new_record(), moves)
+        self.assertEqual(record['snapshot_version'], 2 * SNAPSHOT_INTERVAL)
+        self.assertEqual(record_state(record), apply_algorithm(RubiksCube.SOLVED_STATE, moves))
+    
+    def test_history(self):
+        """Test that recent history is kept and old history is trimmed."""
+        record = play(new_record(), ['R'] * (MAX_LOG_MOVES + SNAPSHOT_INTERVAL))
+        self.assertEqual(moves_since(record, record['version'] - 2), ['R', 'R'])
+        self.assertEqual(moves_since(record, record['version']), [])
+        self.assertIsNone(moves_since(record, 0))
+        self.assertLessEqual(len(record['log'].split()), MAX_LOG_MOVES + SNAPSHOT_INTERVAL)
+    
+    def test_replace_state(self):
+        """Test that replacing the state starts a new snapshot at the next version."""
+        record = play(new_record(), ['R', 'U'])
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, 'F')
+        record = replace_state(record, state)
+        self.assertEqual(record['version'], 3)
+        self.assertEqual(record_state(record), state)
+        self.assertIsNone(moves_since(record, 1))
+    
+    def test_check_version(self):
+        """Test that a stale base version is a conflict."""
+        record = play(new_record(), ['R'])
+        check_version(record, 1)
+        with self.assertRaises(VersionConflict):
+            check_version(record, 0)
+    
+    def test_undo_redo(self):
+        """Test that undo appends the inverse move and redo the undone move."""
+        record = play(new_record(), ['R', 'U'])
+        record, state = undo_move(record)
+        self.assertEqual(record['version'], 3)
+        self.assertEqual(moves_since(record, 2), ["U'"])
+        self.assertEqual(state, apply_algorithm(RubiksCube.SOLVED_STATE, 'R'))
+        self.assertEqual(record_state(record), state)
+        
+        record, state = undo_move(record)
+        self.assertEqual(state, RubiksCube.SOLVED_STATE)
+        self.assertIsNone(undo_move(record))
+        
+        record, state = redo_move(record)
+        record, state = redo_move(record)
+        self.assertEqual(state, apply_algorithm(RubiksCube.SOLVED_STATE, 'R U'))
+        self.assertIsNone(redo_move(record))
+    
+    def test_new_move_clears_redo(self):
+        """Test that a move after an undo drops the moves that could be redone."""
+        record, _ = undo_move(play(new_record(), ['R', 'U']))
+        record = play(record, ['F'])
+        self.assertIsNone(redo_move(record))
+        self.assertEqual(record['undo'], 'R F')
+    
+    def test_undo_is_bounded(self):
+        """Test that only the last MAX_UNDO_MOVES moves can be undone."""
+        record = play(new_record(), ['R'] * (MAX_UNDO_MOVES + 10))
+        self.assertEqual(len(record['undo'].split()), MAX_UNDO_MOVES)
+        
+        replaced = replace_state(record, record_state(record))
+        self.assertIsNone(undo_move(replaced))
+
+if __name__ == '__main__':
+    unittest.main()
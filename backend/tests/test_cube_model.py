@@ -6,7 +6,9 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from models.cube import RubiksCube
-from utils.cube_state_adapter import convert_3d_to_2d_state, convert_2d_to_3d_state
+from models.move_engine import state_to_2d
+from utils.cube_state_adapter import (convert_3d_to_2d_state, convert_2d_to_3d_state,
+                                      is_default_state, is_solved_state)
 
 class TestCubeModel(unittest.TestCase):
     """Test the 3D Rubik's Cube model."""
@@ -17,8 +19,8 @@ class TestCubeModel(unittest.TestCase):
         state = cube.get_state()
         
         # Check that each face has a single color
-        faces = ['right', 'left', 'up', 'down', 'front', 'back']
-        expected_colors = ['blue', 'green', 'white', 'yellow', 'red', 'orange']
+        faces = ['left', 'right', 'up', 'down', 'front', 'back']
+        expected_colors = ['green', 'blue', 'white', 'yellow', 'red', 'orange']
         
         for i, face in enumerate(state):
             color = expected_colors[i]
@@ -58,8 +60,8 @@ class TestCubeModel(unittest.TestCase):
         
         # The cube should now be back in the solved state
         state = cube.get_state()
-        faces = ['right', 'left', 'up', 'down', 'front', 'back']
-        expected_colors = ['blue', 'green', 'white', 'yellow', 'red', 'orange']
+        faces = ['left', 'right', 'up', 'down', 'front', 'back']
+        expected_colors = ['green', 'blue', 'white', 'yellow', 'red', 'orange']
         
         for i, face in enumerate(state):
             color = expected_colors[i]
@@ -91,6 +93,38 @@ class TestCubeModel(unittest.TestCase):
             self.assertEqual(len(state_3d[i]), len(state_3d_converted[i]))
             for j in range(len(state_3d[i])):
                 self.assertEqual(state_3d[i][j], state_3d_converted[i][j])
+    
+    def test_state_key(self):
+        """Test that packed state keys are canonical and reversible."""
+        cube = RubiksCube()
+        self.assertEqual(cube.state_key, RubiksCube.SOLVED_KEY)
+        
+        cube.make_move("R U")
+        other = RubiksCube()
+        other.make_move("R")
+        other.make_move("U")
+        self.assertEqual(cube.state_key, other.state_key)
+        self.assertNotEqual(cube.state_key, RubiksCube.SOLVED_KEY)
+        self.assertEqual(RubiksCube.unpack_state(cube.state_key), cube.state)
+    
+    def test_is_solved(self):
+        """Test solved checks against the precomputed solved keys."""
+        cube = RubiksCube()
+        cube.make_move("x y")
+        self.assertTrue(cube.is_solved())
+        self.assertTrue(is_solved_state(state_to_2d(cube.state)))
+        self.assertFalse(is_default_state(state_to_2d(cube.state)))
+        self.assertTrue(is_default_state(state_to_2d(RubiksCube.SOLVED_STATE)))
+        
+        cube.make_move("R")
+        self.assertFalse(cube.is_solved())
+        self.assertFalse(is_solved_state(state_to_2d(cube.state)))
+    
+    def test_unknown_colors(self):
+        """Test that states with colors outside the scheme cannot be packed."""
+        with self.assertRaises(ValueError):
+            RubiksCube.pack_state(('purple',) * 54)
+        self.assertFalse(is_solved_state([['purple'] * 9] * 6))
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,221 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestConfig
+from models.cube import RubiksCube
+from models.move_engine import apply_moves, state_to_2d
+from models.solver_tables import get_tables
+from utils.cube_state_adapter import state_from_packed, state_to_facelets
+
+class TestCubeRoutes(unittest.TestCase):
+    """Test the cube API endpoints."""
+    
+    @classmethod
+    def setUpClass(cls):
+        # The solve routes never build tables themselves; make sure they exist
+        get_tables(wait=True)
+    
+    def setUp(self):
+        self.client = create_app(TestConfig).test_client()
+        self.client.post('/api/cube/reset')
+    
+    def test_move(self):
+        """Test that a single move is applied and stored in the session."""
+        response = self.client.post('/api/cube/move', json={'move': 'R'})
+        self.assertEqual(response.status_code, 200)
+        expected = state_to_2d(apply_moves(RubiksCube.SOLVED_STATE, ['R']))
+        self.assertEqual(response.get_json()['cubeState'], expected)
+        
+        response = self.client.get('/api/cube/state')
+        self.assertEqual(response.get_json()['cubeState'], expected)
+    
+    def test_cookie_holds_only_user_id(self):
+        """Test that user data stays server-side instead of in the session cookie."""
+        with self.client.session_transaction() as session:
+            session['user_data'] = {'cube_state': [['red'] * 9] * 6}
+        self.client.post('/api/cube/move', json={'move': 'R'})
+        with self.client.session_transaction() as session:
+            self.assertNotIn('user_data', session)
+            self.assertIn('user_id', session)
+    
+    def test_cookie_not_resent(self):
+        """Test that the session cookie is only sent when the user id is first set."""
+        client = create_app(TestConfig).test_client()
+        self.assertIn('Set-Cookie', client.get('/api/cube/state').headers)
+        self.assertNotIn('Set-Cookie', client.get('/api/cube/state').headers)
+    
+    def test_base_version(self):
+        """Test that moves based on the current version are applied without a full state."""
+        version = self.client.get('/api/cube/state').get_json()['version']
+        response = self.client.post('/api/cube/move', json={'move': 'R', 'baseVersion': version})
+        self.assertEqual(response.get_json()['version'], version + 1)
+        response = self.client.post('/api/cube/moves',
+                                    json={'moves': "U F", 'baseVersion': version + 1})
+        self.assertEqual(response.get_json()['version'], version + 3)
+        
+        response = self.client.get(f'/api/cube/history?since={version}')
+        self.assertEqual(response.get_json()['moves'], ['R', 'U', 'F'])
+    
+    def test_version_conflict(self):
+        """Test that a move based on an old version is refused with what changed since."""
+        version = self.client.get('/api/cube/state').get_json()['version']
+        self.client.post('/api/cube/move', json={'move': 'R', 'baseVersion': version})
+        response = self.client.post('/api/cube/move', json={'move': 'U', 'baseVersion': version})
+        self.assertEqual(response.status_code, 409)
+        data = response.get_json()
+        self.assertEqual(data['version'], version + 1)
+        self.assertEqual(data['moves'], ['R'])
+        self.assertEqual(data['cubeState'],
+                         state_to_2d(apply_moves(RubiksCube.SOLVED_STATE, ['R'])))
+    
+    def test_undo_redo(self):
+        """Test that undo and redo each apply one move on top of the log."""
+        self.client.post('/api/cube/moves', json={'moves': "R U"})
+        response = self.client.post('/api/cube/undo')
+        data = response.get_json()
+        self.assertEqual(data['move'], "U'")
+        self.assertEqual(data['cubeState'],
+                         state_to_2d(apply_moves(RubiksCube.SOLVED_STATE, ['R'])))
+        self.assertTrue(data['canUndo'])
+        self.assertTrue(data['canRedo'])
+        
+        data = self.client.post('/api/cube/redo', json={'baseVersion': data['version']}).get_json()
+        self.assertEqual(data['move'], 'U')
+        self.assertFalse(data['canRedo'])
+        self.assertEqual(self.client.post('/api/cube/redo').status_code, 400)
+        
+        self.client.post('/api/cube/reset')
+        self.assertEqual(self.client.post('/api/cube/undo').status_code, 400)
+    
+    def test_undo_with_client_state(self):
+        """Test that a client sending its unchanged state with each move can still undo."""
+        state = self.client.post('/api/cube/move', json={'move': 'R'}).get_json()['cubeState']
+        self.client.post('/api/cube/move', json={'move': 'U', 'currentState': state})
+        data = self.client.post('/api/cube/undo').get_json()
+        self.assertEqual(data['cubeState'], state)
+    
+    def test_invalid_move(self):
+        """Test that an unknown move is rejected."""
+        response = self.client.post('/api/cube/move', json={'move': 'Q'})
+        self.assertEqual(response.status_code, 400)
+        for move in (5, ['R'], {'move': 'R'}):
+            response = self.client.post('/api/cube/move', json={'move': move})
+            self.assertEqual(response.status_code, 400)
+    
+    def test_moves_string(self):
+        """Test that a whole algorithm string is applied in one request."""
+        response = self.client.post('/api/cube/moves', json={'moves': "R U R' U'"})
+        self.assertEqual(response.status_code, 200)
+        expected = state_to_2d(apply_moves(RubiksCube.SOLVED_STATE, ['R', 'U', "R'", "U'"]))
+        self.assertEqual(response.get_json()['cubeState'], expected)
+        self.assertNotIn('steps', response.get_json())
+    
+    def test_moves_malformed_state(self):
+        """Test that a state without 9 stickers per face is rejected."""
+        for route, body in (('/api/cube/move', {'move': 'R'}), ('/api/cube/moves', {'moves': 'R U'})):
+            body['currentState'] = [['red', 'red']] * 6
+            response = self.client.post(route, json=body)
+            self.assertEqual(response.status_code, 400)
+    
+    def test_non_string_stickers(self):
+        """Test that stickers that are not strings are rejected instead of failing."""
+        routes = (('/api/cube/move', {'move': 'R'}), ('/api/cube/moves', {'moves': 'R U'}),
+                  ('/api/cube/solve', {}), ('/api/cube/solve/stages', {}))
+        for sticker in ([], {}, 5, None):
+            for route, body in routes:
+                state = [['red'] * 9 for _ in range(6)]
+                state[2][4] = sticker
+                response = self.client.post(route, json={**body, 'currentState': state})
+                self.assertEqual(response.status_code, 400, (route, sticker))
+    
+    def test_compact_formats(self):
+        """Test that compact state formats are negotiated and accepted."""
+        expected = apply_moves(RubiksCube.SOLVED_STATE, ['R'])
+        response = self.client.post('/api/cube/move?format=facelet', json={'move': 'R'})
+        facelets = response.get_json()['cubeState']
+        self.assertEqual(facelets, state_to_facelets(expected))
+        
+        response = self.client.post('/api/cube/move', json={'move': "R'", 'currentState': facelets},
+                                    headers={'X-Cube-State-Format': 'packed'})
+        packed = response.get_json()['cubeState']
+        self.assertEqual(state_from_packed(packed), RubiksCube.SOLVED_STATE)
+        
+        response = self.client.post('/api/cube/moves', json={'moves': 'R', 'currentState': packed})
+        self.assertEqual(response.get_json()['cubeState'], state_to_2d(expected))
+    
+    def test_invalid_compact_state(self):
+        """Test that a malformed compact state is rejected."""
+        for state in ('U' * 53 + 'Q', 'not base64!'):
+            response = self.client.post('/api/cube/move', json={'move': 'R', 'currentState': state})
+            self.assertEqual(response.status_code, 400)
+    
+    def test_moves_with_steps(self):
+        """Test that per-step states are returned when requested."""
+        response = self.client.post('/api/cube/moves',
+                                    json={'moves': ['F', 'F'], 'includeSteps': True})
+        data = response.get_json()
+        self.assertEqual(len(data['steps']), 2)
+        self.assertEqual(data['steps'][-1], data['cubeState'])
+        self.assertEqual(data['cubeState'],
+                         state_to_2d(apply_moves(RubiksCube.SOLVED_STATE, ['F2'])))
+    
+    def test_moves_invalid(self):
+        """Test that a sequence containing an unknown move is rejected."""
+        response = self.client.post('/api/cube/moves', json={'moves': 'R Q'})
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/cube/moves', json={'moves': ''})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_solve(self):
+        """Test that the solver returns a sequence solving the session cube."""
+        self.client.post('/api/cube/moves', json={'moves': "R U F' D2"})
+        response = self.client.post('/api/cube/solve', json={'timeBudget': 5})
+        self.assertEqual(response.status_code, 200)
+        solution = response.get_json()['solution']
+        
+        response = self.client.post('/api/cube/moves', json={'moves': solution})
+        self.assertEqual(response.get_json()['cubeState'], state_to_2d(RubiksCube.SOLVED_STATE))
+    
+    def test_solve_invalid_state(self):
+        """Test that an unsolvable state is rejected."""
+        state = state_to_2d(RubiksCube.SOLVED_STATE)
+        state[4][0], state[2][0] = state[2][0], state[4][0]
+        response = self.client.post('/api/cube/solve', json={'currentState': state})
+        self.assertEqual(response.status_code, 400)
+    
+    def test_solve_invalid_state_while_building(self):
+        """Test that an unsolvable state is rejected even before the tables are ready."""
+        state = state_to_2d(RubiksCube.SOLVED_STATE)
+        state[4][0], state[2][0] = state[2][0], state[4][0]
+        with mock.patch('routes.cube_routes.get_two_phase_solver', return_value=None), \
+                mock.patch('routes.cube_routes.get_stage_solver', return_value=None):
+            for route in ('/api/cube/solve', '/api/cube/solve/stages'):
+                response = self.client.post(route, json={'currentState': state})
+                self.assertEqual(response.status_code, 400)
+    
+    def test_solve_invalid_time_budget(self):
+        """Test that a non-finite time budget is rejected."""
+        for budget in ('nan', 0, -1):
+            response = self.client.post('/api/cube/solve', json={'timeBudget': budget})
+            self.assertEqual(response.status_code, 400)
+    
+    def test_solve_stages(self):
+        """Test that the stage hints solve the session cube."""
+        self.client.post('/api/cube/moves', json={'moves': "R U F' D2"})
+        response = self.client.post('/api/cube/solve/stages', json={})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['nextStage'], data['stages'][0]['stage'])
+        moves = [move for stage in data['stages'] for move in stage['moves']]
+        
+        response = self.client.post('/api/cube/moves', json={'moves': moves})
+        self.assertEqual(response.get_json()['cubeState'], state_to_2d(RubiksCube.SOLVED_STATE))
+
+if __name__ == '__main__':
+    unittest.main()
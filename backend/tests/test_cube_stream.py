@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import json
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestConfig
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from utils.cube_state_adapter import state_to_facelets
+from utils.cube_stream import CubeChannel
+
+def parse_event(chunk):
+    """Split one Server-Sent Event into its name and data."""
+    lines = (chunk.decode() if isinstance(chunk, bytes) else chunk).strip().split('\n')
+    fields = dict(line.split(': ', 1) for line in lines)
+    return fields['event'], json.loads(fields['data'])
+
+class TestCubeStream(unittest.TestCase):
+    """Test the streaming cube channel."""
+    
+    def setUp(self):
+        self.client = create_app(TestConfig).test_client()
+        self.client.post('/api/cube/reset')
+        self.token = self.client.post('/api/cube/stream').get_json()['token']
+    
+    def test_batched_moves(self):
+        """Test that moves queued within a frame are applied as one batch."""
+        response = self.client.get(f'/api/cube/stream/{self.token}')
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        events = iter(response.response)
+        event, data = parse_event(next(events))
+        self.assertEqual(event, 'state')
+        version = data['version']
+        
+        for moves in ('R', "U R'"):
+            reply = self.client.post(f'/api/cube/stream/{self.token}/moves', data=moves,
+                                     content_type='text/plain')
+            self.assertEqual(reply.status_code, 204)
+        
+        event, data = parse_event(next(events))
+        self.assertEqual(event, 'moves')
+        self.assertEqual(data['moves'], ['R', 'U', "R'"])
+        self.assertEqual(data['version'], version + 3)
+        expected = apply_algorithm(RubiksCube.SOLVED_STATE, "R U R'")
+        self.assertEqual(data['state'], state_to_facelets(expected))
+        response.close()
+        
+        # The moves were stored like any other
+        self.assertEqual(self.client.get('/api/cube/state').get_json()['version'], version + 3)
+    
+    def test_invalid_moves(self):
+        """Test that bad moves are refused before they are queued."""
+        reply = self.client.post(f'/api/cube/stream/{self.token}/moves', data='Q')
+        self.assertEqual(reply.status_code, 400)
+    
+    def test_close(self):
+        """Test that a closed channel's token stops working."""
+        self.assertEqual(self.client.delete(f'/api/cube/stream/{self.token}').status_code, 204)
+        self.assertEqual(self.client.get(f'/api/cube/stream/{self.token}').status_code, 404)
+        reply = self.client.post(f'/api/cube/stream/{self.token}/moves', data='R')
+        self.assertEqual(reply.status_code, 404)
+    
+    def test_channel_stops_when_closed(self):
+        """Test that closing a channel ends its event stream."""
+        channel = CubeChannel('stream-user', frame_interval=0)
+        events = channel.events()
+        next(events)
+        channel.close()
+        self.assertEqual(list(events), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import random
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from models.cubie import CornerCubie, CubieCube, EdgeCubie
+from models.move_engine import FACELET_INDEX, apply_moves
+from models.two_phase import MOVE_CUBES, SOLVER_MOVES
+
+class TestCubieCube(unittest.TestCase):
+    """Test the cubie-level representation used by the solver."""
+    
+    def test_facelet_round_trip(self):
+        """Test that facelets survive conversion to cubies and back."""
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, "R U F' L2 D B")
+        cube = CubieCube.from_facelets(state)
+        self.assertEqual(cube.to_facelets(RubiksCube.COLORS), state)
+    
+    def test_multiply_matches_move_engine(self):
+        """Test that multiplying move cubes agrees with applying the moves."""
+        moves = ['R', 'U2', "F'", 'D', 'L', "B2"]
+        cube = CubieCube()
+        for move in moves:
+            cube = cube.multiply(MOVE_CUBES[SOLVER_MOVES.index(move)])
+        state = apply_moves(RubiksCube.SOLVED_STATE, moves)
+        self.assertEqual(cube, CubieCube.from_facelets(state))
+    
+    def test_invalid_state(self):
+        """Test that impossible states are rejected."""
+        state = list(RubiksCube.SOLVED_STATE)
+        # Twist a single corner by swapping two of its stickers
+        up_right_front = (2 * 9 + 8, 1 * 9 + 0, 4 * 9 + 2)
+        state[up_right_front[0]], state[up_right_front[1]] = \
+            state[up_right_front[1]], state[up_right_front[0]]
+        with self.assertRaises(ValueError):
+            CubieCube.from_facelets(tuple(state))
+    
+    def test_encode_round_trip(self):
+        """Test that encode and decode are inverses."""
+        rng = random.Random(8)
+        for _ in range(20):
+            scramble = [rng.choice(SOLVER_MOVES) for _ in range(20)]
+            cube = CubieCube.from_facelets(apply_moves(RubiksCube.SOLVED_STATE, scramble))
+            self.assertEqual(CubieCube.decode(cube.encode()), cube)
+        self.assertEqual(CubieCube().encode(), 0)
+    
+    def test_coordinates_round_trip(self):
+        """Test that each coordinate setter inverts its getter."""
+        cube = CubieCube.from_facelets(apply_algorithm(RubiksCube.SOLVED_STATE, "R U F' L2 D B"))
+        for name in ('twist', 'flip', 'corner_perm', 'edge_perm'):
+            value = getattr(cube, 'get_' + name)()
+            other = CubieCube()
+            getattr(other, 'set_' + name)(value)
+            self.assertEqual(getattr(other, 'get_' + name)(), value, name)
+    
+    def test_slots(self):
+        """Test that cubies and cubie cubes carry no per-instance __dict__."""
+        self.assertFalse(hasattr(CubieCube(), '__dict__'))
+        self.assertFalse(hasattr(EdgeCubie((0, 1, 1), 'up', 'white', 'front', 'red'), '__dict__'))
+
+class TestRubiksCubeCubies(unittest.TestCase):
+    """Test the cubies derived from a RubiksCube's sticker state."""
+    
+    def test_solved_cubies(self):
+        """Test that a solved cube has 26 cubies with matching colors."""
+        cubies = RubiksCube().cubies
+        self.assertEqual(len(cubies), 26)
+        corner = cubies[(1, 1, 1)]
+        self.assertIsInstance(corner, CornerCubie)
+        self.assertEqual(corner.get_colors(), {'up': 'white', 'front': 'red', 'right': 'blue'})
+    
+    def test_cubies_follow_moves(self):
+        """Test that cubies reflect the state after a move."""
+        cube = RubiksCube()
+        cube.make_move('R')
+        self.assertEqual(cube.cubies[(1, 1, 1)].get_color('up'), 'red')
+        self.assertEqual(cube.get_cubie_cube(), MOVE_CUBES[SOLVER_MOVES.index('R')])
+    
+    def test_state_from_cubies(self):
+        """Test that rendering cubies through the facelet map gives back the state."""
+        cube = RubiksCube()
+        cube.make_move("R U F' L2 D B M")
+        self.assertEqual(RubiksCube.state_from_cubies(cube.cubies), cube.state)
+    
+    def test_facelet_index(self):
+        """Test that the facelet map covers every sticker once."""
+        self.assertEqual(sorted(FACELET_INDEX.values()), list(range(54)))
+        self.assertEqual(FACELET_INDEX[((0, 0, 1), 'front')], 4 * 9 + 4)
+
+if __name__ == '__main__':
+    unittest.main()
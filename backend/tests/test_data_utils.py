@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.data_utils import ContentRepository
+
+def write_content(path, title, mtime):
+    with open(path, 'w') as f:
+        json.dump({
+            'learning_modules': [{'id': 1, 'title': title, 'practice_questions': [{'question': 'Q'}]}],
+            'quiz_questions': [{'id': 3, 'question': 'Which?', 'correct_answer': 'A'}]
+        }, f)
+    os.utime(path, ns=(mtime, mtime))
+
+class TestContentRepository(unittest.TestCase):
+    """Test the indexed, reloading content cache."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'data.json')
+        write_content(self.path, 'Basics', 1_000_000_000)
+        self.repository = ContentRepository(self.path, check_interval=0)
+    
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+    
+    def test_indexes(self):
+        """Test that modules and questions are looked up by id."""
+        content = self.repository.get()
+        self.assertEqual(content.modules[1]['title'], 'Basics')
+        self.assertEqual(content.questions[3]['question'], 'Which?')
+        self.assertEqual(content.practice_questions[(1, 0)]['question'], 'Q')
+    
+    def test_parsed_once(self):
+        """Test that an unchanged file is not parsed again."""
+        content = self.repository.get()
+        with mock.patch('utils.data_utils.json.load') as load:
+            self.assertIs(self.repository.get(), content)
+            load.assert_not_called()
+    
+    def test_reload_on_change(self):
+        """Test that edits go live once the modification time changes."""
+        version = self.repository.get().version
+        write_content(self.path, 'Notation', 2_000_000_000)
+        content = self.repository.get()
+        self.assertEqual(content.modules[1]['title'], 'Notation')
+        self.assertNotEqual(content.version, version)
+    
+    def test_check_interval(self):
+        """Test that the file is not checked again within the interval."""
+        repository = ContentRepository(self.path, check_interval=60)
+        repository.get()
+        with mock.patch('utils.data_utils.os.stat') as stat:
+            repository.get()
+            stat.assert_not_called()
+    
+    def test_invalid_edit_keeps_content(self):
+        """Test that a half-written file leaves the previous content in place."""
+        self.repository.get()
+        with open(self.path, 'w') as f:
+            f.write('{"learning_modules": [')
+        self.assertEqual(self.repository.get().modules[1]['title'], 'Basics')
+
+if __name__ == '__main__':
+    unittest.main()
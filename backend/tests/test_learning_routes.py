@@ -0,0 +1,46 @@
+import unittest
+import sys
+import os
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestConfig
+from utils.session_manager import get_user_field, set_user_field
+
+class TestLearningRoutes(unittest.TestCase):
+    """Test the learning module API endpoints."""
+    
+    def setUp(self):
+        self.client = create_app(TestConfig).test_client()
+        self.client.post('/api/start')
+        with self.client.session_transaction() as session:
+            self.user_id = session['user_id']
+    
+    def test_module_not_modified(self):
+        """Test that a revalidated module is a 304 that still records the start time."""
+        response = self.client.get('/api/module/1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        
+        set_user_field(self.user_id, 'module_times', {})
+        response = self.client.get('/api/module/1',
+                                   headers={'If-None-Match': response.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('1', get_user_field(self.user_id, 'module_times'))
+    
+    def test_complete_module(self):
+        """Test that completing a module records its time and moves the user on."""
+        self.client.get('/api/module/2')
+        response = self.client.post('/api/module/2/complete', json={'answers': {'0': 'F'}})
+        self.assertEqual(response.get_json()['next_module'], 3)
+        self.assertIn('time_spent', get_user_field(self.user_id, 'module_times')['2'])
+        self.assertEqual(get_user_field(self.user_id, 'module_answers'), {'2': {'0': 'F'}})
+    
+    def test_missing_module(self):
+        """Test that an unknown module is a 404."""
+        self.assertEqual(self.client.get('/api/module/999').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
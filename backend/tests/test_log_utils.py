@@ -0,0 +1,61 @@
+import unittest
+import sys
+import os
+import io
+import json
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from utils.log_utils import configure_logging, get_logger
+
+class CountingState:
+    """A stand-in for a cube state that counts how often it is formatted."""
+    
+    def __init__(self):
+        self.formatted = 0
+    
+    def __str__(self):
+        self.formatted += 1
+        return 'state'
+
+class TestLogUtils(unittest.TestCase):
+    """Test the logging layer."""
+    
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.logger = get_logger('test')
+    
+    def tearDown(self):
+        configure_logging()
+    
+    def test_debug_off_formats_nothing(self):
+        """Test that arguments of disabled records are never formatted."""
+        configure_logging('INFO', stream=self.stream)
+        state = CountingState()
+        self.logger.debug("Moved to %s", state)
+        self.assertEqual(state.formatted, 0)
+        self.assertEqual(self.stream.getvalue(), '')
+    
+    def test_json_format(self):
+        """Test that records are written as JSON lines."""
+        configure_logging('DEBUG', json_format=True, stream=self.stream)
+        self.logger.info("Moved to %s", CountingState())
+        entry = json.loads(self.stream.getvalue())
+        self.assertEqual(entry['message'], 'Moved to state')
+        self.assertEqual(entry['level'], 'INFO')
+    
+    def test_endpoint_sampling(self):
+        """Test that sampled endpoints drop debug records but keep warnings."""
+        configure_logging('DEBUG', stream=self.stream, sample_rates={'noisy': 0})
+        app = Flask(__name__)
+        app.add_url_rule('/noisy', 'noisy', lambda: '')
+        with app.test_request_context('/noisy'):
+            self.logger.debug("dropped")
+            self.logger.warning("kept")
+        self.assertNotIn('dropped', self.stream.getvalue())
+        self.assertIn('kept', self.stream.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
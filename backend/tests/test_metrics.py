@@ -0,0 +1,82 @@
+import unittest
+import sys
+import os
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from utils.metrics import Registry, moves_applied
+
+class TestMetrics(unittest.TestCase):
+    """Test the histograms, counters and the /metrics endpoint."""
+    
+    def test_histogram_buckets(self):
+        """Test that histogram buckets are cumulative and end with +Inf."""
+        registry = Registry()
+        histogram = registry.histogram('test_seconds', 'Test.', buckets=(0.1, 1.0), route='a')
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+        
+        lines = registry.render().splitlines()
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{route="a",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{route="a",le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{route="a",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_sum{route="a"} 6.05', lines)
+        self.assertIn('test_seconds_count{route="a"} 4', lines)
+    
+    def test_same_labels_same_metric(self):
+        """Test that a name and label set always return the same metric."""
+        registry = Registry()
+        counter = registry.counter('test_total', 'Test.', kind='x')
+        self.assertIs(registry.counter('test_total', 'Test.', kind='x'), counter)
+        self.assertIsNot(registry.counter('test_total', 'Test.', kind='y'), counter)
+    
+    def test_metrics_endpoint(self):
+        """Test that requests, phases and moves show up at /metrics."""
+        client = create_app({'WARM_ON_START': False, 'METRICS_ENABLED': True}).test_client()
+        client.post('/api/start')
+        before = moves_applied.value
+        client.post('/api/cube/moves', json={'moves': "R U R' U'"})
+        self.assertEqual(moves_applied.value, before + 4)
+        state = client.get('/api/cube/state').get_json()['cubeState']
+        client.post('/api/cube/moves', json={'moves': 'F', 'currentState': state})
+        
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('rubiks_request_seconds_count{endpoint="cube.make_cube_moves"}', text)
+        for phase in ('session_load', 'replay_log', 'deserialize', 'replace_state',
+                      'apply_moves', 'serialize', 'session_save'):
+            self.assertIn(f'rubiks_phase_seconds_count{{phase="{phase}"}}', text)
+        self.assertIn('rubiks_active_users ', text)
+        self.assertNotIn('endpoint="metrics"', text)
+    
+    def test_metrics_local_only(self):
+        """Test that without a token only this host can scrape the metrics."""
+        client = create_app({'WARM_ON_START': False, 'METRICS_ENABLED': True}).test_client()
+        self.assertEqual(client.get('/metrics').status_code, 200)
+        response = client.get('/metrics', environ_base={'REMOTE_ADDR': '203.0.113.7'})
+        self.assertEqual(response.status_code, 404)
+    
+    def test_metrics_token(self):
+        """Test that a configured token is required from every address."""
+        client = create_app({'WARM_ON_START': False, 'METRICS_ENABLED': True,
+                             'METRICS_TOKEN': 'secret'}).test_client()
+        self.assertEqual(client.get('/metrics').status_code, 404)
+        wrong = {'Authorization': 'Bearer guess'}
+        self.assertEqual(client.get('/metrics', headers=wrong).status_code, 404)
+        right = {'Authorization': 'Bearer secret'}
+        response = client.get('/metrics', headers=right,
+                              environ_base={'REMOTE_ADDR': '203.0.113.7'})
+        self.assertEqual(response.status_code, 200)
+    
+    def test_metrics_disabled(self):
+        """Test that the endpoint is off by default."""
+        client = create_app({'WARM_ON_START': False}).test_client()
+        self.assertEqual(client.get('/metrics').status_code, 404)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import sys
+import os
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.cube import RubiksCube
+from models.move_engine import (IDENTITY, MOVE_PERMUTATIONS, apply_move, compose,
+                                state_from_2d, state_to_2d)
+
+class TestMoveEngine(unittest.TestCase):
+    """Test the permutation-table move engine."""
+    
+    def test_all_moves_are_permutations(self):
+        """Test that all face, slice, wide and rotation moves are valid permutations."""
+        for face in 'UDLRFBMESudlrfbxyz':
+            for suffix in ('', "'", '2'):
+                perm = MOVE_PERMUTATIONS[face + suffix]
+                self.assertEqual(sorted(perm), list(IDENTITY), face + suffix)
+    
+    def test_derived_moves(self):
+        """Test that slice, wide and rotation moves agree with their face-turn definitions."""
+        def sequence(*moves):
+            perm = IDENTITY
+            for move in moves:
+                perm = compose(perm, MOVE_PERMUTATIONS[move])
+            return perm
+        
+        self.assertEqual(MOVE_PERMUTATIONS['x'], sequence('R', "M'", "L'"))
+        self.assertEqual(MOVE_PERMUTATIONS['y'], sequence('U', "E'", "D'"))
+        self.assertEqual(MOVE_PERMUTATIONS['z'], sequence('F', 'S', "B'"))
+        self.assertEqual(MOVE_PERMUTATIONS['r'], sequence('R', "M'"))
+        # Turning U after an x rotation turns what was the front face
+        self.assertEqual(sequence('x', 'U', "x'"), MOVE_PERMUTATIONS['F'])
+    
+    def test_inverse_and_half_turns(self):
+        """Test that X X' is the identity and X2 equals X X."""
+        for face in 'UDLRFB':
+            turn = MOVE_PERMUTATIONS[face]
+            self.assertEqual(compose(turn, MOVE_PERMUTATIONS[face + "'"]), IDENTITY)
+            self.assertEqual(compose(turn, turn), MOVE_PERMUTATIONS[face + '2'])
+            self.assertEqual(compose(MOVE_PERMUTATIONS[face + '2'], MOVE_PERMUTATIONS[face + '2']),
+                             IDENTITY)
+    
+    def test_right_face_clockwise(self):
+        """Test that an R move cycles the right columns of the adjacent faces."""
+        state = apply_move(RubiksCube.SOLVED_STATE, 'R')
+        state_2d = state_to_2d(state)
+        self.assertEqual(state_2d[1], ['blue'] * 9)
+        self.assertEqual([state_2d[2][i] for i in (2, 5, 8)], ['red'] * 3)
+        self.assertEqual([state_2d[5][i] for i in (0, 3, 6)], ['white'] * 3)
+        self.assertEqual([state_2d[3][i] for i in (2, 5, 8)], ['orange'] * 3)
+        self.assertEqual([state_2d[4][i] for i in (2, 5, 8)], ['yellow'] * 3)
+    
+    def test_sexy_move_order(self):
+        """Test that R U R' U' returns to solved after six repetitions."""
+        state = RubiksCube.SOLVED_STATE
+        for _ in range(6):
+            for move in ('R', 'U', "R'", "U'"):
+                state = apply_move(state, move)
+                self.assertEqual(len(state), 54)
+        self.assertEqual(state, RubiksCube.SOLVED_STATE)
+    
+    def test_invalid_move(self):
+        """Test that unknown moves are rejected."""
+        with self.assertRaises(ValueError):
+            apply_move(RubiksCube.SOLVED_STATE, 'Q')
+    
+    def test_2d_round_trip(self):
+        """Test conversion between state tuples and the 2D frontend format."""
+        state = apply_move(apply_move(RubiksCube.SOLVED_STATE, 'F'), 'U2')
+        self.assertEqual(state_from_2d(state_to_2d(state)), state)
+    
+    def test_cube_uses_engine(self):
+        """Test that RubiksCube.make_move keeps its state between moves."""
+        cube = RubiksCube()
+        cube.make_move('R')
+        cube.make_move('U')
+        self.assertNotEqual(cube.state, RubiksCube.SOLVED_STATE)
+        cube.make_move("U'")
+        cube.make_move("R'")
+        self.assertEqual(cube.state, RubiksCube.SOLVED_STATE)
+
+if __name__ == '__main__':
+    unittest.main()
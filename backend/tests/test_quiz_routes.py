@@ -0,0 +1,74 @@
+import unittest
+import sys
+import os
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import TestConfig
+from utils.data_utils import repository
+from utils.session_manager import set_user_field
+
+class TestQuizRoutes(unittest.TestCase):
+    """Test the quiz API endpoints."""
+    
+    def setUp(self):
+        self.client = create_app(TestConfig).test_client()
+        self.client.post('/api/start')
+        self.content = repository.get()
+        self.first, self.second = self.content.question_order[:2]
+    
+    def answer(self, question_id, correct):
+        answer = self.content.answer_key[question_id] if correct else 'not an answer'
+        return self.client.post(f'/api/quiz/{question_id}/answer', json={'answer': answer}).get_json()
+    
+    def test_next_question(self):
+        """Test that answers link to the neighbouring questions in id order."""
+        data = self.answer(self.first, True)
+        self.assertTrue(data['is_correct'])
+        self.assertEqual(data['next_question'], self.second)
+        self.assertIsNone(data['previous_question'])
+        
+        data = self.answer(self.content.question_order[-1], False)
+        self.assertFalse(data['is_correct'])
+        self.assertIsNone(data['next_question'])
+    
+    def test_incremental_score(self):
+        """Test that the score follows answers, including changed answers."""
+        self.answer(self.first, True)
+        self.answer(self.second, True)
+        self.answer(self.second, False)
+        results = self.client.get('/api/results').get_json()
+        self.assertEqual(results['correct_answers'], 1)
+        self.assertEqual(results['total_questions'], len(self.content.question_order))
+        
+        self.client.post('/api/reset-quiz')
+        self.assertEqual(self.client.get('/api/results').get_json()['correct_answers'], 0)
+    
+    def test_score_recomputed_for_new_content(self):
+        """Test that a score kept for older content is recomputed once."""
+        self.answer(self.first, True)
+        with self.client.session_transaction() as session:
+            user_id = session['user_id']
+        set_user_field(user_id, 'quiz_content_version', 'older')
+        set_user_field(user_id, 'quiz_correct', 5)
+        self.assertEqual(self.client.get('/api/results').get_json()['correct_answers'], 1)
+    
+    def test_question_etag(self):
+        """Test that a question the browser already has is answered with a 304."""
+        response = self.client.get(f'/api/quiz/{self.first}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json(), self.content.questions[self.first])
+        self.assertIn('max-age', response.headers['Cache-Control'])
+        etag = response.headers['ETag']
+        
+        response = self.client.get(f'/api/quiz/{self.first}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+        
+        response = self.client.get(f'/api/quiz/{self.second}', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import sys
+import os
+import random
+import time
+from unittest import mock
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from models.move_engine import state_to_2d
+from models.scramble import generate_scramble, random_cubie_cube
+from models.solver_tables import get_tables
+from models.two_phase import TwoPhaseSolver
+from utils.scramble_pool import ScramblePool
+
+class TestScramble(unittest.TestCase):
+    """Test random state sampling, scramble generation and the scramble pool."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = TwoPhaseSolver(get_tables(wait=True)['two_phase'])
+    
+    def test_random_states_are_reachable(self):
+        """Test that every sampled state passes the solvability checks."""
+        rng = random.Random(1)
+        parities = set()
+        for _ in range(200):
+            cube = random_cubie_cube(rng)
+            cube.verify()
+            parities.add(cube.corner_parity())
+        # Both permutation parities occur
+        self.assertEqual(parities, {0, 1})
+    
+    def test_scramble_reaches_state(self):
+        """Test that the scramble turns a solved cube into the sampled state."""
+        moves, state = generate_scramble(self.solver, random.Random(2), time_budget=0.05)
+        self.assertEqual(apply_algorithm(RubiksCube.SOLVED_STATE, moves), state)
+        self.assertLessEqual(len(moves), 30)
+    
+    def test_pool_refills(self):
+        """Test that the pool fills in the background and refills after takes."""
+        pool = ScramblePool(2)
+        try:
+            deadline = time.monotonic() + 10
+            while len(pool) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(pool), 2)
+            self.assertIsNotNone(pool.take())
+            self.assertIsNotNone(pool.take())
+            while len(pool) < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(len(pool), 2)
+        finally:
+            pool.close()
+    
+    def test_pool_waits_for_tables(self):
+        """Test that the pool waits for missing tables instead of building them."""
+        with mock.patch('models.solver_tables.preload', return_value=False), \
+                mock.patch('models.solver_tables.tables_loaded', return_value=False), \
+                mock.patch('models.solver_tables.rebuild') as rebuild:
+            pool = ScramblePool(2)
+            try:
+                time.sleep(0.05)
+                self.assertIsNone(pool.take())
+            finally:
+                pool.close()
+        rebuild.assert_not_called()
+    
+    def test_scramble_route(self):
+        """Test that the route serves pooled scrambles and 503 when the pool is empty."""
+        client = create_app({'WARM_ON_START': False}).test_client()
+        moves = ['R', "U'"]
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, moves)
+        with mock.patch('routes.cube_routes.get_scramble_pool') as get_pool:
+            get_pool.return_value.take.return_value = (moves, state)
+            data = client.get('/api/cube/scramble').get_json()
+            self.assertEqual(data['scramble'], "R U'")
+            self.assertEqual(data['length'], 2)
+            self.assertEqual(data['cubeState'], state_to_2d(state))
+        
+            get_pool.return_value.take.return_value = None
+            self.assertEqual(client.get('/api/cube/scramble').status_code, 503)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest import mock
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import session_manager
+from utils.session_store import MemoryStore, SQLiteStore, create_store
+
+class StoreContract:
+    """Behaviour every session store must have."""
+    
+    def test_fields(self):
+        """Test that fields are stored per user."""
+        self.assertFalse(self.store.has_user('alice'))
+        self.store.set('alice', 'cube_state', [['red'] * 9])
+        self.store.set('alice', 'attempts', 2)
+        self.assertTrue(self.store.has_user('alice'))
+        self.assertEqual(self.store.get('alice', 'cube_state'), [['red'] * 9])
+        self.assertEqual(self.store.get('alice', 'missing', 'default'), 'default')
+        self.assertEqual(self.store.get_user('alice'), {'cube_state': [['red'] * 9], 'attempts': 2})
+        self.assertIsNone(self.store.get('bob', 'cube_state'))
+    
+    def test_values_are_copies(self):
+        """Test that mutating a returned value does not change the store."""
+        self.store.set('alice', 'quiz_answers', {})
+        answers = self.store.get('alice', 'quiz_answers')
+        answers['1'] = 'A'
+        self.assertEqual(self.store.get('alice', 'quiz_answers'), {})
+    
+    def test_user_count(self):
+        """Test that users are counted once however many fields they have."""
+        self.assertEqual(self.store.user_count(), 0)
+        self.store.update('alice', {'attempts': 1, 'quiz_answers': {}})
+        self.store.set('bob', 'attempts', 1)
+        self.assertEqual(self.store.user_count(), 2)
+
+class TestMemoryStore(StoreContract, unittest.TestCase):
+    """Test the in-memory store."""
+    
+    def setUp(self):
+        self.store = MemoryStore()
+
+class TestSQLiteStore(StoreContract, unittest.TestCase):
+    """Test the SQLite store with write-behind batching."""
+    
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'sessions.db')
+        self.store = SQLiteStore(self.path, flush_interval=60)
+    
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+    
+    def test_writes_are_batched(self):
+        """Test that buffered writes are committed in a single transaction."""
+        for move in range(100):
+            self.store.set('alice', 'moves', move)
+            self.store.set('bob', 'moves', move)
+        self.assertEqual(self.store.transactions, 0)
+        self.assertEqual(self.store.get('alice', 'moves'), 99)
+        
+        self.store.flush()
+        self.assertEqual(self.store.transactions, 1)
+    
+    def test_shared_between_processes(self):
+        """Test that another store on the same file sees committed writes."""
+        other = SQLiteStore(self.path, flush_interval=60)
+        try:
+            self.store.set('alice', 'cube_state', [['blue'] * 9])
+            self.assertFalse(other.has_user('alice'))
+            self.store.flush()
+            self.assertEqual(other.get('alice', 'cube_state'), [['blue'] * 9])
+        finally:
+            other.close()
+    
+    def test_background_flush(self):
+        """Test that the writer thread commits without an explicit flush."""
+        store = SQLiteStore(self.path, flush_interval=0.001)
+        try:
+            store.set('alice', 'attempts', 1)
+            deadline = time.monotonic() + 2
+            while not store.transactions and time.monotonic() < deadline:
+                time.sleep(0.001)
+            self.assertEqual(store.transactions, 1)
+        finally:
+            store.close()
+    
+    def test_unknown_store(self):
+        """Test that an unknown store kind is rejected."""
+        with self.assertRaises(ValueError):
+            create_store('redis')
+
+class TestSessionManagerStore(unittest.TestCase):
+    
+    def test_store_opened_per_process(self):
+        """Test that a forked worker opens its own store instead of inheriting one."""
+        store = session_manager.get_store()
+        self.assertIs(session_manager.get_store(), store)
+        with mock.patch('utils.session_manager.os.getpid', return_value=-1):
+            self.assertIsNot(session_manager.get_store(), store)
+        self.assertIsNot(session_manager.get_store(), store)
+    
+    def test_concurrent_updates(self):
+        """Test that read-modify-write from many threads loses no update."""
+        user_id = 'concurrent-user'
+        session_manager.set_user_field(user_id, 'attempts', 0)
+        
+        def work():
+            for _ in range(200):
+                session_manager.update_user_field(user_id, 'attempts', lambda n: n + 1)
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(session_manager.get_user_field(user_id, 'attempts'), 1600)
+    
+    def test_user_locks(self):
+        """Test that each user gets their own lock."""
+        lock = session_manager.user_lock('alice')
+        self.assertIs(session_manager.user_lock('alice'), lock)
+        self.assertIsNot(session_manager.user_lock('bob'), lock)
+
+if __name__ == '__main__':
+    unittest.main()
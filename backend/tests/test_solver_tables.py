@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import tempfile
+
+import numpy as np
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import solver_tables
+from models.solver_tables import StaleTablesError, load_tables, write_tables
+
+class TestSolverTables(unittest.TestCase):
+    """Test the versioned, checksummed table file."""
+    
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.bin')
+        os.close(handle)
+        self.tables = {
+            'two_phase': {'moves': np.arange(30, dtype=np.uint16).reshape(10, 3)},
+            'stages': {'cross': np.arange(7, dtype=np.uint8)},
+        }
+    
+    def tearDown(self):
+        os.remove(self.path)
+    
+    def test_round_trip(self):
+        """Test that written tables are mapped back unchanged."""
+        write_tables(self.tables, self.path)
+        tables = load_tables(self.path)
+        self.assertEqual(list(tables['two_phase']['moves']), list(range(30)))
+        self.assertEqual(list(tables['stages']['cross']), list(range(7)))
+    
+    def test_missing_file(self):
+        """Test that a missing file is reported as stale."""
+        os.remove(self.path)
+        with self.assertRaises(StaleTablesError):
+            load_tables(self.path)
+        open(self.path, 'wb').close()
+    
+    def test_corrupt_data(self):
+        """Test that the checksum catches corrupted table data."""
+        write_tables(self.tables, self.path)
+        with open(self.path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\xff')
+        with self.assertRaises(StaleTablesError):
+            load_tables(self.path)
+        load_tables(self.path, verify=False)
+    
+    def test_version_change(self):
+        """Test that a file written for an older table version is stale."""
+        write_tables(self.tables, self.path)
+        module = solver_tables.TABLE_SETS['stages']
+        original = module.TABLES_VERSION
+        module.TABLES_VERSION = original + 1
+        try:
+            with self.assertRaises(StaleTablesError):
+                load_tables(self.path)
+        finally:
+            module.TABLES_VERSION = original
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import random
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from models.move_engine import apply_moves
+from models.solver_tables import get_stage_solver
+from models.stage_solver import STAGE_NAMES, StageSolver, generate_tables
+
+def face_solved(state, face):
+    """Return True if every sticker of a face matches its center."""
+    index = RubiksCube.FACE_INDICES[face] * 9
+    return len(set(state[index:index + 9])) == 1
+
+class TestStageSolver(unittest.TestCase):
+    """Test the layer-by-layer stage solver."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = get_stage_solver()
+    
+    def test_solved_cube(self):
+        """Test that a solved cube needs no moves in any stage."""
+        stages = self.solver.solve(RubiksCube.SOLVED_STATE)
+        self.assertEqual([name for name, _ in stages], list(STAGE_NAMES))
+        self.assertTrue(all(moves == [] for _, moves in stages))
+    
+    def test_stages_solve_scrambles(self):
+        """Test that the stages solve random scrambles, one layer after another."""
+        rng = random.Random(6)
+        for _ in range(10):
+            scramble = [rng.choice('UDLRFB') + rng.choice(['', "'", '2']) for _ in range(25)]
+            state = apply_moves(RubiksCube.SOLVED_STATE, scramble)
+            stages = dict(self.solver.solve(state))
+            
+            state = apply_moves(state, stages['white_cross'] + stages['white_corners'])
+            self.assertTrue(face_solved(state, 'up'))
+            state = apply_moves(state, stages['middle_layer'] + stages['yellow_cross']
+                                + stages['yellow_face'])
+            self.assertTrue(face_solved(state, 'down'))
+            state = apply_moves(state, stages['yellow_corners'] + stages['yellow_edges'])
+            self.assertEqual(state, RubiksCube.SOLVED_STATE)
+    
+    def test_rotated_cube(self):
+        """Test that a cube held the wrong way up is turned white side up first."""
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, "R U x")
+        stages = self.solver.solve(state)
+        moves = [move for _, stage_moves in stages for move in stage_moves]
+        self.assertEqual(apply_moves(state, moves), RubiksCube.SOLVED_STATE)
+    
+    def test_rotation_is_short(self):
+        """Test that the rotation shown first never repeats an axis."""
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, "x y")
+        first = self.solver.solve(state)[0][1]
+        self.assertEqual(first[:2], ["y'", "x'"])
+    
+    def test_deterministic(self):
+        """Test that the same state always gets the same hints."""
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, "F R' D2 L B U'")
+        self.assertEqual(self.solver.solve(state), self.solver.solve(state))
+    
+    def test_generated_tables(self):
+        """Test that freshly generated tables match the stored ones."""
+        solver = StageSolver(generate_tables())
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, "F R' D2 L B U'")
+        self.assertEqual(solver.solve(state), self.solver.solve(state))
+    
+    def test_invalid_state(self):
+        """Test that impossible states are rejected."""
+        state = list(RubiksCube.SOLVED_STATE)
+        state[0], state[9] = state[9], state[0]
+        with self.assertRaises(ValueError):
+            self.solver.solve(tuple(state))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure we can import from the parent directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.algorithm import apply_algorithm
+from models.cube import RubiksCube
+from models.move_engine import apply_moves
+from models.solver_tables import get_two_phase_solver
+from models.two_phase import SOLVER_MOVES, _simplify
+
+class TestTwoPhaseSolver(unittest.TestCase):
+    """Test the two-phase solver."""
+    
+    @classmethod
+    def setUpClass(cls):
+        cls.solver = get_two_phase_solver()
+    
+    def test_solved_cube(self):
+        """Test that a solved cube needs no moves."""
+        self.assertEqual(self.solver.solve(RubiksCube.SOLVED_STATE), [])
+    
+    def test_random_scrambles(self):
+        """Test that solutions actually solve random scrambles."""
+        rng = random.Random(5)
+        for _ in range(5):
+            scramble = [rng.choice('UDLRFB') + rng.choice(['', "'", '2']) for _ in range(25)]
+            state = apply_moves(RubiksCube.SOLVED_STATE, scramble)
+            solution = self.solver.solve(state, time_budget=1.0)
+            self.assertIsNotNone(solution)
+            self.assertLessEqual(len(solution), 30)
+            self.assertEqual(apply_moves(state, solution), RubiksCube.SOLVED_STATE)
+    
+    def test_short_solution(self):
+        """Test that a short scramble gets a short solution."""
+        state = apply_algorithm(RubiksCube.SOLVED_STATE, "R U R' U'")
+        solution = self.solver.solve(state)
+        self.assertEqual(apply_moves(state, solution), RubiksCube.SOLVED_STATE)
+        self.assertLessEqual(len(solution), 4)
+    
+    def test_concurrent_solves(self):
+        """Test that threads sharing one solver each get a solution to their own cube."""
+        rng = random.Random(7)
+        states = [apply_moves(RubiksCube.SOLVED_STATE,
+                              [rng.choice('UDLRFB') + rng.choice(['', "'", '2']) for _ in range(20)])
+                  for _ in range(16)]
+        with ThreadPoolExecutor(4) as pool:
+            solutions = list(pool.map(lambda state: self.solver.solve(state, time_budget=0.05),
+                                      states))
+        for state, solution in zip(states, solutions):
+            self.assertIsNotNone(solution)
+            self.assertEqual(apply_moves(state, solution), RubiksCube.SOLVED_STATE)
+    
+    def test_max_time(self):
+        """Test that max_time bounds the search even before a first solution is found."""
+        rng = random.Random(9)
+        state = apply_moves(RubiksCube.SOLVED_STATE,
+                            [rng.choice('UDLRFB') + rng.choice(['', "'", '2']) for _ in range(25)])
+        start = time.monotonic()
+        # Too little time for any solution; the search must still stop
+        self.assertIsNone(self.solver.solve(state, time_budget=0.001, max_time=0.001))
+        self.assertLess(time.monotonic() - start, 0.5)
+    
+    def test_simplify(self):
+        """Test that turns of the same face are merged, also across the opposite face."""
+        moves = [SOLVER_MOVES.index(move) for move in ['R', 'L', 'R', 'U', "U'", 'F']]
+        self.assertEqual([SOLVER_MOVES[m] for m in _simplify(moves)], ['R2', 'L', 'F'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+"""Each user's cube as a snapshot plus an append-only, versioned move log.
+
+A cube record is one small dict of immutable values, so storing it never
+deep-copies nested state lists:
+
+    version           number of changes since the record was created
+    snapshot          facelet string (see cube_state_adapter) of the cube
+    snapshot_version  version the snapshot was taken at
+    log_start         version before the first logged move
+    log               space-separated moves, one per version from log_start
+    undo              space-separated moves that can be undone, oldest first
+    redo              space-separated undone moves that can be redone, last
+                      undone at the end
+
+The current state is the snapshot with the moves logged after it replayed
+on top. A new snapshot is taken every SNAPSHOT_INTERVAL moves, so a replay
+is never longer than that. The log keeps the last MAX_LOG_MOVES moves
+(never dropping moves after the snapshot), which lets a client that fell
+behind catch up by replaying what it missed.
+
+Replacing the whole state (a reset, or a client sending a full state)
+starts a new snapshot with an empty log.
+
+Undo appends the inverse of the last undoable move to the log, and redo
+appends the undone move again. Both are ordinary one-move changes, so they
+cost the same as a move and clients following the history replay them like
+any other. The last MAX_UNDO_MOVES moves can be undone; a new move clears
+the redo list.
+"""
+from models.algorithm import invert_algorithm
+from models.move_engine import apply_moves
+from models.cube import RubiksCube
+from utils.cube_state_adapter import state_from_facelets, state_to_facelets
+
+# Moves between snapshots, i.e. the longest replay needed to rebuild a state
+SNAPSHOT_INTERVAL = 32
+
+# Moves of history kept for clients catching up
+MAX_LOG_MOVES = 256
+
+# Moves that can be undone
+MAX_UNDO_MOVES = 100
+
+
+class VersionConflict(Exception):
+    """Raised when a change is based on a version that is no longer current."""
+
+    def __init__(self, record):
+        super().__init__(f"Cube is at version {record['version']}")
+        self.record = record
+
+
+def new_record(state=RubiksCube.SOLVED_STATE, version=0):
+    """Return a record holding a state as its snapshot.
+
+    Raises:
+        ValueError: If the state has stickers of unknown colors.
+    """
+    return {
+        'version': version,
+        'snapshot': state_to_facelets(state),
+        'snapshot_version': version,
+        'log_start': version,
+        'log': '',
+        'undo': '',
+        'redo': '',
+    }
+
+
+def replace_state(record, state):
+    """Return the record that follows record when the whole state is replaced."""
+    return new_record(state, record['version'] + 1)
+
+
+def record_state(record):
+    """Rebuild the current state from the snapshot and the moves logged after it."""
+    state = state_from_facelets(record['snapshot'])
+    moves = record['log'].split()[record['snapshot_version'] - record['log_start']:]
+    # Log suffixes are one-off sequences; replaying them move by move keeps
+    # them out of the algorithm cache, which is for user-supplied algorithms
+    return apply_moves(state, moves) if moves else state
+
+
+def append_moves(record, moves, state, undo=None, redo=()):
+    """Return the record that follows record when moves are applied.
+
+    Args:
+        record: The current record.
+        moves: Normalized moves, as returned by parse_algorithm.
+        state: The state after the moves (used if a snapshot is due).
+        undo: The undoable moves afterwards; by default the record's plus moves.
+        redo: The redoable moves afterwards; by default none.
+    """
+    if undo is None:
+        undo = record.get('undo', '').split() + list(moves)
+    version = record['version'] + len(moves)
+    log = record['log'].split() + list(moves)
+    log_start = record['log_start']
+    snapshot, snapshot_version = record['snapshot'], record['snapshot_version']
+
+    if version - snapshot_version >= SNAPSHOT_INTERVAL:
+        snapshot, snapshot_version = state_to_facelets(state), version
+
+    # Trim old history, but never the moves a replay still needs
+    drop = min(len(log) - MAX_LOG_MOVES, snapshot_version - log_start)
+    if drop > 0:
+        log = log[drop:]
+        log_start += drop
+
+    return {
+        'version': version,
+        'snapshot': snapshot,
+        'snapshot_version': snapshot_version,
+        'log_start': log_start,
+        'log': ' '.join(log),
+        'undo': ' '.join(undo[-MAX_UNDO_MOVES:]),
+        'redo': ' '.join(redo),
+    }
+
+
+def undo_move(record):
+    """Return the record and state after undoing the last undoable move.
+
+    Returns:
+        A (record, state) tuple, or None if there is nothing to undo.
+    """
+    undo = record.get('undo', '').split()
+    if not undo:
+        return None
+    move = undo.pop()
+    inverse = invert_algorithm([move])
+    state = apply_moves(record_state(record), inverse)
+    redo = record.get('redo', '').split() + [move]
+    return append_moves(record, inverse, state, undo, redo), state
+
+
+def redo_move(record):
+    """Return the record and state after redoing the last undone move.
+
+    Returns:
+        A (record, state) tuple, or None if there is nothing to redo.
+    """
+    redo = record.get('redo', '').split()
+    if not redo:
+        return None
+    move = redo.pop()
+    state = apply_moves(record_state(record), [move])
+    undo = record.get('undo', '').split() + [move]
+    return append_moves(record, [move], state, undo, redo), state
+
+
+def moves_since(record, version):
+    """Return the moves that took the cube from version to the current version.
+
+    Returns:
+        A list of moves, or None if that part of the history is not logged
+        (too old, or before the state was last replaced).
+    """
+    if not record['log_start'] <= version <= record['version']:
+        return None
+    return record['log'].split()[version - record['log_start']:]
+
+
+def check_version(record, base_version):
+    """Raise VersionConflict unless base_version is the record's current version."""
+    if base_version != record['version']:
+        raise VersionConflict(record)
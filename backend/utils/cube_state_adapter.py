@@ -1,5 +1,30 @@
+import base64
+import binascii
+
+from flask import request
+
 from models.cube import RubiksCube
-import copy
+from models.move_engine import FACE_ORDER, state_from_2d, state_to_2d
+
+# Wire formats for cubeState. The default '2d' is six lists of nine color
+# names. 'facelet' is a 54-character string of face letters (the letter of
+# the face each color has on the solved cube: white is U, red is F, ...)
+# with the faces in URFDLB order, each face row-major as in the 2D format.
+# 'packed' is the 3-bit packed state key (RubiksCube.pack_state) as 21
+# big-endian bytes in URL-safe base64 (28 characters).
+STATE_FORMATS = ('2d', 'facelet', 'packed')
+DEFAULT_STATE_FORMAT = '2d'
+
+# Clients pick a format with this header or the 'format' query parameter
+STATE_FORMAT_HEADER = 'X-Cube-State-Format'
+STATE_FORMAT_PARAM = 'format'
+
+_FACELET_FACES = ('up', 'right', 'front', 'down', 'left', 'back')
+# Sticker index of each character of a facelet string
+_FACELET_ORDER = tuple(FACE_ORDER.index(face) * 9 + i for face in _FACELET_FACES for i in range(9))
+_COLOR_LETTERS = {RubiksCube.COLORS[face]: face[0].upper() for face in FACE_ORDER}
+_LETTER_COLORS = {letter: color for color, letter in _COLOR_LETTERS.items()}
+_PACKED_BYTES = 21
 
 def convert_3d_to_2d_state(cube_3d_state):
     """Convert the 3D cube state to the 2D array format expected by the frontend.
@@ -58,22 +83,9 @@ def create_cube_from_2d_state(cube_2d_state):
     if not cube_2d_state or len(cube_2d_state) != 6:
         return RubiksCube()
     
-    # Create a new cube
+    # Create a new cube and load the stickers into its compact state
     cube = RubiksCube()
-    
-    # Convert the 2D state to 3D format
-    state_3d = convert_2d_to_3d_state(cube_2d_state)
-    
-    # Store the current state directly in the cube instance
-    cube.current_state_3d = copy.deepcopy(state_3d)
-    
-    # Replace the get_state method to return our stored state
-    original_get_state = cube.get_state
-    
-    def new_get_state():
-        return cube.current_state_3d
-    
-    cube.get_state = new_get_state
+    cube.state = state_from_2d(cube_2d_state)
     
     return cube
 
@@ -88,11 +100,24 @@ def is_solved_state(cube_2d_state):
     Returns:
         True if the cube is solved, False otherwise.
     """
-    for face in cube_2d_state:
-        color = face[0]
-        if not all(sticker == color for sticker in face):
-            return False
-    return True
+    try:
+        return RubiksCube.pack_state(state_from_2d(cube_2d_state)) in RubiksCube.SOLVED_KEYS
+    except ValueError:
+        return False
+
+def are_solved_states(cube_2d_states):
+    """Check many 2D states at once using the vectorized batch simulator.
+    
+    Args:
+        cube_2d_states: A list of states, each six lists of 9 color strings.
+                    
+    Returns:
+        A list of booleans, True for each solved cube.
+    """
+    if not cube_2d_states:
+        return []
+    from models.cube_batch import CubeBatch
+    return CubeBatch.from_states(cube_2d_states).is_solved().tolist()
 
 def is_default_state(cube_2d_state):
     """Check if the given 2D state represents the default initial state.
@@ -103,10 +128,95 @@ def is_default_state(cube_2d_state):
     Returns:
         True if the state matches the default state, False otherwise.
     """
-    default_colors = ['green', 'blue', 'white', 'yellow', 'red', 'orange']
+    try:
+        return RubiksCube.pack_state(state_from_2d(cube_2d_state)) == RubiksCube.SOLVED_KEY
+    except ValueError:
+        return False
+
+def is_2d_state(cube_2d_state):
+    """Check that a state in the 2D format has six faces of 9 string stickers."""
+    return (isinstance(cube_2d_state, list) and len(cube_2d_state) == 6
+            and all(isinstance(face, list) and len(face) == 9
+                    and all(isinstance(sticker, str) for sticker in face)
+                    for face in cube_2d_state))
+
+def state_to_facelets(state):
+    """Convert a 54-sticker state to a facelet string (see STATE_FORMATS)."""
+    try:
+        return ''.join([_COLOR_LETTERS[state[i]] for i in _FACELET_ORDER])
+    except KeyError as e:
+        raise ValueError(f"Unknown sticker color: {e.args[0]}") from None
+
+def state_from_facelets(facelets):
+    """Convert a facelet string to a 54-sticker state.
+    
+    Raises:
+        ValueError: If the string is not 54 face letters.
+    """
+    if len(facelets) != 54:
+        raise ValueError("A facelet string needs 54 characters")
+    state = [None] * 54
+    try:
+        for index, letter in zip(_FACELET_ORDER, facelets):
+            state[index] = _LETTER_COLORS[letter]
+    except KeyError as e:
+        raise ValueError(f"Unknown facelet letter: {e.args[0]}") from None
+    return tuple(state)
+
+def state_to_packed(state):
+    """Convert a 54-sticker state to its base64 packed form (see STATE_FORMATS)."""
+    key = RubiksCube.pack_state(state)
+    return base64.urlsafe_b64encode(key.to_bytes(_PACKED_BYTES, 'big')).decode('ascii')
+
+def state_from_packed(packed):
+    """Convert a base64 packed state to a 54-sticker state.
+    
+    Raises:
+        ValueError: If the string does not decode to a packed state.
+    """
+    try:
+        data = base64.urlsafe_b64decode(packed)
+    except (binascii.Error, ValueError):
+        raise ValueError("Invalid packed cube state") from None
+    key = int.from_bytes(data, 'big')
+    if len(data) != _PACKED_BYTES or key >= 8 ** 54:
+        raise ValueError("Invalid packed cube state")
+    try:
+        return RubiksCube.unpack_state(key)
+    except KeyError:
+        raise ValueError("Invalid packed cube state") from None
+
+def requested_state_format():
+    """Return the cubeState format the current request asked for.
+    
+    The X-Cube-State-Format header wins over the 'format' query parameter;
+    unknown formats fall back to the 2D format.
+    """
+    state_format = (request.headers.get(STATE_FORMAT_HEADER)
+                    or request.args.get(STATE_FORMAT_PARAM, DEFAULT_STATE_FORMAT))
+    return state_format if state_format in STATE_FORMATS else DEFAULT_STATE_FORMAT
+
+def encode_state(cube_2d_state, state_format):
+    """Convert a 2D state to the given wire format."""
+    if state_format == 'facelet':
+        return state_to_facelets(state_from_2d(cube_2d_state))
+    if state_format == 'packed':
+        return state_to_packed(state_from_2d(cube_2d_state))
+    return cube_2d_state
+
+def decode_state(wire_state):
+    """Convert a state sent by a client, in any wire format, to the 2D format.
     
-    for i, face in enumerate(cube_2d_state):
-        expected_color = default_colors[i]
-        if not all(sticker == expected_color for sticker in face):
-            return False
-    return True 
\ No newline at end of file
+    A list is taken as the 2D format, a 54-character string as a facelet
+    string and any other string as a packed state.
+    
+    Raises:
+        ValueError: If the state is malformed.
+    """
+    if isinstance(wire_state, str):
+        if len(wire_state) == 54:
+            return state_to_2d(state_from_facelets(wire_state))
+        return state_to_2d(state_from_packed(wire_state))
+    if not is_2d_state(wire_state):
+        raise ValueError("currentState must be six faces of 9 stickers")
+    return wire_state
@@ -0,0 +1,133 @@
+"""Streaming channels for interactive cube sessions.
+
+A client opens a channel once through a normal, cookie-authenticated
+request and gets back a random token. From then on:
+
+- GET /api/cube/stream/<token> is a Server-Sent Events stream. It starts
+  with the cube's state and then sends one 'moves' event per frame in
+  which moves were applied.
+- POST /api/cube/stream/<token>/moves queues moves. The body is plain move
+  text, so browsers send it without a CORS preflight. The request only
+  parses and queues the moves and returns 204.
+
+The stream applies every move queued within one frame in a single batch:
+one lock, one store write and one event. So a burst of turns costs little
+more per move than applying it.
+
+Channels live in the process that opened them. The token is both the
+credential and the routing key, so a deployment with several workers must
+route a token's requests to the same worker.
+"""
+import json
+import secrets
+import threading
+import time
+
+from utils.session_manager import apply_cube_moves, get_cube_record
+from utils.cube_log import record_state
+from utils.cube_state_adapter import state_to_facelets
+
+# Moves arriving within this many seconds of each other are applied together
+DEFAULT_FRAME_INTERVAL = 1 / 60
+
+# Seconds between keep-alive comments on an idle stream
+KEEPALIVE_INTERVAL = 15
+
+# Channels that are not streaming are dropped after this many seconds
+CHANNEL_TTL = 60
+
+
+def format_event(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+class CubeChannel:
+    """Moves queued by one client, applied and streamed back frame by frame."""
+
+    def __init__(self, user_id, frame_interval=DEFAULT_FRAME_INTERVAL):
+        self.user_id = user_id
+        self.token = secrets.token_urlsafe(16)
+        self.frame_interval = frame_interval
+        self.streaming = False
+        self.last_used = time.monotonic()
+        self._pending = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+
+    def push(self, moves):
+        """Queue parsed moves for the next frame."""
+        with self._lock:
+            self._pending.extend(moves)
+        self.last_used = time.monotonic()
+        self._wake.set()
+
+    def close(self):
+        """End the stream."""
+        self._closed = True
+        self._wake.set()
+
+    def _take(self):
+        self._wake.clear()
+        with self._lock:
+            moves, self._pending = self._pending, []
+        return moves
+
+    def events(self):
+        """Generate the channel's events until it is closed."""
+        self.streaming = True
+        try:
+            record = get_cube_record(self.user_id)
+            yield format_event('state', {
+                'version': record['version'],
+                'state': state_to_facelets(record_state(record))
+            })
+            while not self._closed:
+                if not self._wake.wait(KEEPALIVE_INTERVAL):
+                    yield ': keep-alive\n\n'
+                    continue
+                # Let the rest of the frame's moves arrive so they share one batch
+                time.sleep(self.frame_interval)
+                moves = self._take()
+                if not moves:
+                    continue
+                record, (state,) = apply_cube_moves(self.user_id, moves)
+                yield format_event('moves', {
+                    'version': record['version'],
+                    'moves': moves,
+                    'state': state_to_facelets(state)
+                })
+        finally:
+            # Keep the channel so an EventSource can reconnect; idle ones expire
+            self.streaming = False
+            self.last_used = time.monotonic()
+
+
+_channels = {}
+
+
+def open_channel(user_id, frame_interval=DEFAULT_FRAME_INTERVAL):
+    """Open a channel for a user and return it."""
+    # Drop channels whose client never connected or went away
+    now = time.monotonic()
+    for token, channel in list(_channels.items()):
+        if not channel.streaming and now - channel.last_used > CHANNEL_TTL:
+            _channels.pop(token, None)
+
+    channel = CubeChannel(user_id, frame_interval)
+    _channels[channel.token] = channel
+    return channel
+
+
+def get_channel(token):
+    """Return the open channel with this token, or None."""
+    return _channels.get(token)
+
+
+def close_channel(token):
+    """Close a channel and forget its token."""
+    channel = _channels.pop(token, None)
+    if channel is not None:
+        channel.close()
+    return channel
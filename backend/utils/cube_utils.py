@@ -1,3 +1,11 @@
+import logging
+
+from models.cube import RubiksCube
+from models.move_engine import state_from_2d
+from utils.log_utils import get_logger
+
+logger = get_logger('cube_utils')
+
 def rotate_face_clockwise(face):
     """Rotate a face 90 degrees clockwise"""
     return [
@@ -18,7 +26,7 @@ def handle_cube_move(move, cube_state):
     """Apply a move to the cube state and return the new state"""
     # Create a deep copy of the cube state
     new_state = [face[:] for face in cube_state]
-    print(f"Before move {move}: {cube_state}")
+    logger.debug("Before move %s: %s", move, cube_state)
 
     if move == 'F':
         new_state[4] = rotate_face_clockwise(cube_state[4])
@@ -134,8 +142,13 @@ def handle_cube_move(move, cube_state):
         for _ in range(3):
             new_state = handle_cube_move(base_move, new_state)
     
-    print(f"After move {move}: {new_state}")
-    # Verify the state has actually changed
-    changed = new_state != cube_state
-    print(f"State changed: {changed}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("After move %s: %s", move, new_state)
+        # Verify the state has actually changed by comparing packed state keys
+        try:
+            changed = (RubiksCube.pack_state(state_from_2d(new_state))
+                       != RubiksCube.pack_state(state_from_2d(cube_state)))
+        except ValueError:
+            changed = new_state != cube_state
+        logger.debug("State changed: %s", changed)
     return new_state 
\ No newline at end of file
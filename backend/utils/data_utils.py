@@ -1,28 +1,113 @@
 import json
 import os
+import threading
+import time
+
+from config import Config
+from utils.log_utils import get_logger
+
+logger = get_logger('data_utils')
+
+# The content file, next to the app
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data.json')
+
+class Content:
+    """One version of the content, with id-keyed indexes.
+
+    The dicts are shared by every request and must not be modified.
+    """
+
+    def __init__(self, data, version):
+        self.data = data
+        self.version = version
+        self.modules = {m['id']: m for m in data['learning_modules']}
+        self.questions = {q['id']: q for q in data['quiz_questions']}
+        # Practice questions have no ids of their own; key them by (module id, position)
+        self.practice_questions = {(m['id'], n): q
+                                   for m in data['learning_modules']
+                                   for n, q in enumerate(m.get('practice_questions', []))}
+
+        # Quiz order, neighbours and answer key
+        self.question_order = sorted(self.questions)
+        self.next_question = dict(zip(self.question_order, self.question_order[1:]))
+        self.previous_question = dict(zip(self.question_order[1:], self.question_order))
+        self.answer_key = {q_id: q['correct_answer'] for q_id, q in self.questions.items()}
+
+        # Serialized bodies and ETags of items, filled in by utils.http_cache
+        self.responses = {}
+
+class ContentRepository:
+    """data.json parsed once and reloaded only when the file changes.
+
+    The file's modification time is checked at most once per check_interval
+    seconds, so requests in between do no file I/O at all. A file that fails
+    to parse (e.g. half-written) keeps the previous content in place.
+    """
+
+    def __init__(self, path=DATA_PATH, check_interval=1.0):
+        self.path = path
+        self.check_interval = check_interval
+        self._content = None
+        self._signature = None
+        self._next_check = 0
+        self._lock = threading.Lock()
+
+    def _stat(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _load(self, signature):
+        if signature is None:
+            data = {"learning_modules": [], "quiz_questions": []}
+        else:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+        version = f"{signature[0]:x}-{signature[1]:x}" if signature else 'empty'
+        return Content(data, version)
+
+    def get(self):
+        """Return the current content, reloading it if the file has changed."""
+        now = time.monotonic()
+        if self._content is not None and now < self._next_check:
+            return self._content
+
+        with self._lock:
+            if self._content is None or now >= self._next_check:
+                signature = self._stat()
+                if self._content is None or signature != self._signature:
+                    try:
+                        self._content = self._load(signature)
+                        self._signature = signature
+                        logger.info("Loaded content version %s", self._content.version)
+                    except ValueError as e:
+                        if self._content is None:
+                            raise
+                        logger.warning("Keeping previous content, %s is invalid: %s", self.path, e)
+                self._next_check = now + self.check_interval
+        return self._content
+
+# Content shared by every request
+repository = ContentRepository(check_interval=Config.CONTENT_RELOAD_INTERVAL)
 
 # Load data from JSON file
 def load_data():
-    try:
-        with open(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data.json'), 'r') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {
-            "learning_modules": [],
-            "quiz_questions": []
-        }
+    return repository.get().data
 
 # Get a specific learning module by ID
 def get_learning_module(module_id):
-    data = load_data()
-    return next((m for m in data['learning_modules'] if m['id'] == module_id), None)
+    return repository.get().modules.get(module_id)
 
 # Get a specific quiz question by ID
 def get_quiz_question(question_id):
-    data = load_data()
-    return next((q for q in data['quiz_questions'] if q['id'] == question_id), None)
+    return repository.get().questions.get(question_id)
+
+# Get a module's practice question by its position in the module
+def get_practice_question(module_id, index):
+    return repository.get().practice_questions.get((module_id, index))
 
 # Get all quiz questions
 def get_all_quiz_questions():
-    data = load_data()
-    return data['quiz_questions'] 
\ No newline at end of file
+    return repository.get().data['quiz_questions']
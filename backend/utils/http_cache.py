@@ -0,0 +1,37 @@
+"""Conditional responses for content that only changes with data.json.
+
+The JSON body and ETag of each content item are computed once per content
+version and kept on that version's Content object, so repeat requests
+neither re-serialize the item nor re-hash it. A request whose If-None-Match
+carries the current ETag gets an empty 304.
+"""
+import hashlib
+import json
+
+from flask import current_app, request
+
+from utils.metrics import content_cache_hits, content_cache_misses
+
+def content_response(content, key, item, cache_control):
+    """Return a cacheable JSON response for one content item.
+
+    Args:
+        content: The Content version the item was read from.
+        key: A hashable key naming the item within that version.
+        item: The JSON-serializable item.
+        cache_control: The Cache-Control header to send.
+    """
+    cached = content.responses.get(key)
+    if cached is None:
+        body = json.dumps(item, indent=None, separators=(',', ':')).encode() + b'\n'
+        etag = hashlib.sha1(body).hexdigest()[:20]
+        cached = content.responses[key] = (body, etag)
+        content_cache_misses.inc()
+    else:
+        content_cache_hits.inc()
+    body, etag = cached
+
+    response = current_app.response_class(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = cache_control
+    return response.make_conditional(request)
@@ -0,0 +1,98 @@
+"""Leveled, structured logging for the app.
+
+Every module logs through a child of the 'rubiks' logger. Messages take
+%-style arguments, so a state passed to logger.debug() is only turned into
+text when a DEBUG record is actually emitted; with DEBUG off nothing is
+formatted or serialized.
+
+configure_logging() installs one handler on the 'rubiks' logger with an
+optional JSON formatter and per-endpoint sampling of chatty records.
+"""
+import json
+import logging
+import random
+
+from flask import has_request_context, request
+
+LOGGER_NAME = 'rubiks'
+
+
+def get_logger(name):
+    """Return the logger for one module, e.g. get_logger('cube_routes')."""
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as one JSON object per line."""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        endpoint = getattr(record, 'endpoint', None)
+        if endpoint:
+            entry['endpoint'] = endpoint
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+class EndpointSampler(logging.Filter):
+    """Keep only a fraction of the DEBUG and INFO records of each endpoint.
+
+    Warnings and errors always pass. Records logged outside a request use
+    the default rate.
+    """
+
+    def __init__(self, rates=None, default_rate=1.0):
+        """Create a sampler.
+
+        Args:
+            rates: A dict mapping endpoint names (e.g. 'cube.make_cube_move')
+                   to the fraction of their records to keep.
+            default_rate: The fraction kept for other endpoints.
+        """
+        super().__init__()
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+
+    def filter(self, record):
+        endpoint = request.endpoint if has_request_context() else None
+        record.endpoint = endpoint
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(endpoint, self.default_rate)
+        return rate >= 1 or random.random() < rate
+
+
+_handler = None
+
+
+def configure_logging(level='INFO', json_format=False, sample_rates=None, stream=None):
+    """Set up the app's log handler; calling it again replaces the previous setup.
+
+    Args:
+        level: Level name or number for the 'rubiks' loggers.
+        json_format: Whether to write JSON lines instead of plain text.
+        sample_rates: Per-endpoint fractions of DEBUG/INFO records to keep.
+        stream: Where to write (defaults to stderr).
+    """
+    global _handler
+    logger = logging.getLogger(LOGGER_NAME)
+    if _handler is not None:
+        logger.removeHandler(_handler)
+
+    _handler = logging.StreamHandler(stream)
+    if json_format:
+        _handler.setFormatter(JsonFormatter())
+    else:
+        _handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    _handler.addFilter(EndpointSampler(sample_rates))
+
+    logger.addHandler(_handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    return logger
@@ -0,0 +1,211 @@
+"""In-process request metrics in the Prometheus text format.
+
+Histograms have fixed buckets, so recording a value is one bisect and one
+counter increment under a lock. That is cheap enough to keep on in
+production (METRICS_ENABLED, off by default). The app records:
+
+- rubiks_request_seconds{endpoint}: latency of each route, measured by
+  install_metrics() from before_request to after_request
+- rubiks_phase_seconds{phase}: time spent in the parts of a cube request
+  (session_load, replay_log, deserialize, replace_state, apply_moves,
+  serialize, session_save)
+- rubiks_moves_applied_total: moves applied to stored cubes
+- rubiks_content_cache_hits_total / _misses_total: content responses served
+  from, or added to, the per-version response cache
+- rubiks_active_users: users in the session store, read when scraped
+
+Metrics are kept per process. With several workers, each one reports its
+own values.
+"""
+import bisect
+import hmac
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+# Upper bounds of the latency buckets, in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Counter:
+    """A value that only goes up."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labels):
+        yield name, labels, self.value
+
+
+class Gauge:
+    """A value read from a callback when the metrics are scraped."""
+
+    def __init__(self, read):
+        self.read = read
+
+    def samples(self, name, labels):
+        yield name, labels, self.read()
+
+
+class Histogram:
+    """Counts of observed values in fixed buckets, plus their sum."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One count per bucket, plus one for values above the last bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def samples(self, name, labels):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        cumulative = 0
+        for bound, count in zip((*self.buckets, float('inf')), counts):
+            cumulative += count
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            yield f'{name}_bucket', (*labels, ('le', le)), cumulative
+        yield f'{name}_sum', labels, total
+        yield f'{name}_count', labels, cumulative
+
+
+class Registry:
+    """Named metric families, each holding one metric per label set."""
+
+    def __init__(self):
+        self._families = {}
+        self._lock = threading.Lock()
+
+    def _get(self, name, kind, help_text, labels, create):
+        key = tuple(sorted(labels.items()))
+        family = self._families.get(name)
+        metric = family[2].get(key) if family else None
+        if metric is None:
+            with self._lock:
+                family = self._families.setdefault(name, (kind, help_text, {}))
+                metric = family[2].setdefault(key, create())
+        return metric
+
+    def counter(self, name, help_text, **labels):
+        """Return the counter with this name and labels, creating it if needed."""
+        return self._get(name, 'counter', help_text, labels, Counter)
+
+    def histogram(self, name, help_text, buckets=DEFAULT_BUCKETS, **labels):
+        """Return the histogram with this name and labels, creating it if needed."""
+        return self._get(name, 'histogram', help_text, labels, lambda: Histogram(buckets))
+
+    def gauge(self, name, help_text, read, **labels):
+        """Register a gauge whose value is read(), called on every scrape."""
+        return self._get(name, 'gauge', help_text, labels, lambda: Gauge(read))
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            families = sorted((name, kind, help_text, dict(metrics))
+                              for name, (kind, help_text, metrics) in self._families.items())
+        for name, kind, help_text, metrics in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for labels, metric in sorted(metrics.items()):
+                for sample, sample_labels, value in metric.samples(name, labels):
+                    lines.append(f'{sample}{_format_labels(sample_labels)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+def _format_value(value):
+    if isinstance(value, float) and not value.is_integer():
+        return repr(value)
+    return str(int(value))
+
+
+registry = Registry()
+
+moves_applied = registry.counter('rubiks_moves_applied_total', 'Moves applied to stored cubes.')
+content_cache_hits = registry.counter(
+    'rubiks_content_cache_hits_total', 'Content responses served from the response cache.')
+content_cache_misses = registry.counter(
+    'rubiks_content_cache_misses_total', 'Content responses serialized and added to the cache.')
+
+# Phase histograms, looked up once per phase name
+_phases = {}
+
+
+@contextmanager
+def timed(phase):
+    """Record the time spent in the with-block as one phase of a request.
+
+    Example:
+        with timed('session_load'):
+            record = get_cube_record(user_id)
+    """
+    histogram = _phases.get(phase)
+    if histogram is None:
+        histogram = _phases[phase] = registry.histogram(
+            'rubiks_phase_seconds', 'Time spent in each phase of cube requests.', phase=phase)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start)
+
+
+# Addresses that may scrape the metrics when no token is configured
+LOCAL_ADDRESSES = ('127.0.0.1', '::1')
+
+
+def install_metrics(app, path='/metrics', token=None):
+    """Time every request of an app and serve the metrics at path.
+
+    The endpoint is internal. It is not under /api, so CORS does not expose
+    it to browsers. Without a token it answers only requests from this
+    host; with one, only requests sending "Authorization: Bearer <token>".
+    Anyone else gets a 404.
+    """
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    def record_latency(response):
+        start = g.pop('metrics_start', None)
+        if start is not None and request.endpoint not in (None, 'metrics'):
+            registry.histogram('rubiks_request_seconds', 'Request latency by endpoint.',
+                               endpoint=request.endpoint).observe(time.perf_counter() - start)
+        return response
+
+    def metrics():
+        if token:
+            sent = request.headers.get('Authorization', '')
+            allowed = hmac.compare_digest(sent.encode(), f'Bearer {token}'.encode())
+        else:
+            allowed = request.remote_addr in LOCAL_ADDRESSES
+        if not allowed:
+            return Response('Not Found\n', status=404, content_type='text/plain')
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    app.before_request(start_timer)
+    app.after_request(record_latency)
+    app.add_url_rule(path, 'metrics', metrics)
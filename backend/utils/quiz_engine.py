@@ -0,0 +1,69 @@
+"""Quiz answers and scores, kept up to date one answer at a time.
+
+Each user's number of correct answers is stored next to their answers and
+adjusted on every submission, so reading the score never walks the
+question bank. The count is tied to the content version it was computed
+against; if data.json changes (e.g. an answer key is fixed) it is
+recomputed once from the stored answers.
+"""
+from utils.data_utils import repository
+from utils.session_manager import get_user_field, set_user_field, user_lock
+
+def _correct_count(user_id, content, quiz_answers=None):
+    """Return the user's number of correct answers for this content version."""
+    if get_user_field(user_id, 'quiz_content_version') == content.version:
+        return get_user_field(user_id, 'quiz_correct', 0)
+
+    if quiz_answers is None:
+        quiz_answers = get_user_field(user_id, 'quiz_answers', {})
+    correct = sum(1 for q_id, answer in quiz_answers.items()
+                  if content.answer_key.get(int(q_id)) == answer)
+    set_user_field(user_id, 'quiz_correct', correct)
+    set_user_field(user_id, 'quiz_content_version', content.version)
+    return correct
+
+def submit_answer(user_id, question_id, answer):
+    """Record a user's answer to a question.
+
+    Args:
+        user_id: The user answering.
+        question_id: The id of an existing question.
+        answer: The submitted answer; empty answers are checked but not stored.
+
+    Returns:
+        A dict with is_correct, next_question and previous_question.
+    """
+    content = repository.get()
+    is_correct = answer == content.answer_key[question_id]
+
+    if answer:
+        with user_lock(user_id):
+            quiz_answers = get_user_field(user_id, 'quiz_answers', {})
+            correct = _correct_count(user_id, content, quiz_answers)
+            key = str(question_id)
+            was_correct = key in quiz_answers and quiz_answers[key] == content.answer_key[question_id]
+            quiz_answers[key] = answer
+            set_user_field(user_id, 'quiz_answers', quiz_answers)
+            set_user_field(user_id, 'quiz_correct', correct + is_correct - was_correct)
+
+    return {
+        'is_correct': is_correct,
+        'next_question': content.next_question.get(question_id),
+        'previous_question': content.previous_question.get(question_id)
+    }
+
+def get_score(user_id):
+    """Return (correct answers, total questions, score in percent) for a user."""
+    content = repository.get()
+    with user_lock(user_id):
+        correct = _correct_count(user_id, content)
+    total = len(content.question_order)
+    score = (correct / total) * 100 if total > 0 else 0
+    return correct, total, score
+
+def reset_answers(user_id):
+    """Clear a user's quiz answers."""
+    with user_lock(user_id):
+        set_user_field(user_id, 'quiz_answers', {})
+        set_user_field(user_id, 'quiz_correct', 0)
+        set_user_field(user_id, 'quiz_content_version', repository.get().version)
@@ -0,0 +1,106 @@
+"""A pool of pre-generated scrambles, refilled by a background thread.
+
+Generating a scramble means solving a random state, which takes a solver
+search (tens of milliseconds). Requests therefore only take a finished
+scramble from the pool. A daemon thread refills the pool whenever it drops
+to half its size. The pool never builds solver tables: it maps a current
+table file if there is one and otherwise waits until something else (a
+/solve request, or build_tables.py and a restart) provides them. Until
+then, or after a burst has emptied the pool, take() returns None instead
+of making the request wait.
+
+Each process has its own pool and thread. Like the session store, the pool
+is created on first use so that it is never forked.
+"""
+import collections
+import os
+import threading
+
+from config import Config
+from utils.log_utils import get_logger
+
+logger = get_logger('scramble_pool')
+
+# Seconds between checks while the solver tables are not loaded
+RETRY_INTERVAL = 1.0
+
+# Search time per scramble; the first solution found is usually short enough
+SCRAMBLE_TIME_BUDGET = 0.05
+
+
+class ScramblePool:
+    """Scrambles generated ahead of time, handed out one per request."""
+
+    def __init__(self, size):
+        self.size = size
+        self._scrambles = collections.deque()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='scramble-pool', daemon=True)
+        self._thread.start()
+
+    def __len__(self):
+        return len(self._scrambles)
+
+    def take(self):
+        """Return a (moves, state) scramble, or None if the pool is empty."""
+        try:
+            scramble = self._scrambles.popleft()
+        except IndexError:
+            scramble = None
+        if len(self._scrambles) <= self.size // 2:
+            self._wake.set()
+        return scramble
+
+    def close(self):
+        """Stop the refill thread."""
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+
+    def _solver(self):
+        from models import solver_tables
+        if not solver_tables.tables_loaded():
+            return None
+        return solver_tables.get_two_phase_solver(wait=False)
+
+    def _run(self):
+        from models import solver_tables
+        from models.scramble import generate_scramble
+
+        # Map a current table file; a missing or stale one is left to /solve
+        solver_tables.preload()
+        solver = None
+        while not self._stop.is_set():
+            if solver is None:
+                solver = self._solver()
+                if solver is None:
+                    self._stop.wait(RETRY_INTERVAL)
+                    continue
+            while len(self._scrambles) < self.size and not self._stop.is_set():
+                try:
+                    scramble = generate_scramble(solver, time_budget=SCRAMBLE_TIME_BUDGET)
+                except Exception:
+                    logger.exception("Scramble generation failed")
+                    self._stop.wait(RETRY_INTERVAL)
+                    continue
+                if scramble is not None:
+                    self._scrambles.append(scramble)
+            self._wake.wait()
+            self._wake.clear()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_scramble_pool():
+    """Return this process's scramble pool, starting it on first use."""
+    global _pool, _pool_pid
+    if _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool_pid != os.getpid():
+                _pool = ScramblePool(Config.SCRAMBLE_POOL_SIZE)
+                _pool_pid = os.getpid()
+    return _pool
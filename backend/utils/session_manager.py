@@ -1,103 +1,266 @@
 from flask import session
 import time
 from datetime import datetime
-import copy
+import os
+import threading
 import uuid
+import weakref
 
-# Global state dictionary as a fallback for session
+from config import Config
+from models.move_engine import apply_move, apply_moves, state_from_2d, state_to_2d
+from utils.cube_log import (append_moves, check_version, new_record, record_state, redo_move,
+                            replace_state, undo_move)
+from utils.log_utils import get_logger
+from utils.metrics import moves_applied, timed
+from utils.session_store import MemoryStore, create_store
+
+logger = get_logger('session')
+
+# Global state dictionary as a fallback for session (backs the in-memory store)
 global_state = {}
 
+# Server-side store for user data, chosen by Config.SESSION_STORE. It is
+# opened on first use in each process, never at import: a store opened before
+# a pre-forking server (gunicorn --preload) forks would leave its workers with
+# a shared sqlite connection and no writer thread.
+_store = None
+_store_pid = None
+_store_lock = threading.Lock()
+
+def get_store():
+    """Return this process's session store, opening it on first use."""
+    global _store, _store_pid
+    if _store_pid != os.getpid():
+        with _store_lock:
+            if _store_pid != os.getpid():
+                if Config.SESSION_STORE == 'memory':
+                    _store = MemoryStore(global_state)
+                else:
+                    _store = create_store(Config.SESSION_STORE, Config.SESSION_DB_PATH)
+                _store_pid = os.getpid()
+    return _store
+
+# One lock per user, so requests from different users never wait on each
+# other. A lock is dropped once no request holds it.
+_user_locks = weakref.WeakValueDictionary()
+_user_locks_guard = threading.Lock()
+
+def user_lock(user_id):
+    """Return the lock serializing read-modify-write of one user's data.
+    
+    The lock is reentrant, so helpers that take it can be called while it
+    is held.
+    """
+    lock = _user_locks.get(user_id)
+    if lock is None:
+        with _user_locks_guard:
+            lock = _user_locks.get(user_id)
+            if lock is None:
+                lock = _user_locks[user_id] = threading.RLock()
+    return lock
+
+def default_user_data():
+    """Return the data a new user starts with."""
+    return {
+        'start_time': datetime.now().isoformat(),
+        'current_module': 1,
+        'module_times': {},
+        'module_answers': {},
+        'quiz_answers': {},
+        'quiz_correct': 0,
+        'quiz_score': 0,
+        'attempts': 0,
+        'cube': new_record()
+    }
+
 # Initialize user session data
 def init_user_data():
     """Initialize user session data and return user_id"""
-    # Print session info for debugging
-    print("Session before:", session.get('user_id', 'No user_id in session'), "Session contents:", dict(session))
-    
     # Generate a unique user ID if not present
     if 'user_id' not in session:
-        print("Creating new user_id - session cookie not found")
+        logger.debug("Creating new user_id - session cookie not found")
         # Use a UUID for more reliable session IDs
         session['user_id'] = str(uuid.uuid4())
         session.modified = True
         session.permanent = True  # Make session persist longer
-    else:
-        print(f"Reusing existing user_id: {session['user_id']}")
     
     user_id = session['user_id']
     
-    # Initialize the global state for this user if not present
-    if user_id not in global_state:
-        print(f"Initializing global state for user {user_id}")
-        global_state[user_id] = {
-            'start_time': datetime.now().isoformat(),
-            'current_module': 1,
-            'module_times': {},
-            'module_answers': {},
-            'quiz_answers': {},
-            'quiz_score': 0,
-            'attempts': 0,
-            'cube_state': [
-                ['green'] * 9,   # Left (0)
-                ['blue'] * 9,    # Right (1)
-                ['white'] * 9,   # Up (2)
-                ['yellow'] * 9,  # Down (3)
-                ['red'] * 9,     # Front (4)
-                ['orange'] * 9   # Back (5)
-            ]
-        }
-    
-    # Initialize session data if not present
-    if 'user_data' not in session:
-        print(f"Initializing session user_data for user {user_id}")
-        session['user_data'] = global_state[user_id]
-        session.modified = True
+    # Initialize the stored data for this user if not present
+    ensure_user_data(user_id)
     
-    print("Session after:", session.get('user_id', 'No user_id in session'), "Session modified:", session.modified)
+    # The cookie only carries the user id; drop user data left by older versions
+    if 'user_data' in session:
+        session.pop('user_data')
     
     return user_id
 
+def ensure_user_data(user_id):
+    """Store the default data for a user that has none yet."""
+    store = get_store()
+    if not store.has_user(user_id):
+        with user_lock(user_id):
+            if not store.has_user(user_id):
+                logger.info("Initializing stored data for user %s", user_id)
+                store.update(user_id, default_user_data())
+
+# Get/set a single field of the user's stored data. User data is kept
+# server-side and each route loads only the fields it needs.
+def get_user_field(user_id, field, default=None):
+    return get_store().get(user_id, field, default)
+
+def set_user_field(user_id, field, value):
+    get_store().set(user_id, field, value)
+
+def update_user_field(user_id, field, update, default=None):
+    """Atomically replace a field with update(current value) and return the result.
+    
+    Concurrent updates of the same user's data are serialized by the
+    user's lock, so none of them is lost.
+    """
+    with user_lock(user_id):
+        value = update(get_user_field(user_id, field, default))
+        set_user_field(user_id, field, value)
+    return value
+
+# Get/set the user's cube record: a snapshot plus a versioned move log (see utils.cube_log)
+def get_cube_record(user_id):
+    with timed('session_load'):
+        record = get_store().get(user_id, 'cube')
+    if record is None:
+        # Users stored by older versions only have the plain state
+        with timed('session_load'):
+            cube_state = get_store().get(user_id, 'cube_state')
+        if cube_state is None:
+            logger.debug("User %s not found in store, returning default state", user_id)
+            return new_record()
+        record = new_record(state_from_2d(cube_state))
+    return record
+
+def set_cube_record(user_id, record):
+    with timed('session_save'):
+        set_user_field(user_id, 'cube', record)
+    logger.debug("Updated cube for user %s to version %s", user_id, record['version'])
+
 # Get the user's cube state
 def get_cube_state(user_id):
-    if user_id in global_state:
-        return copy.deepcopy(global_state[user_id]['cube_state'])
-    else:
-        # Return default state if user_id not found
-        print(f"User {user_id} not found in global state, returning default state")
-        return [
-            ['green'] * 9,   # Left (0)
-            ['blue'] * 9,    # Right (1)
-            ['white'] * 9,   # Up (2)
-            ['yellow'] * 9,  # Down (3)
-            ['red'] * 9,     # Front (4)
-            ['orange'] * 9   # Back (5)
-        ]
+    record = get_cube_record(user_id)
+    with timed('replay_log'):
+        return state_to_2d(record_state(record))
 
 # Set the user's cube state
 def set_cube_state(user_id, new_state):
-    # Update both global state and session
-    if user_id not in global_state:
-        # If user_id not in global state, initialize it
-        init_user_data()
+    """Replace the user's cube with a state, as a new version with a new snapshot.
     
-    global_state[user_id]['cube_state'] = copy.deepcopy(new_state)
+    Raises:
+        ValueError: If the state has stickers of unknown colors.
+    """
+    # If user_id not in the store, initialize it
+    ensure_user_data(user_id)
     
-    if 'user_data' in session:
-        session['user_data']['cube_state'] = copy.deepcopy(new_state)
-        session.modified = True
-    print(f"Updated state for user {user_id}: {global_state[user_id]['cube_state']}")
+    with user_lock(user_id):
+        record = get_cube_record(user_id)
+        with timed('replace_state'):
+            record = replace_state(record, state_from_2d(new_state))
+        set_cube_record(user_id, record)
+    return record
+
+# Apply moves to the user's cube
+def apply_cube_moves(user_id, moves, current_state=None, base_version=None, include_steps=False):
+    """Append moves to the user's cube log.
+    
+    Args:
+        user_id: The user.
+        moves: Normalized moves (see models.algorithm.parse_algorithm).
+        current_state: A full 2D state from a client that does not track
+                       versions; it replaces the stored cube first.
+        base_version: The version the client applied the moves to. If given,
+                      current_state is ignored and the moves are only
+                      applied if the cube is still at that version.
+        include_steps: Whether to return the state after every move.
+    
+    Returns:
+        The new cube record and a list of states: the state after each move
+        if include_steps is set, otherwise just the final state.
+    
+    Raises:
+        VersionConflict: If the cube is no longer at base_version.
+        ValueError: If current_state has stickers of unknown colors.
+    """
+    ensure_user_data(user_id)
+    
+    # Hold the user's lock so concurrent moves are applied one after the other
+    with user_lock(user_id):
+        record = get_cube_record(user_id)
+        if base_version is not None:
+            check_version(record, base_version)
+        
+        with timed('replay_log'):
+            state = record_state(record)
+        if base_version is None and current_state:
+            with timed('replace_state'):
+                sent_state = state_from_2d(current_state)
+                # Clients sending their state with every move usually send the
+                # stored one; only a different state replaces the cube (and
+                # clears its undo history)
+                if sent_state != state:
+                    record, state = replace_state(record, sent_state), sent_state
+        
+        with timed('apply_moves'):
+            if include_steps:
+                states = []
+                for move in moves:
+                    state = apply_move(state, move)
+                    states.append(state)
+            else:
+                state = apply_moves(state, moves)
+                states = [state]
+            record = append_moves(record, moves, state)
+        
+        set_cube_record(user_id, record)
+    moves_applied.inc(len(moves))
+    return record, states
+
+def _step_cube_history(user_id, step, base_version):
+    ensure_user_data(user_id)
+    
+    with user_lock(user_id):
+        record = get_cube_record(user_id)
+        if base_version is not None:
+            check_version(record, base_version)
+        with timed('apply_moves'):
+            result = step(record)
+        if result is None:
+            return None
+        set_cube_record(user_id, result[0])
+    moves_applied.inc()
+    return result
+
+def undo_cube_move(user_id, base_version=None):
+    """Undo the user's last undoable move by applying its inverse.
+    
+    Returns:
+        The new cube record and state, or None if there is nothing to undo.
+    
+    Raises:
+        VersionConflict: If the cube is no longer at base_version.
+    """
+    return _step_cube_history(user_id, undo_move, base_version)
+
+def redo_cube_move(user_id, base_version=None):
+    """Apply the user's last undone move again.
+    
+    Returns:
+        The new cube record and state, or None if there is nothing to redo.
+    
+    Raises:
+        VersionConflict: If the cube is no longer at base_version.
+    """
+    return _step_cube_history(user_id, redo_move, base_version)
 
 # Get/set user progress data
 def update_user_module(user_id, module_id, next_module=None):
     if next_module:
-        global_state[user_id]['current_module'] = next_module
-        session['user_data']['current_module'] = next_module
-        session.modified = True
-    return global_state[user_id]['current_module']
-
-# Update user quiz data
-def update_quiz_data(user_id, question_id=None, answer=None):
-    if question_id and answer:
-        global_state[user_id]['quiz_answers'][str(question_id)] = answer
-        session['user_data']['quiz_answers'][str(question_id)] = answer
-        session.modified = True
-    return global_state[user_id]['quiz_answers'] 
\ No newline at end of file
+        set_user_field(user_id, 'current_module', next_module)
+        return next_module
+    return get_store().get(user_id, 'current_module')
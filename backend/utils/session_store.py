@@ -0,0 +1,257 @@
+"""Pluggable storage for per-user session data.
+
+User data is stored field by field (cube_state, quiz_answers, ...) so that a
+move only reads and writes the cube state. Two backends are provided:
+
+- MemoryStore keeps everything in a process-local dict. It is the default
+  and is what ``session_manager.global_state`` has always been.
+- SQLiteStore keeps data in an SQLite database in WAL mode, shared by every
+  worker process on the host. Writes go to an in-process buffer and a
+  background thread commits them in one transaction every few milliseconds,
+  so a move never waits for a disk sync.
+"""
+import atexit
+import copy
+import json
+import sqlite3
+import threading
+
+from utils.log_utils import get_logger
+
+logger = get_logger('session_store')
+
+# How long the SQLite writer waits to coalesce writes into one transaction
+DEFAULT_FLUSH_INTERVAL = 0.005
+
+
+class SessionStore:
+    """Interface of a per-user, per-field session store."""
+
+    def has_user(self, user_id):
+        """Return True if any data is stored for the user."""
+        raise NotImplementedError
+
+    def get(self, user_id, field, default=None):
+        """Return a copy of one field of a user's data, or default if unset."""
+        raise NotImplementedError
+
+    def set(self, user_id, field, value):
+        """Store one field of a user's data."""
+        raise NotImplementedError
+
+    def get_user(self, user_id):
+        """Return a copy of all of a user's fields as a dict."""
+        raise NotImplementedError
+
+    def user_count(self):
+        """Return the number of users with stored data."""
+        raise NotImplementedError
+
+    def update(self, user_id, fields):
+        """Store several fields of a user's data."""
+        for field, value in fields.items():
+            self.set(user_id, field, value)
+
+    def flush(self):
+        """Make every completed write durable and visible to other processes."""
+
+    def close(self):
+        """Flush and release any resources."""
+        self.flush()
+
+
+# Immutable values; a dict holding only these (e.g. a cube record) is copied shallowly
+_SCALARS = (str, int, float, bool, type(None))
+
+
+def _copy(value):
+    """Copy a stored value, skipping the deep copy for flat dicts of scalars."""
+    if isinstance(value, dict) and all(isinstance(v, _SCALARS) for v in value.values()):
+        return dict(value)
+    return copy.deepcopy(value)
+
+
+class MemoryStore(SessionStore):
+    """Process-local store backed by a dict of user dicts."""
+
+    def __init__(self, data=None):
+        self.data = data if data is not None else {}
+
+    def has_user(self, user_id):
+        return user_id in self.data
+
+    def get(self, user_id, field, default=None):
+        user = self.data.get(user_id)
+        if user is None or field not in user:
+            return default
+        return _copy(user[field])
+
+    def set(self, user_id, field, value):
+        self.data.setdefault(user_id, {})[field] = _copy(value)
+
+    def get_user(self, user_id):
+        return copy.deepcopy(self.data.get(user_id, {}))
+
+    def user_count(self):
+        return len(self.data)
+
+
+class SQLiteStore(SessionStore):
+    """Store shared by every process on the host, with write-behind batching.
+
+    Writes are buffered in memory (where reads in this process see them at
+    once) and committed by a background thread in a single transaction per
+    flush interval. Other processes see them once they are committed.
+    """
+
+    def __init__(self, path, flush_interval=DEFAULT_FLUSH_INTERVAL):
+        """Open or create the database.
+
+        Args:
+            path: The SQLite database file.
+            flush_interval: Seconds to wait after a write before committing,
+                            so writes arriving meanwhile share a transaction.
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.transactions = 0
+
+        # JSON-encoded values waiting to be committed, and those being committed
+        self._pending = {}
+        self._flushing = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._local = threading.local()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        connection = self._connection()
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS user_fields ('
+            ' user_id TEXT NOT NULL,'
+            ' field TEXT NOT NULL,'
+            ' value TEXT NOT NULL,'
+            ' PRIMARY KEY (user_id, field)'
+            ') WITHOUT ROWID')
+        connection.commit()
+
+        self._writer = threading.Thread(target=self._run, name='session-store-writer',
+                                        daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def _connection(self):
+        """Return this thread's connection (sqlite3 connections are per-thread)."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+        return connection
+
+    def _buffered(self, key):
+        """Return the newest uncommitted value for a key, or None."""
+        with self._lock:
+            value = self._pending.get(key)
+            if value is None:
+                value = self._flushing.get(key)
+        return value
+
+    def has_user(self, user_id):
+        with self._lock:
+            if any(key[0] == user_id for key in (*self._pending, *self._flushing)):
+                return True
+        row = self._connection().execute(
+            'SELECT 1 FROM user_fields WHERE user_id = ? LIMIT 1', (user_id,)).fetchone()
+        return row is not None
+
+    def get(self, user_id, field, default=None):
+        value = self._buffered((user_id, field))
+        if value is None:
+            row = self._connection().execute(
+                'SELECT value FROM user_fields WHERE user_id = ? AND field = ?',
+                (user_id, field)).fetchone()
+            if row is None:
+                return default
+            value = row[0]
+        return json.loads(value)
+
+    def set(self, user_id, field, value):
+        encoded = json.dumps(value, separators=(',', ':'))
+        with self._lock:
+            self._pending[(user_id, field)] = encoded
+        self._wake.set()
+
+    def get_user(self, user_id):
+        rows = self._connection().execute(
+            'SELECT field, value FROM user_fields WHERE user_id = ?', (user_id,)).fetchall()
+        fields = dict(rows)
+        with self._lock:
+            for buffer in (self._flushing, self._pending):
+                fields.update({field: value for (user, field), value in buffer.items()
+                               if user == user_id})
+        return {field: json.loads(value) for field, value in fields.items()}
+
+    def user_count(self):
+        # Commit buffered writes first so new users are counted
+        self.flush()
+        row = self._connection().execute(
+            'SELECT COUNT(DISTINCT user_id) FROM user_fields').fetchone()
+        return row[0]
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                self._flushing, self._pending = self._pending, {}
+                batch = self._flushing
+            if not batch:
+                return
+            connection = self._connection()
+            with connection:
+                connection.executemany(
+                    'INSERT OR REPLACE INTO user_fields (user_id, field, value) VALUES (?, ?, ?)',
+                    [(user_id, field, value) for (user_id, field), value in batch.items()])
+            self.transactions += 1
+            with self._lock:
+                self._flushing = {}
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            # Let more writes arrive so they share the transaction
+            self._stop.wait(self.flush_interval)
+            try:
+                self.flush()
+            except sqlite3.Error as e:
+                logger.warning("Session store flush failed, will retry: %s", e)
+                with self._lock:
+                    self._pending = {**self._flushing, **self._pending}
+                    self._flushing = {}
+                self._wake.set()
+
+    def close(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wake.set()
+        self._writer.join()
+        self.flush()
+
+
+def create_store(kind, path=None, **options):
+    """Create a session store from configuration.
+
+    Args:
+        kind: 'memory' or 'sqlite'.
+        path: Database file for the SQLite store.
+
+    Raises:
+        ValueError: If the store kind is unknown.
+    """
+    if kind == 'memory':
+        return MemoryStore(**options)
+    if kind == 'sqlite':
+        return SQLiteStore(path, **options)
+    raise ValueError(f"Unknown session store: {kind}")